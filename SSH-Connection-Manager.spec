@@ -6,7 +6,7 @@ a = Analysis(
     pathex=['C:\\WORKSPACE_PROGETTI_INIZIALI\\ssh-connection\\src'],
     binaries=[],
     datas=[('C:\\WORKSPACE_PROGETTI_INIZIALI\\ssh-connection\\resources', 'resources')],
-    hiddenimports=['ssh_connection', 'ssh_connection.main', 'ssh_connection.gui.tray_icon_manager', 'ssh_connection.ssh.ssh_config_parser', 'ssh_connection.ssh.ssh_launcher', 'ssh_connection.config.config_loader', 'ssh_connection.security.crypto_util', 'pystray._win32', 'PIL._tkinter_finder'],
+    hiddenimports=['ssh_connection', 'ssh_connection.main', 'ssh_connection.gui.tray_icon_manager', 'ssh_connection.ssh.ssh_config_parser', 'ssh_connection.ssh.ssh_launcher', 'ssh_connection.config.config_loader', 'ssh_connection.security.crypto_util', 'ssh_connection.diagnostics.profiling', 'cProfile', 'pstats', 'tracemalloc', 'pystray._win32', 'PIL._tkinter_finder'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled PatternIndex vs naive per-block fnmatch resolution
+
+Generates a synthetic SSH config with many concrete hosts plus the usual
+DB-tunnel wildcard blocks and compares SshConfig.resolve_all() against
+testing every block's patterns with fnmatch for every host.
+
+Usage:
+    python benchmarks/bench_pattern_index.py [host_count]
+"""
+
+import sys
+import tempfile
+import time
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+# Add src to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from ssh_connection.ssh.ssh_config_parser import SshConfigParser
+
+
+ENV_CODES = ("tf", "te", "pf", "pe")
+
+
+def generate_config(host_count: int) -> str:
+    """Build a synthetic config with wildcard tunnel blocks and host_count hosts"""
+    lines = ["Host *\n    ServerAliveInterval 60\n"]
+    for code, port in zip(ENV_CODES, (1524, 1523, 31524, 31523)):
+        lines.append(f"Host *it1{code}*\n    LocalForward {port} db-{code}:{port % 10000}\n")
+    lines.append("# TEST\n")
+    for i in range(host_count):
+        code = ENV_CODES[i % len(ENV_CODES)]
+        lines.append(
+            f"Host app{i}it1{code}01\n    HostName localhost\n    Port {2000 + i % 5000}\n"
+        )
+    return "".join(lines)
+
+
+def naive_matching_blocks(config, host):
+    """Reference implementation: test every block's patterns with fnmatch"""
+    host = host.lower()
+    matched = []
+    for block in config.blocks:
+        if block.patterns is None:
+            continue
+        positive = [p.lower() for p in block.patterns if not p.startswith("!")]
+        negative = [p[1:].lower() for p in block.patterns if p.startswith("!")]
+        if any(fnmatchcase(host, p) for p in negative):
+            continue
+        if any(fnmatchcase(host, p) for p in positive):
+            matched.append(block)
+    return matched
+
+
+def run(host_count: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = Path(tmp) / "config"
+        config_path.write_text(generate_config(host_count), encoding="utf-8")
+        config = SshConfigParser.load_config(config_path)
+        hosts = config.hosts()
+
+        start = time.perf_counter()
+        naive = {host: naive_matching_blocks(config, host) for host in hosts}
+        naive_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        config.resolve_all()
+        indexed_time = time.perf_counter() - start
+
+        assert all(naive[host] == config.matching_blocks(host) for host in hosts)
+
+    print(f"hosts={len(hosts)} blocks={len(config.blocks)}")
+    print(f"  naive fnmatch:  {naive_time * 1000:9.1f} ms")
+    print(f"  resolve_all():  {indexed_time * 1000:9.1f} ms")
+    print(f"  speedup:        {naive_time / indexed_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
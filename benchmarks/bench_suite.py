@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: SSH config parsing, tray menu build, config loading and host lookup
+
+Generates synthetic SSH configs from 100 up to 50,000 Host blocks (TEST/PROD
+banners, wildcard DB-tunnel blocks, jump hosts with LocalForward chains)
+together with a matching config.yml and settings.xml in a temporary HOME,
+then times:
+
+    parse_cold      SshConfigParser.parse_ssh_config() with an empty cache
+    parse_cached    SshConfigParser.parse_ssh_config() on an unchanged file
+    create_menu     TrayIconManager.create_menu() with pystray stubbed out
+    load_cold       ConfigLoader.load(force_reload=True)
+    load_cached     ConfigLoader.load() on unchanged files
+    resolve         SshConfig.resolve() for 1,000 hosts
+    credentials     ConfigLoader.get_credentials_for_host() for 1,000 hosts
+    search          HostSearchIndex.search() for a fixed set of queries
+
+Each timing is the best of several repeats, in milliseconds. Results are
+compared with benchmarks/baseline.json and the run fails (exit code 1) when
+a timing is slower than baseline * (1 + threshold). Baselines are machine
+specific: record one with --save-baseline before comparing.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 100,1000,10000,50000]
+                                     [--threshold 0.5] [--save-baseline]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# Add src to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+DEFAULT_SIZES = (100, 1000, 10000, 50000)
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.5
+# Regressions smaller than this (ms) are timer noise, not regressions
+NOISE_FLOOR_MS = 0.5
+
+ENV_CODES = ("tf", "te", "pf", "pe")
+HOSTS_PER_JUMP = 50
+LOOKUP_SAMPLE = 1000
+SEARCH_QUERIES = ("app1", "it1pe", "login_prod", "app42it1te01", "ap", "xqzw", "db-tf")
+
+
+def generate_ssh_config(host_count: int) -> str:
+    """
+    Build a synthetic SSH config with host_count target hosts
+
+    Half of the targets sit under the TEST banner (tf/te), half under PROD
+    (pf/pe). Every HOSTS_PER_JUMP targets share a jump host whose
+    LocalForward chain exposes their SSH ports on localhost; the targets
+    connect to "localhost" on their forwarded port. Wildcard blocks add the
+    DB tunnels for each environment code.
+    """
+    lines = [
+        "Host *\n    ServerAliveInterval 60\n    StrictHostKeyChecking accept-new\n\n",
+        "# DB tunnels\n",
+    ]
+    for code, port in zip(ENV_CODES, (1524, 1523, 31524, 31523)):
+        lines.append(f"Host *it1{code}*\n    LocalForward {port} db-{code}.example:{port % 10000}\n\n")
+    lines.append("Host !login_* *it1p*\n    ServerAliveCountMax 5\n\n")
+
+    half = host_count // 2
+    for section, start, stop, codes in (("TEST", 0, half, ENV_CODES[:2]),
+                                        ("PROD", half, host_count, ENV_CODES[2:])):
+        lines.append(f"#############\n# {section}\n#############\n\n")
+        for group_start in range(start, stop, HOSTS_PER_JUMP):
+            group = range(group_start, min(group_start + HOSTS_PER_JUMP, stop))
+            jump = f"login_{section.lower()}{group_start // HOSTS_PER_JUMP}"
+            lines.append(f"Host {jump}\n    HostName {jump}.example.com\n    User deploy\n")
+            for i in group:
+                code = codes[i % 2]
+                lines.append(f"    LocalForward {20000 + i % 40000} app{i}it1{code}01:22\n")
+            lines.append("\n")
+            for i in group:
+                code = codes[i % 2]
+                lines.append(
+                    f"Host app{i}it1{code}01\n    HostName localhost\n    Port {20000 + i % 40000}\n\n"
+                )
+    return "".join(lines)
+
+
+def generate_config_yml(host_count: int) -> str:
+    """Build a config.yml with a few connections and per-environment credential mappings"""
+    lines = ["connections:\n"]
+    for i in range(0, host_count, max(1, host_count // 20)):
+        code = ENV_CODES[(i % 2) + (2 if i >= host_count // 2 else 0)]
+        lines.append(f"  - name: \"App {i}\"\n    loginServer: \"login_test0\"\n"
+                     f"    destServer: \"app{i}it1{code}01\"\n")
+    lines.append("credentialMappings:\n")
+    lines.append("  - hostPattern: \"*it1p*\"\n    serverId: \"corp-prod\"\n")
+    lines.append("  - hostPattern: \"login_prod*\"\n    serverId: \"corp-prod\"\n")
+    lines.append("  - hostPattern: \"*\"\n    serverId: \"corp\"\n")
+    return "".join(lines)
+
+
+SETTINGS_XML = """\
+<settings xmlns="http://maven.apache.org/SETTINGS/1.0.0">
+  <servers>
+    <server><id>corp</id><username>corp\\dev</username><password>test-secret</password></server>
+    <server><id>corp-prod</id><username>corp\\ops</username><password>prod-secret</password></server>
+  </servers>
+</settings>
+"""
+
+
+def _stub_gui_modules() -> None:
+    """
+    Replace pystray, PIL and pyautogui with inert stand-ins
+
+    The menu benchmark measures the application's own menu construction, not
+    a GUI backend, and must run headless.
+    """
+    class MenuItem:
+        def __init__(self, text, action=None, *args, **kwargs):
+            self.text = text
+            self.action = action
+
+    class Menu:
+        SEPARATOR = MenuItem("-")
+
+        def __init__(self, *items):
+            self.items = items
+
+    pystray = types.ModuleType("pystray")
+    pystray.Menu = Menu
+    pystray.MenuItem = MenuItem
+    pystray.Icon = object
+
+    pil = types.ModuleType("PIL")
+    pil.Image = types.ModuleType("PIL.Image")
+    pil.Image.Image = object
+    pil.ImageDraw = types.ModuleType("PIL.ImageDraw")
+
+    sys.modules.update({
+        "pystray": pystray,
+        "PIL": pil,
+        "PIL.Image": pil.Image,
+        "PIL.ImageDraw": pil.ImageDraw,
+        "pyautogui": types.ModuleType("pyautogui"),
+    })
+
+
+def _best_of(func: Callable[[], object], repeats: int) -> float:
+    """Run func repeats times and return the fastest run in milliseconds"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def run_size(host_count: int, home: Path) -> Dict[str, float]:
+    """
+    Benchmark one config size
+
+    Args:
+        host_count: Number of target hosts to generate
+        home: Temporary HOME directory holding .ssh/config and .m2/settings.xml
+
+    Returns:
+        Dict mapping benchmark name to milliseconds
+    """
+    from ssh_connection.config.config_loader import ConfigLoader
+    from ssh_connection.gui.tray_icon_manager import TrayIconManager
+    from ssh_connection.ssh.host_search import HostSearchIndex
+    from ssh_connection.ssh.ssh_config_parser import SshConfigParser
+
+    ssh_config = home / ".ssh" / "config"
+    ssh_config.write_text(generate_ssh_config(host_count), encoding="utf-8")
+    config_yml = home / "config.yml"
+    config_yml.write_text(generate_config_yml(host_count), encoding="utf-8")
+
+    repeats = 3 if host_count >= 10000 else 7
+    results: Dict[str, float] = {}
+
+    def parse_cold():
+        SshConfigParser.clear_cache()
+        SshConfigParser.parse_ssh_config()
+
+    results["parse_cold"] = _best_of(parse_cold, repeats)
+    results["parse_cached"] = _best_of(SshConfigParser.parse_ssh_config, repeats)
+    results["create_menu"] = _best_of(TrayIconManager().create_menu, repeats)
+
+    results["load_cold"] = _best_of(lambda: ConfigLoader.load(config_yml, force_reload=True), repeats)
+    results["load_cached"] = _best_of(lambda: ConfigLoader.load(config_yml), repeats)
+
+    config = SshConfigParser.load_config()
+    hosts = config.hosts()
+    sample = hosts[::max(1, len(hosts) // LOOKUP_SAMPLE)][:LOOKUP_SAMPLE]
+    config.resolve(sample[0])  # build the pattern index outside the timing
+
+    def resolve():
+        for host in sample:
+            config.resolve(host)
+
+    loader = ConfigLoader.load(config_yml)
+
+    def credentials():
+        loader._host_credentials.clear()  # time the pattern matching, not the memo
+        for host in sample:
+            loader.get_credentials_for_host(host)
+
+    results["resolve"] = _best_of(resolve, repeats)
+    results["credentials"] = _best_of(credentials, repeats)
+
+    index = HostSearchIndex.build(config, loader.connections)
+
+    def search():
+        for query in SEARCH_QUERIES:
+            index.search(query)
+
+    results["search"] = _best_of(search, repeats)
+    return {name: round(value, 4) for name, value in results.items()}
+
+
+def run(sizes: List[int]) -> Dict[str, Dict[str, float]]:
+    """
+    Run the suite for every size inside a throwaway HOME
+
+    Returns:
+        Dict mapping size (as string) to benchmark results
+    """
+    _stub_gui_modules()
+    results: Dict[str, Dict[str, float]] = {}
+    saved_env = {key: os.environ.get(key) for key in ("HOME", "USERPROFILE")}
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        (home / ".ssh").mkdir()
+        (home / ".m2").mkdir()
+        (home / ".m2" / "settings.xml").write_text(SETTINGS_XML, encoding="utf-8")
+        os.environ["HOME"] = os.environ["USERPROFILE"] = str(home)
+        try:
+            for size in sizes:
+                results[str(size)] = run_size(size, home)
+                print(f"{size:>6} hosts: " + "  ".join(
+                    f"{name} {value:.2f}ms" for name, value in results[str(size)].items()
+                ))
+        finally:
+            for key, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[Tuple[str, str, float, float]]:
+    """
+    Find benchmarks that regressed against a baseline
+
+    Args:
+        results: Fresh results, size -> name -> ms
+        baseline: Baseline results in the same layout
+        threshold: Allowed slowdown as a fraction (0.5 = 50% slower)
+
+    Returns:
+        List of (size, name, baseline ms, current ms) for each regression
+    """
+    regressions = []
+    for size, timings in results.items():
+        for name, current in timings.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            if current > previous * (1.0 + threshold) and current - previous > NOISE_FLOOR_MS:
+                regressions.append((size, name, previous, current))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SSH Connection Manager benchmark suite")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated host counts to benchmark")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="Baseline JSON file to compare with or write")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before failing, as a fraction (default 0.5)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write the results as the new baseline instead of comparing")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = run(sizes)
+
+    if args.save_baseline:
+        document = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for size, name, previous, current in regressions:
+        print(f"REGRESSION {name} @ {size} hosts: {previous:.2f}ms -> {current:.2f}ms "
+              f"(+{(current / previous - 1) * 100:.0f}%)")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold * 100:.0f}% of {args.baseline.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
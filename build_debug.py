@@ -82,6 +82,10 @@ def build_debug_exe():
         "--hiddenimport", "ssh_connection.ssh.ssh_launcher",
         "--hiddenimport", "ssh_connection.config.config_loader",
         "--hiddenimport", "ssh_connection.security.crypto_util",
+        "--hiddenimport", "ssh_connection.diagnostics.profiling",  # --profile in the field
+        "--hiddenimport", "cProfile",
+        "--hiddenimport", "pstats",
+        "--hiddenimport", "tracemalloc",
         "--icon", "resources/icon.ico",
         "--clean",
         "run.py"
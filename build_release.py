@@ -86,6 +86,10 @@ def build_exe():
         "--hiddenimport", "ssh_connection.ssh.ssh_launcher",
         "--hiddenimport", "ssh_connection.config.config_loader",
         "--hiddenimport", "ssh_connection.security.crypto_util",
+        "--hiddenimport", "ssh_connection.diagnostics.profiling",  # --profile in the field
+        "--hiddenimport", "cProfile",
+        "--hiddenimport", "pstats",
+        "--hiddenimport", "tracemalloc",
         "--hiddenimport", "pystray._win32",  # Fix for pystray on Windows
         "--hiddenimport", "PIL._tkinter_finder",  # Fix for Pillow
         "--icon", "resources/icon.ico",
@@ -15,6 +15,10 @@ setup(
         "pyautogui>=0.9.50",
         "psutil>=5.8.0",
     ],
+    extras_require={
+        # In-process SSH engine (pooled transports per jump host)
+        "inprocess": ["paramiko>=3.0"],
+    },
     entry_points={
         "console_scripts": [
             "ssh-connection=ssh_connection.main:main",
@@ -1,11 +1,10 @@
-import yaml
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
+from fnmatch import fnmatchcase
 import os
-
-from ..security.crypto_util import CryptoUtil
+import threading
 
 
 @dataclass
@@ -26,9 +25,58 @@ class MavenCredentials:
 
 class ConfigLoader:
     """Loader for application configuration from YAML files and Maven settings"""
+
+    # Shared parsed configuration: config_path -> (used_path, stat fingerprint, instance)
+    _shared: Dict[Optional[str], tuple] = {}
+    _shared_lock = threading.Lock()
     
-    def __init__(self, encrypted_user: Optional[str], connections: List[Dict[str, Any]], maven_credentials: Optional[MavenCredentials] = None):
+    def __init__(self, encrypted_user: Optional[str], connections: List[Dict[str, Any]],
+                 maven_credentials: Optional[MavenCredentials] = None,
+                 maven_servers: Optional[Dict[str, MavenCredentials]] = None,
+                 credential_mappings: Optional[List[Dict[str, str]]] = None,
+                 accept_new_host_keys: bool = False,
+                 control_persist: str = "10m",
+                 warm_hosts: Optional[List[str]] = None,
+                 port_conflict_policy: str = "reuse",
+                 log_levels: Optional[Dict[str, str]] = None,
+                 log_rotation: str = "5MB",
+                 log_backups: int = 5,
+                 dedupe_sessions: str = "forwards",
+                 close_sessions_on_exit: bool = False,
+                 terminal_backend: str = "auto",
+                 tmux_session: str = "ssh-connection",
+                 terminal_command: Optional[str] = None):
         self.encrypted_user = encrypted_user
+        self.accept_new_host_keys = accept_new_host_keys
+        self.control_persist = control_persist
+        # None means "the jump hosts of ~/.ssh/config"; an empty list disables warm-up
+        self.warm_hosts = list(warm_hosts) if warm_hosts is not None else None
+        # What to do when a LocalForward port is taken: reuse, skip, remap or abort
+        self.port_conflict_policy = port_conflict_policy.lower()
+        if self.port_conflict_policy not in ("reuse", "skip", "remap", "abort"):
+            print(f"Unknown portConflictPolicy '{port_conflict_policy}', using 'reuse'")
+            self.port_conflict_policy = "reuse"
+        # Logger name -> level, applied by the tray process (see diagnostics.logs)
+        self.log_levels = dict(log_levels or {})
+        self.log_rotation = log_rotation
+        self.log_backups = log_backups
+        # Which launches reuse a running session: forwards (hosts with forwards), all or off
+        self.dedupe_sessions = dedupe_sessions.lower()
+        if self.dedupe_sessions not in ("forwards", "all", "off"):
+            print(f"Unknown dedupeSessions '{dedupe_sessions}', using 'forwards'")
+            self.dedupe_sessions = "forwards"
+        self.close_sessions_on_exit = close_sessions_on_exit
+        # Where sessions open: auto (PowerShell on Windows, tmux elsewhere), powershell or tmux
+        self.terminal_backend = terminal_backend.lower()
+        if self.terminal_backend not in ("auto", "powershell", "tmux"):
+            print(f"Unknown terminalBackend '{terminal_backend}', using 'auto'")
+            self.terminal_backend = "auto"
+        self.tmux_session = tmux_session
+        self.terminal_command = terminal_command
+        self.maven_servers = maven_servers or {}
+        # Default credentials: explicit, else the first <server> in settings.xml
+        if maven_credentials is None and self.maven_servers:
+            maven_credentials = next(iter(self.maven_servers.values()))
         self.maven_credentials = maven_credentials
         self.connections = [
             ConnectionConfig(
@@ -38,75 +86,113 @@ class ConfigLoader:
             )
             for conn in connections
         ]
+        # Case-insensitive name index; the first connection with a given name wins
+        self._connections_by_name: Dict[str, ConnectionConfig] = {}
+        for conn in self.connections:
+            self._connections_by_name.setdefault(conn.name.lower(), conn)
+        self.credential_mappings = [
+            (mapping["hostPattern"].lower(), mapping["serverId"])
+            for mapping in (credential_mappings or [])
+        ]
+        for pattern, server_id in self.credential_mappings:
+            if server_id not in self.maven_servers:
+                print(f"Credential mapping '{pattern}' refers to unknown Maven server id: {server_id}")
+        # Memoized host -> credentials lookups
+        self._host_credentials: Dict[str, Optional[MavenCredentials]] = {}
+        # encryptedUser decrypted once, on first use
+        self._legacy_username: Optional[str] = None
     
     @staticmethod
-    def _load_maven_credentials(maven_settings_path: Optional[Path] = None) -> Optional[MavenCredentials]:
+    def _load_maven_servers(maven_settings_path: Optional[Path] = None) -> Dict[str, MavenCredentials]:
         """
-        Load credentials from Maven settings.xml file
+        Load every <server> entry from Maven settings.xml into an id-keyed index
+
+        The file is streamed with iterparse and every element is cleared at
+        its end tag (those of a <server> once its fields have been read), so
+        large settings files (mirrors, profiles, ...) are never held in
+        memory. Namespaced and un-namespaced files are both
+        supported.
         
         Args:
             maven_settings_path: Path to Maven settings.xml. If None, uses default ~/.m2/settings.xml
             
         Returns:
-            MavenCredentials if found, None otherwise
+            Dict mapping server id to MavenCredentials in file order, empty if none found
         """
         if maven_settings_path is None:
             # Default Maven settings location
-            home_dir = Path.home()
-            maven_settings_path = home_dir / ".m2" / "settings.xml"
+            maven_settings_path = ConfigLoader._default_maven_settings_path()
         
+        servers: Dict[str, MavenCredentials] = {}
         if not maven_settings_path.exists():
-            return None
+            return servers
         
         try:
-            tree = ET.parse(maven_settings_path)
-            root = tree.getroot()
-            
-            # Maven XML namespace
-            ns = {'maven': 'http://maven.apache.org/SETTINGS/1.1.0'}
-            
-            # Try to find servers section - handle both with and without namespace
-            servers = root.find('.//servers') or root.find('.//maven:servers', ns)
-            if servers is None:
-                return None
-            
-            # Get first server (assuming single server configuration)
-            server = servers.find('.//server') or servers.find('.//maven:server', ns)
-            if server is None:
-                return None
-            
-            # Extract server details
-            server_id_elem = server.find('id') or server.find('maven:id', ns)
-            username_elem = server.find('username') or server.find('maven:username', ns)
-            password_elem = server.find('password') or server.find('maven:password', ns)
-            
-            if server_id_elem is not None and username_elem is not None and password_elem is not None:
-                return MavenCredentials(
-                    server_id=server_id_elem.text.strip(),
-                    username=username_elem.text.strip(),
-                    password=password_elem.text.strip()
-                )
+            root = None
+            depth = 0
+            in_servers = False
+            fields: Dict[str, str] = {}
+
+            for event, elem in ET.iterparse(str(maven_settings_path), events=("start", "end")):
+                # Strip the Maven namespace if present: {http://maven.apache.org/SETTINGS/1.1.0}server -> server
+                tag = elem.tag.rsplit('}', 1)[-1]
+
+                if event == "start":
+                    depth += 1
+                    if root is None:
+                        root = elem
+                    elif depth == 2 and tag == "servers":
+                        in_servers = True
+                    elif depth == 3 and in_servers and tag == "server":
+                        fields = {}
+                    continue
+
+                depth -= 1
+                if in_servers:
+                    if depth == 3 and tag in ("id", "username", "password"):
+                        fields[tag] = (elem.text or "").strip()
+                    elif depth == 2 and tag == "server":
+                        if "id" in fields and "username" in fields and "password" in fields:
+                            servers.setdefault(fields["id"], MavenCredentials(
+                                server_id=fields["id"],
+                                username=fields["username"],
+                                password=fields["password"]
+                            ))
+                        elem.clear()
+                    elif depth == 1 and tag == "servers":
+                        in_servers = False
+                if not in_servers:
+                    # Outside <servers> nothing is read: drop each element (mirrors, profiles, ...) as it ends
+                    elem.clear()
+
+                if depth == 1:
+                    # Finished a top-level section (servers, mirrors, profiles, ...)
+                    root.clear()
         
         except Exception:
             # Silently fail if Maven settings can't be parsed
             pass
         
-        return None
+        return servers
     
     @staticmethod
-    def load(config_path: Optional[Path] = None) -> 'ConfigLoader':
+    def _default_maven_settings_path() -> Path:
+        """Get the default Maven settings location (~/.m2/settings.xml)"""
+        return Path.home() / ".m2" / "settings.xml"
+
+    @staticmethod
+    def _candidate_paths(config_path: Optional[Path] = None) -> List[Path]:
         """
-        Load configuration from YAML file
-        
+        Get the config.yml locations to try, in priority order
+
         Args:
-            config_path: Path to config file. If None, uses default resources/config.yml
-            
+            config_path: Explicit path to config file. If None, uses default resources/config.yml
+
         Returns:
-            ConfigLoader instance
+            List of candidate paths
         """
         import sys
-        import os
-        
+
         if config_path is None:
             # Handle both development and frozen executable environments
             if getattr(sys, 'frozen', False):
@@ -123,48 +209,151 @@ class ConfigLoader:
                 # When running as Python script (development)
                 project_root = Path(__file__).parent.parent.parent.parent
                 config_path = project_root / "resources" / "config.yml"
-        
+
         # Try multiple fallback locations
-        possible_paths = [
+        return [
             config_path,
             Path("resources/config.yml"),  # Current directory
             Path(__file__).parent.parent.parent.parent / "resources" / "config.yml",  # Project root
             Path(os.getcwd()) / "resources" / "config.yml",  # Working directory
         ]
-        
+
+    @staticmethod
+    def _stat_key(path: Path) -> Optional[tuple]:
+        """Get a (mtime_ns, size, inode) fingerprint for a file, None if it is missing"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    @staticmethod
+    def _fingerprint(config_path: Optional[Path], used_path: Path) -> tuple:
+        """
+        Fingerprint the files a loaded configuration came from
+
+        Covers config.yml and settings.xml, and whether each config.yml
+        candidate ranked above the one used exists, so creating one is noticed.
+        """
+        candidates = ConfigLoader._candidate_paths(config_path)
+        higher = candidates[:candidates.index(used_path)] if used_path in candidates else []
+        return (tuple(path.exists() for path in higher), ConfigLoader._stat_key(used_path),
+                ConfigLoader._stat_key(ConfigLoader._default_maven_settings_path()))
+
+    @staticmethod
+    def load(config_path: Optional[Path] = None, force_reload: bool = False) -> 'ConfigLoader':
+        """
+        Load configuration from YAML file
+
+        The parsed configuration is shared process-wide: repeat calls return the
+        same instance and only cost a stat() of config.yml, settings.xml and
+        the config.yml candidates ranked above the one in use. The files are
+        parsed again only when one of them changes on disk (or a higher-ranked
+        config.yml appears). Safe to call concurrently from the tray and
+        password threads.
+
+        Args:
+            config_path: Path to config file. If None, uses default resources/config.yml
+            force_reload: Ignore the cached instance and parse the files again
+
+        Returns:
+            ConfigLoader instance
+        """
+        cache_key = str(config_path) if config_path is not None else None
+
+        with ConfigLoader._shared_lock:
+            cached = ConfigLoader._shared.get(cache_key)
+            if cached is not None and not force_reload:
+                used_path, fingerprint, instance = cached
+                if fingerprint == ConfigLoader._fingerprint(config_path, used_path):
+                    return instance
+
+            instance, used_path = ConfigLoader._load_uncached(config_path)
+            fingerprint = ConfigLoader._fingerprint(config_path, used_path)
+            ConfigLoader._shared[cache_key] = (used_path, fingerprint, instance)
+            return instance
+
+    @staticmethod
+    def watched_paths(config_path: Optional[Path] = None) -> List[Path]:
+        """
+        Get the files a loaded configuration depends on
+
+        Args:
+            config_path: Path to config file. If None, uses default resources/config.yml
+
+        Returns:
+            The config.yml that load() would read (first existing candidate) and settings.xml
+        """
+        candidates = ConfigLoader._candidate_paths(config_path)
+        config_file = next((path for path in candidates if path.exists()), candidates[0])
+        return [config_file, ConfigLoader._default_maven_settings_path()]
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop the shared configuration so the next load() parses the files again"""
+        with ConfigLoader._shared_lock:
+            ConfigLoader._shared.clear()
+
+    @staticmethod
+    def _load_uncached(config_path: Optional[Path] = None) -> tuple:
+        """
+        Parse config.yml and Maven settings without consulting the shared cache
+
+        Args:
+            config_path: Path to config file. If None, uses default resources/config.yml
+
+        Returns:
+            Tuple of (ConfigLoader instance, path of the config file used)
+        """
+        possible_paths = ConfigLoader._candidate_paths(config_path)
+
         config_data = None
         used_path = None
-        
+
         for path in possible_paths:
             try:
                 if path.exists():
+                    import yaml
                     with open(path, 'r', encoding='utf-8') as file:
                         config_data = yaml.safe_load(file)
                     used_path = path
                     break
             except Exception:
                 continue
-        
+
         if config_data is None:
             # List all attempted paths for debugging
             attempted_paths = [str(p) for p in possible_paths]
             raise RuntimeError(f"Failed to load configuration from any of these paths: {attempted_paths}")
-        
+
         # Load Maven credentials
-        maven_credentials = ConfigLoader._load_maven_credentials()
-        
+        maven_servers = ConfigLoader._load_maven_servers()
+
         try:
             # Support both old format (with encryptedUser) and new format (with Maven credentials)
             encrypted_user = config_data.get("encryptedUser")
-            
+
             return ConfigLoader(
                 encrypted_user=encrypted_user,
                 connections=config_data["connections"],
-                maven_credentials=maven_credentials
-            )
+                maven_servers=maven_servers,
+                credential_mappings=config_data.get("credentialMappings"),
+                accept_new_host_keys=bool(config_data.get("acceptNewHostKeys", False)),
+                control_persist=str(config_data.get("controlPersist", "10m")),
+                warm_hosts=config_data.get("warmHosts"),
+                port_conflict_policy=str(config_data.get("portConflictPolicy", "reuse")),
+                log_levels=config_data.get("logLevels"),
+                log_rotation=str(config_data.get("logRotation", "5MB")),
+                log_backups=int(config_data.get("logBackups", 5)),
+                dedupe_sessions=str(config_data.get("dedupeSessions", "forwards")),
+                close_sessions_on_exit=bool(config_data.get("closeSessionsOnExit", False)),
+                terminal_backend=str(config_data.get("terminalBackend", "auto")),
+                tmux_session=str(config_data.get("tmuxSession", "ssh-connection")),
+                terminal_command=config_data.get("terminalCommand")
+            ), used_path
         except Exception as e:
             raise RuntimeError(f"Failed to parse configuration from {used_path}: {e}")
-    
+
     def get_connection_by_name(self, name: str) -> Optional[ConnectionConfig]:
         """
         Find connection configuration by name (case insensitive)
@@ -175,28 +364,90 @@ class ConfigLoader:
         Returns:
             ConnectionConfig if found, None otherwise
         """
-        for conn in self.connections:
-            if conn.name.lower() == name.lower():
-                return conn
-        return None
+        return self._connections_by_name.get(name.lower())
     
     def get_encrypted_user(self) -> Optional[str]:
         """Get the encrypted user string"""
         return self.encrypted_user
     
-    def get_username(self) -> Optional[str]:
+    def get_credentials_for_host(self, host: str) -> Optional[MavenCredentials]:
         """
-        Get username from Maven credentials or decrypted config
+        Get the Maven credentials that apply to a host
+
+        The first credentialMappings entry whose hostPattern matches selects the
+        server id; hosts without a mapping use the default credentials. Results
+        are memoized, so repeat lookups for a host are a single dict probe.
+
+        Args:
+            host: SSH host name
+
+        Returns:
+            MavenCredentials if available, None otherwise
+        """
+        key = host.lower()
+        try:
+            return self._host_credentials[key]
+        except KeyError:
+            pass
+
+        credentials = None
+        for pattern, server_id in self.credential_mappings:
+            if fnmatchcase(key, pattern):
+                credentials = self.maven_servers.get(server_id)
+                break
+        if credentials is None:
+            credentials = self.maven_credentials
+
+        self._host_credentials[key] = credentials
+        return credentials
+
+    @staticmethod
+    def _vault_entries(host: Optional[str]) -> tuple:
+        """
+        Get the credential vault entries that apply to a host
+
+        The vault is unlocked on first use (see Vault.ensure_unlocked); when
+        there is no vault file, or it stays locked, both entries are None.
+
+        Returns:
+            Tuple of (entry matching the host, "default" entry)
+        """
+        from ..security.vault import Vault
+
+        vault = Vault.shared()
+        if not vault.ensure_unlocked():
+            return None, None
+        return (vault.lookup(host) if host else None), vault.default()
+
+    def get_username(self, host: Optional[str] = None) -> Optional[str]:
+        """
+        Get username from the credential vault, Maven credentials or decrypted config
         Strips domain prefix (netsgroup\\) if present
-        
+
+        A vault entry for the host comes first, then Maven credentials, then
+        the vault's "default" entry, then the legacy encryptedUser.
+
+        Args:
+            host: SSH host name used to pick mapped credentials. If None, uses the default credentials
+
         Returns:
             Username string if available, None otherwise
         """
         username = None
-        if self.maven_credentials:
-            username = self.maven_credentials.username
+        entry, default = self._vault_entries(host)
+        credentials = self.get_credentials_for_host(host) if host else self.maven_credentials
+        if entry and entry.username:
+            username = entry.username
+        elif credentials:
+            username = credentials.username
+        elif default and default.username:
+            username = default.username
         elif self.encrypted_user:
-            username = CryptoUtil.decrypt(self.encrypted_user)
+            if self._legacy_username is None:
+                # The cryptography stack is only loaded for legacy encryptedUser configs
+                from ..security.crypto_util import CryptoUtil
+                self._legacy_username = CryptoUtil.decrypt(self.encrypted_user)
+            username = self._legacy_username
         
         if username and '\\' in username:
             # Extract username after domain prefix (e.g., netsgroup\a.farina -> a.farina)
@@ -204,15 +455,24 @@ class ConfigLoader:
         
         return username
     
-    def get_password(self) -> Optional[str]:
+    def get_password(self, host: Optional[str] = None) -> Optional[str]:
         """
-        Get password from Maven credentials
-        
+        Get password from the credential vault or Maven credentials
+
+        Args:
+            host: SSH host name used to pick mapped credentials. If None, uses the default credentials
+
         Returns:
-            Password string if available from Maven, None otherwise
+            Password string if available, None otherwise
         """
-        if self.maven_credentials:
-            return self.maven_credentials.password
+        entry, default = self._vault_entries(host)
+        if entry and entry.password:
+            return entry.password
+        credentials = self.get_credentials_for_host(host) if host else self.maven_credentials
+        if credentials:
+            return credentials.password
+        if default and default.password:
+            return default.password
         return None
     
     def get_maven_credentials(self) -> Optional[MavenCredentials]:
@@ -230,6 +490,7 @@ class ConfigLoader:
         Returns:
             Decrypted user string
         """
+        from ..security.crypto_util import CryptoUtil
         return CryptoUtil.decrypt(encrypted_user)
 
 
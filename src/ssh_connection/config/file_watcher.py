@@ -0,0 +1,197 @@
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def _stat_key(path: Path) -> Optional[tuple]:
+    """Get a (mtime_ns, size, inode) fingerprint for a file, None if it is missing"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class _Inotify:
+    """
+    Minimal ctypes binding to Linux inotify, watching directories
+
+    Directories are watched instead of the files themselves because editors
+    usually save by writing a temporary file and renaming it over the
+    original, which would silently end a watch on the old inode.
+    """
+
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _MASK = 0x002 | 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200
+    _IN_NONBLOCK = 0o4000
+    _IN_CLOEXEC = 0o2000000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(self._IN_NONBLOCK | self._IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._names: Dict[int, Set[str]] = {}
+
+    @staticmethod
+    def supported() -> bool:
+        import sys
+        return sys.platform.startswith("linux")
+
+    def watch(self, path: Path) -> bool:
+        """Watch the directory holding path; False if it cannot be watched"""
+        wd = self._add_watch(self.fd, os.fsencode(str(path.parent)), self._MASK)
+        if wd < 0:
+            return False
+        self._names.setdefault(wd, set()).add(path.name)
+        return True
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Wait for events on watched files
+
+        Returns:
+            True if one of the watched file names was touched
+        """
+        readable, _, _ = select.select([self.fd], [], [], max(timeout, 0.0))
+        if not readable:
+            return False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+
+        relevant = False
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, _, _, name_len = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + name_len].rstrip(b"\0").decode("utf-8", "replace")
+            offset += name_len
+            if name in self._names.get(wd, ()):
+                relevant = True
+        return relevant
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """
+    Watches a few configuration files and reports changes after they settle
+
+    On Linux, inotify wakes the watcher as soon as a file is written; on other
+    platforms (or for directories that do not exist yet) it falls back to
+    stat polling, which costs one stat() per file per interval. In both cases
+    the (mtime, size, inode) fingerprint decides whether a file really
+    changed, and a change is only reported once the files have been quiet
+    for the debounce delay, so an editor's write + rename is reported once.
+    """
+
+    def __init__(self, paths: List[Path], on_change: Callable[[Set[Path]], None],
+                 debounce: float = 0.3, poll_interval: float = 2.0):
+        """
+        Args:
+            paths: Files to watch (may not exist yet)
+            on_change: Called from the watcher thread with the set of changed paths
+            debounce: Seconds without further changes before on_change is called
+            poll_interval: Seconds between stat checks when inotify is not used
+        """
+        self.paths = [Path(path) for path in paths]
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend = "polling"
+        self._keys = {path: _stat_key(path) for path in self.paths}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify: Optional[_Inotify] = None
+
+    def start(self) -> None:
+        """Start watching in a daemon thread; returns immediately"""
+        if self._thread is not None:
+            return
+        if _Inotify.supported():
+            try:
+                inotify = _Inotify()
+                watched = [inotify.watch(path) for path in self.paths]
+                if any(watched):
+                    self._inotify = inotify
+                    self.backend = "inotify" if all(watched) else "inotify+polling"
+                else:
+                    inotify.close()
+            except (OSError, AttributeError) as e:
+                logger.debug(f"inotify unavailable, using stat polling: {e}")
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {len(self.paths)} configuration file(s) ({self.backend})")
+
+    def stop(self) -> None:
+        """Stop watching and wait for the watcher thread to exit"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def check(self) -> Set[Path]:
+        """
+        Compare file fingerprints with the last check
+
+        Returns:
+            Paths whose fingerprint changed (created, modified, replaced or deleted)
+        """
+        changed = set()
+        for path in self.paths:
+            key = _stat_key(path)
+            if key != self._keys[path]:
+                self._keys[path] = key
+                changed.add(path)
+        return changed
+
+    def _wait(self, timeout: float) -> None:
+        if self._inotify is not None:
+            self._inotify.wait(timeout)
+        else:
+            self._stop.wait(timeout)
+
+    def _run(self) -> None:
+        pending: Set[Path] = set()
+        quiet_since = 0.0
+        while not self._stop.is_set():
+            # With full inotify coverage there is nothing to poll; wake up now and then to notice stop()
+            if pending:
+                timeout = min(self.debounce, self.poll_interval)
+            else:
+                timeout = 1.0 if self.backend == "inotify" else self.poll_interval
+            self._wait(timeout)
+            if self._stop.is_set():
+                break
+
+            changed = self.check()
+            now = time.monotonic()
+            if changed:
+                pending |= changed
+                quiet_since = now
+                continue
+            if pending and now - quiet_since >= self.debounce:
+                reported, pending = pending, set()
+                try:
+                    self.on_change(reported)
+                except Exception as e:
+                    logger.error(f"Configuration reload failed: {e}", exc_info=True)
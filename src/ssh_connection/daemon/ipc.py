@@ -0,0 +1,341 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the request/reply format changes incompatibly
+PROTOCOL_VERSION = 1
+
+# Windows named pipe constants (see CreateNamedPipe)
+_PIPE_ACCESS_DUPLEX = 0x00000003
+_FILE_FLAG_FIRST_PIPE_INSTANCE = 0x00080000
+_PIPE_WAIT_BYTE = 0x00000000
+_PIPE_UNLIMITED_INSTANCES = 255
+_ERROR_PIPE_BUSY = 231
+_ERROR_PIPE_CONNECTED = 535
+
+_MAX_MESSAGE = 4 * 1024 * 1024
+
+
+class AlreadyRunningError(RuntimeError):
+    """Raised when another tray process already owns the control socket"""
+
+
+def runtime_dir() -> Path:
+    """Get the private directory holding the control socket and its token (~/.ssh_connection)"""
+    return Path.home() / ".ssh_connection"
+
+
+def control_address() -> str:
+    """
+    Get the control socket address for the current user
+
+    Returns:
+        Unix socket path on POSIX, named pipe path on Windows
+    """
+    if os.name == 'nt':
+        user = os.environ.get("USERNAME", "user")
+        return rf"\\.\pipe\ssh-connection-{user}"
+    return str(runtime_dir() / "daemon.sock")
+
+
+def _token_path() -> Path:
+    return runtime_dir() / "daemon.token"
+
+
+def _read_token() -> Optional[str]:
+    try:
+        return _token_path().read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def _read_line(read: Callable[[], bytes]) -> bytes:
+    """Read one newline-terminated message using read() for each chunk"""
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = read()
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > _MAX_MESSAGE:
+            raise ValueError("control message too large")
+    return data
+
+
+def send_command(command: str, timeout: float = 10.0, **arguments: Any) -> Optional[Dict[str, Any]]:
+    """
+    Forward a command to the running tray process
+
+    Cheap when no daemon runs: on POSIX it is one stat() of the socket path,
+    on Windows one failed pipe open.
+
+    Args:
+        command: Command name, e.g. "list-hosts"
+        timeout: Seconds to wait for the reply
+        **arguments: Command arguments (JSON serialisable)
+
+    Returns:
+        Reply dict with "ok" and "result" or "error" keys, None if no daemon is running
+
+    Raises:
+        OSError: If a daemon is running but does not answer, e.g. socket.timeout
+            after timeout seconds. The command may still be running there, so
+            callers must not run it again themselves
+    """
+    address = control_address()
+    token = _read_token()
+    if token is None:
+        return None
+    request = json.dumps({"version": PROTOCOL_VERSION, "token": token,
+                          "command": command, "args": arguments}).encode("utf-8") + b"\n"
+
+    try:
+        if os.name == 'nt':
+            reply = _send_pipe(address, request, timeout)
+        else:
+            reply = _send_unix(address, request, timeout)
+    except (FileNotFoundError, ConnectionRefusedError):
+        # No daemon, or a stale socket left by one that crashed
+        return None
+
+    if not reply:
+        raise ConnectionError("the running instance closed the connection without replying")
+    return json.loads(reply.decode("utf-8"))
+
+
+def _send_unix(address: str, request: bytes, timeout: float) -> bytes:
+    if not os.path.exists(address):
+        raise FileNotFoundError(address)
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall(request)
+        return _read_line(lambda: sock.recv(65536))
+
+
+def _send_pipe(address: str, request: bytes, timeout: float) -> bytes:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            pipe = open(address, "r+b", buffering=0)
+            break
+        except OSError as e:
+            # All pipe instances busy with another client: retry briefly
+            if getattr(e, "winerror", None) != _ERROR_PIPE_BUSY or time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+    with pipe:
+        pipe.write(request)
+        return _read_line(lambda: pipe.read(65536))
+
+
+class ControlServer:
+    """
+    Local control socket of the tray process
+
+    Accepts one JSON request per connection from CLI invocations and answers
+    with the handler's result, so commands run against the already loaded
+    configuration instead of a cold interpreter. Owning the socket also marks
+    the tray as running: a second instance fails to bind it. Requests must
+    carry the token stored in the user's private runtime directory.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[[Dict[str, Any]], Any]],
+                 address: Optional[str] = None):
+        """
+        Args:
+            handlers: Command name -> callable taking the argument dict and
+                returning a JSON serialisable result
+            address: Socket path or pipe name. If None, uses control_address()
+        """
+        self.handlers = handlers
+        self.address = address or control_address()
+        self._token = ""
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sock = None
+
+    def start(self) -> None:
+        """
+        Bind the control socket and serve requests in a daemon thread
+
+        Raises:
+            AlreadyRunningError: If another process is serving the socket
+        """
+        directory = runtime_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        if os.name != 'nt':
+            os.chmod(directory, 0o700)
+
+        if os.name == 'nt':
+            # Creating the first instance fails if another process owns the pipe
+            first = self._create_pipe(first=True)
+            target = lambda: self._serve_pipe(first)
+        else:
+            self._sock = self._bind_unix()
+            target = self._serve_unix
+
+        import secrets
+        self._token = secrets.token_hex(16)
+        token_path = _token_path()
+        token_path.write_text(self._token, encoding="utf-8")
+        if os.name != 'nt':
+            os.chmod(token_path, 0o600)
+
+        self._thread = threading.Thread(target=target, name="control-socket", daemon=True)
+        self._thread.start()
+        logger.info(f"Control socket listening on {self.address}")
+
+    def stop(self) -> None:
+        """Stop serving and remove the socket"""
+        self._stop.set()
+        if os.name == 'nt':
+            # Wake the blocking ConnectNamedPipe with a throwaway connection
+            try:
+                open(self.address, "r+b", buffering=0).close()
+            except OSError:
+                pass
+        elif self._sock is not None:
+            import socket
+            try:
+                # Wakes the accept() blocked in the server thread
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        try:
+            if _read_token() == self._token:
+                _token_path().unlink()
+        except OSError:
+            pass
+
+    def handle(self, raw: bytes) -> bytes:
+        """
+        Execute one request
+
+        Args:
+            raw: JSON request line
+
+        Returns:
+            JSON reply line
+        """
+        import secrets
+        try:
+            request = json.loads(raw.decode("utf-8"))
+            if not secrets.compare_digest(str(request.get("token", "")), self._token):
+                reply = {"ok": False, "error": "unauthorized"}
+            elif request.get("version") != PROTOCOL_VERSION:
+                reply = {"ok": False, "error": f"unsupported protocol version {request.get('version')}"}
+            else:
+                handler = self.handlers.get(request.get("command"))
+                if handler is None:
+                    reply = {"ok": False, "error": f"unknown command {request.get('command')!r}"}
+                else:
+                    reply = {"ok": True, "result": handler(request.get("args") or {})}
+        except Exception as e:
+            logger.error(f"Control command failed: {e}", exc_info=True)
+            reply = {"ok": False, "error": str(e)}
+        return json.dumps(reply).encode("utf-8") + b"\n"
+
+    def _bind_unix(self):
+        import socket
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(self.address)
+        except OSError:
+            # Socket file exists: refuse if someone answers, otherwise it is stale
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.address)
+            except OSError:
+                os.unlink(self.address)
+                sock.bind(self.address)
+            else:
+                sock.close()
+                raise AlreadyRunningError(f"Another instance is listening on {self.address}")
+            finally:
+                probe.close()
+        os.chmod(self.address, 0o600)
+        sock.listen(8)
+        return sock
+
+    def _serve_unix(self) -> None:
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._handle_unix_client, args=(conn,), daemon=True).start()
+
+    def _handle_unix_client(self, conn) -> None:
+        with conn:
+            try:
+                conn.settimeout(5.0)
+                request = _read_line(lambda: conn.recv(65536))
+                if request:
+                    conn.sendall(self.handle(request))
+            except OSError as e:
+                logger.debug(f"Control connection dropped: {e}")
+
+    def _create_pipe(self, first: bool = False):
+        import _winapi
+        flags = _PIPE_ACCESS_DUPLEX | (_FILE_FLAG_FIRST_PIPE_INSTANCE if first else 0)
+        try:
+            return _winapi.CreateNamedPipe(
+                self.address, flags, _PIPE_WAIT_BYTE, _PIPE_UNLIMITED_INSTANCES,
+                65536, 65536, 0, _winapi.NULL
+            )
+        except PermissionError:
+            if first:
+                raise AlreadyRunningError(f"Another instance is listening on {self.address}")
+            raise
+
+    def _serve_pipe(self, handle) -> None:
+        import _winapi
+        while True:
+            try:
+                _winapi.ConnectNamedPipe(handle, False)
+            except OSError as e:
+                # ERROR_PIPE_CONNECTED: the client arrived before we started waiting
+                if getattr(e, "winerror", None) != _ERROR_PIPE_CONNECTED:
+                    logger.debug(f"Control pipe connect failed: {e}")
+                    _winapi.CloseHandle(handle)
+                    if self._stop.is_set():
+                        return
+                    handle = self._create_pipe()
+                    continue
+            if self._stop.is_set():
+                _winapi.CloseHandle(handle)
+                return
+            threading.Thread(target=self._handle_pipe_client, args=(handle,), daemon=True).start()
+            # Next instance for the next client
+            handle = self._create_pipe()
+
+    def _handle_pipe_client(self, handle) -> None:
+        import _winapi
+        try:
+            request = _read_line(lambda: _winapi.ReadFile(handle, 65536)[0])
+            if request:
+                _winapi.WriteFile(handle, self.handle(request))
+                # Closing before the client has read would discard the reply; wait for its close
+                try:
+                    _winapi.ReadFile(handle, 1)
+                except OSError:
+                    pass
+        except OSError as e:
+            logger.debug(f"Control connection dropped: {e}")
+        finally:
+            _winapi.CloseHandle(handle)
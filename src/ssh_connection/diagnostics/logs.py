@@ -0,0 +1,217 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Logger whose records are written as JSON lines instead of text
+EVENTS_LOGGER = "ssh_connection.events"
+
+DEFAULT_ROTATION = "5MB"
+DEFAULT_BACKUPS = 5
+
+_TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+_WHEN_ALIASES = {"hourly": "H", "daily": "midnight", "weekly": "W0"}
+
+_events = logging.getLogger(EVENTS_LOGGER)
+_setup_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_handler_key: Optional[tuple] = None
+_atexit_registered = False
+
+
+def default_log_file() -> Path:
+    """Get the text log written by the tray process (~/ssh_connection_debug.log)"""
+    return Path.home() / "ssh_connection_debug.log"
+
+
+def events_file(log_file: Path) -> Path:
+    """Get the JSON-lines event log kept next to a text log"""
+    return log_file.with_name(log_file.stem + "_events.jsonl")
+
+
+def parse_rotation(rotation: str) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Parse a logRotation setting
+
+    Args:
+        rotation: A size ("5MB", "512KB", "1000000") or an interval
+                  ("hourly", "daily", "weekly" or a TimedRotatingFileHandler
+                  "when" value such as "midnight", "H" or "W6")
+
+    Returns:
+        Tuple of (max bytes, None) or (None, when)
+
+    Raises:
+        ValueError: If the setting is neither
+    """
+    text = str(rotation).strip()
+    match = re.fullmatch(r"(\d+)\s*([KMG]?B?)", text, re.IGNORECASE)
+    if match:
+        return int(match.group(1)) * _SIZE_UNITS[match.group(2).upper()], None
+    when = _WHEN_ALIASES.get(text.lower(), text)
+    if when.lower() == "midnight" or re.fullmatch(r"[SMHD]|W[0-6]", when, re.IGNORECASE):
+        return None, when.lower() if when.lower() == "midnight" else when.upper()
+    raise ValueError(f"Unknown logRotation '{rotation}', expected a size like 5MB or daily/hourly/weekly")
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Formats event records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+                  + f".{int(record.msecs):03d}",
+            "event": record.getMessage(),
+            "pid": record.process,
+            "thread": record.threadName,
+        }
+        event.update(getattr(record, "fields", {}))
+        return json.dumps(event, default=str)
+
+
+class _EventFilter(logging.Filter):
+    """Passes only event records, or everything but event records"""
+
+    def __init__(self, events: bool):
+        super().__init__()
+        self.events = events
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return (record.name == EVENTS_LOGGER) == self.events
+
+
+def _file_handler(path: Path, rotation: str, backups: int) -> logging.Handler:
+    try:
+        max_bytes, when = parse_rotation(rotation)
+    except ValueError as e:
+        print(f"{e}; using {DEFAULT_ROTATION}")
+        max_bytes, when = parse_rotation(DEFAULT_ROTATION)
+    if when is not None:
+        return logging.handlers.TimedRotatingFileHandler(str(path), when=when, backupCount=backups,
+                                                         encoding="utf-8", delay=True)
+    return logging.handlers.RotatingFileHandler(str(path), maxBytes=max_bytes, backupCount=backups,
+                                                encoding="utf-8", delay=True)
+
+
+def setup_logging(log_file: Optional[Path] = None, level: str = "DEBUG",
+                  module_levels: Optional[Dict[str, str]] = None,
+                  rotation: str = DEFAULT_ROTATION, backups: int = DEFAULT_BACKUPS,
+                  console: bool = False) -> Path:
+    """
+    Route logging through a queue to a background writer thread
+
+    Log calls only put the record on a queue; a QueueListener thread formats
+    it and writes the text log and, for EVENTS_LOGGER records, the
+    JSON-lines event log. Both files rotate by size or time. Calling this
+    again only rebuilds the writers when the file, rotation or console
+    settings changed; levels are always applied.
+
+    Args:
+        log_file: Text log. If None, uses default_log_file()
+        level: Root logger level
+        module_levels: Logger name -> level, e.g. {"ssh_connection.ssh": "INFO", "paramiko": "WARNING"}
+        rotation: Size or interval, see parse_rotation()
+        backups: Rotated files to keep
+        console: Also write text records to stderr
+
+    Returns:
+        The text log path
+    """
+    global _listener, _queue_handler, _handler_key, _atexit_registered
+
+    log_file = Path(log_file) if log_file else default_log_file()
+    key = (str(log_file), str(rotation), backups, console)
+    root = logging.getLogger()
+    with _setup_lock:
+        if key != _handler_key:
+            _stop_listener()
+
+            text_handler = _file_handler(log_file, rotation, backups)
+            text_handler.setFormatter(logging.Formatter(_TEXT_FORMAT))
+            text_handler.addFilter(_EventFilter(events=False))
+            event_handler = _file_handler(events_file(log_file), rotation, backups)
+            event_handler.setFormatter(JsonLineFormatter())
+            event_handler.addFilter(_EventFilter(events=True))
+            handlers = [text_handler, event_handler]
+            if console:
+                stream_handler = logging.StreamHandler()
+                stream_handler.setFormatter(logging.Formatter(_TEXT_FORMAT))
+                stream_handler.addFilter(_EventFilter(events=False))
+                handlers.append(stream_handler)
+
+            records: queue.Queue = queue.Queue(-1)
+            _queue_handler = logging.handlers.QueueHandler(records)
+            root.addHandler(_queue_handler)
+            _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+            _listener.start()
+            _handler_key = key
+            if not _atexit_registered:
+                atexit.register(shutdown_logging)
+                _atexit_registered = True
+
+        root.setLevel(level.upper())
+        # Events are recorded whatever level their parent package is set to
+        _events.setLevel(logging.INFO)
+        set_levels(module_levels or {})
+    return log_file
+
+
+def set_levels(levels: Dict[str, str]) -> None:
+    """
+    Set logger levels by name
+
+    Args:
+        levels: Logger name ("root" for the root logger) -> level name
+    """
+    for name, level in levels.items():
+        logger = logging.getLogger(None if name in ("", "root") else name)
+        try:
+            logger.setLevel(str(level).upper())
+        except ValueError:
+            logging.getLogger(__name__).warning(f"Unknown log level '{level}' for {name}")
+
+
+def _stop_listener() -> None:
+    global _listener, _queue_handler, _handler_key
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        # Drains the queue before the writer thread exits
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    _handler_key = None
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and close the log files"""
+    with _setup_lock:
+        _stop_listener()
+        _events.setLevel(logging.NOTSET)
+
+
+def log_event(event: str, **fields) -> None:
+    """
+    Record a structured event in the JSON-lines event log
+
+    Usage:
+        log_event("launch", host=name, method="pty", pid=process.pid)
+
+    Nothing is written unless setup_logging() has run in this process.
+
+    Args:
+        event: Event name: connect, launch or failure
+        **fields: JSON-serializable details
+    """
+    if _events.isEnabledFor(logging.INFO):
+        _events.info(event, extra={"fields": fields})
@@ -0,0 +1,240 @@
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class _NullSection:
+    """Shared no-op section used while profiling is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullSection':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section:
+    """Context manager returned by Profiler.section(); profiles the block"""
+
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> '_Section':
+        self.profiler.start(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.profiler.stop(self.name)
+        return False
+
+
+class _Running:
+    """State of the section being profiled"""
+
+    def __init__(self, name: str, profile, snapshot):
+        self.name = name
+        self.profile = profile
+        self.snapshot = snapshot
+        self.thread = threading.get_ident()
+        self.started = time.perf_counter()
+
+
+class Profiler:
+    """
+    On-demand cProfile/tracemalloc capture of named sections (--profile)
+
+    Each section name is profiled once per process (the first startup, the
+    first create_menu, the first connect) and written as soon as it ends:
+    a .pstats file for snakeviz/pstats and a .txt report with the top
+    functions by cumulative and own time and, with memory tracing, the top
+    allocation sites. Only one section runs at a time; a section started
+    while another is running, or on another thread, is skipped, so nested
+    calls cost nothing. Uses only the standard library, so it works in the
+    frozen executable.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.top = 30
+        self.directory: Optional[Path] = None
+        self.reports: List[Path] = []
+        self._running: Optional[_Running] = None
+        self._done: Set[str] = set()
+        self._stamp = ""
+        self._lock = threading.Lock()
+
+    def enable(self, directory: Optional[Path] = None, memory: bool = False, top: int = 30) -> None:
+        """
+        Start capturing sections
+
+        Args:
+            directory: Where reports go. If None, next to the log file
+            memory: Also trace allocations with tracemalloc (slows the process down)
+            top: Entries per report table
+        """
+        if directory is None:
+            from .logs import default_log_file
+            directory = default_log_file().parent
+        self.directory = Path(directory)
+        self.memory = memory
+        self.top = top
+        self._stamp = time.strftime("%Y%m%d-%H%M%S")
+        if memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop capturing; a running section is discarded"""
+        with self._lock:
+            running, self._running = self._running, None
+        if running is not None:
+            running.profile.disable()
+        if self.memory:
+            import tracemalloc
+            tracemalloc.stop()
+        self.enabled = False
+
+    def section(self, name: str):
+        """
+        Profile a block
+
+        Usage:
+            with profiler.section("create_menu"):
+                menu = self.create_menu()
+
+        Args:
+            name: Section name, used in the report file names
+
+        Returns:
+            Context manager profiling the block
+        """
+        if not self.enabled or name in self._done:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def start(self, name: str) -> bool:
+        """
+        Start profiling a section on the current thread
+
+        Returns:
+            False if profiling is disabled, the section already ran or another one is running
+        """
+        if not self.enabled:
+            return False
+        import cProfile
+
+        with self._lock:
+            if name in self._done or self._running is not None:
+                return False
+            self._done.add(name)
+            snapshot = None
+            if self.memory:
+                import tracemalloc
+                snapshot = tracemalloc.take_snapshot()
+            running = self._running = _Running(name, cProfile.Profile(), snapshot)
+        try:
+            running.profile.enable()
+        except ValueError as e:
+            # Another profiler (a debugger, an outer cProfile run) already owns the hook
+            logger.warning(f"Not profiling {name}: {e}")
+            with self._lock:
+                self._running = None
+            return False
+        return True
+
+    def stop(self, name: str) -> Optional[Path]:
+        """
+        Stop a section started by start() on this thread and write its reports
+
+        Returns:
+            Path of the text report, or None if the section was not running here
+        """
+        running = self._running
+        if running is None or running.name != name or running.thread != threading.get_ident():
+            return None
+        running.profile.disable()
+        elapsed = time.perf_counter() - running.started
+        with self._lock:
+            self._running = None
+        try:
+            return self._write(running, elapsed)
+        except OSError as e:
+            logger.error(f"Could not write profile of {name}: {e}")
+            return None
+
+    def _write(self, running: _Running, elapsed: float) -> Path:
+        import io
+        import platform
+        import pstats
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        base = self.directory / f"ssh_connection_profile-{self._stamp}-{running.name}"
+        stats_path = base.with_suffix(".pstats")
+        report_path = base.with_suffix(".txt")
+        running.profile.dump_stats(str(stats_path))
+
+        out = io.StringIO()
+        out.write(f"Section: {running.name}\n")
+        out.write(f"Wall time: {elapsed:.3f}s\n")
+        out.write(f"Python {platform.python_version()} on {platform.platform()}, "
+                  f"frozen={getattr(sys, 'frozen', False)}, pid={os.getpid()}\n")
+        out.write(f"Profile data: {stats_path.name}\n")
+        stats = pstats.Stats(running.profile, stream=out)
+        stats.strip_dirs()
+        for key in ("cumulative", "tottime"):
+            out.write(f"\n=== Top {self.top} by {key} ===\n")
+            stats.sort_stats(key).print_stats(self.top)
+
+        if running.snapshot is not None:
+            out.write(self._allocation_report(running.snapshot))
+
+        report_path.write_text(out.getvalue(), encoding="utf-8")
+        self.reports.append(report_path)
+        logger.info(f"Profile of {running.name} ({elapsed:.3f}s) written to {report_path}")
+        return report_path
+
+    def _allocation_report(self, before) -> str:
+        import tracemalloc
+
+        ignore = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ]
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        differences = after.compare_to(before.filter_traces(ignore), "lineno")
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"\n=== Top {self.top} allocation sites (growth during section) ===",
+                 f"Traced memory: {current / 1024:.1f} KiB now, {peak / 1024:.1f} KiB peak"]
+        for difference in differences[:self.top]:
+            frame = difference.traceback[0]
+            lines.append(f"{difference.size_diff / 1024:>10.1f} KiB {difference.count_diff:>+8} blocks  "
+                         f"{frame.filename}:{frame.lineno}")
+        return "\n".join(lines) + "\n"
+
+    def format_reports(self) -> str:
+        """List the reports written so far"""
+        if not self.reports:
+            return "No profile sections were captured."
+        return "Profile reports:\n" + "\n".join(f"  {path}" for path in self.reports)
+
+
+# Process-wide profiler, enabled by --profile
+profiler = Profiler()
@@ -0,0 +1,194 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+
+class Span(NamedTuple):
+    """One timed phase: monotonic start, duration in seconds and the host it belongs to"""
+    name: str
+    start: float
+    duration: float
+    host: Optional[str]
+    error: bool
+
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKET_BOUNDS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PhaseStats:
+    """Running count/sum/max plus a fixed-bucket latency histogram for one phase"""
+
+    __slots__ = ("count", "errors", "total", "maximum", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, duration: float, error: bool) -> None:
+        self.count += 1
+        self.errors += error
+        self.total += duration
+        if duration > self.maximum:
+            self.maximum = duration
+        self.buckets[bisect_left(BUCKET_BOUNDS_MS, duration * 1000.0)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a percentile (seconds) as the upper bound of the bucket it falls in"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                if index < len(BUCKET_BOUNDS_MS):
+                    return min(BUCKET_BOUNDS_MS[index] / 1000.0, self.maximum)
+                return self.maximum
+        return self.maximum
+
+
+class _ActiveSpan:
+    """Context manager returned by Tracer.span(); records on exit"""
+
+    __slots__ = ("tracer", "name", "host", "start")
+
+    def __init__(self, tracer: 'Tracer', name: str, host: Optional[str]):
+        self.tracer = tracer
+        self.name = name
+        self.host = host
+
+    def __enter__(self) -> '_ActiveSpan':
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.tracer.record(self.name, self.start, time.monotonic() - self.start, self.host, exc_type is not None)
+        return False
+
+
+class _NullSpan:
+    """Shared no-op span used while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Lightweight phase tracer for the connect path
+
+    Spans are timed with time.monotonic() and kept in a bounded ring buffer;
+    each phase also feeds a running histogram, so statistics cover every span
+    ever recorded while memory stays fixed. Recording is one deque append
+    and a few additions under a lock.
+    """
+
+    def __init__(self, capacity: int = 1024, enabled: bool = True):
+        self.enabled = enabled
+        self._spans: Deque[Span] = deque(maxlen=capacity)
+        self._phases: Dict[str, PhaseStats] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str, host: Optional[str] = None):
+        """
+        Time a phase
+
+        Usage:
+            with tracer.span("connect.spawn", host):
+                subprocess.Popen(...)
+
+        Args:
+            name: Phase name, e.g. "connect.config_load"
+            host: SSH host the phase belongs to
+
+        Returns:
+            Context manager recording the span on exit
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name, host)
+
+    def record(self, name: str, start: float, duration: float, host: Optional[str] = None,
+               error: bool = False) -> None:
+        """
+        Record a span measured elsewhere
+
+        Args:
+            name: Phase name
+            start: time.monotonic() at the start of the phase
+            duration: Duration in seconds
+            host: SSH host the phase belongs to
+            error: Whether the phase raised
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._spans.append(Span(name, start, duration, host, error))
+            stats = self._phases.get(name)
+            if stats is None:
+                stats = self._phases[name] = PhaseStats()
+            stats.add(duration, error)
+
+    def recent(self, limit: Optional[int] = None) -> List[Span]:
+        """Get the most recent spans, oldest first"""
+        with self._lock:
+            spans = list(self._spans)
+        return spans[-limit:] if limit else spans
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get per-phase statistics
+
+        Returns:
+            Dict mapping phase name to count, errors, mean, p50, p95 and max (seconds)
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "mean": stats.total / stats.count if stats.count else 0.0,
+                    "p50": stats.percentile(0.5),
+                    "p95": stats.percentile(0.95),
+                    "max": stats.maximum,
+                }
+                for name, stats in sorted(self._phases.items())
+            }
+
+    def format_summary(self) -> str:
+        """Render per-phase statistics as a text table"""
+        summary = self.summary()
+        if not summary:
+            return "No connect phases recorded yet."
+        lines = [f"{'phase':<28}{'count':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}"]
+        for name, stats in summary.items():
+            lines.append(
+                f"{name:<28}{stats['count']:>7}"
+                + "".join(f"{stats[key] * 1000:>8.1f}ms" for key in ("mean", "p50", "p95", "max"))
+                + (f"  ({stats['errors']} failed)" if stats["errors"] else "")
+            )
+        return "\n".join(lines)
+
+    def clear(self) -> None:
+        """Drop all recorded spans and statistics"""
+        with self._lock:
+            self._spans.clear()
+            self._phases.clear()
+
+
+# Process-wide tracer used by the launcher
+tracer = Tracer()
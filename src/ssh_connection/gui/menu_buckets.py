@@ -0,0 +1,122 @@
+import re
+from typing import Dict, List, Optional
+
+# Maximum number of entries shown in one submenu before it is split into buckets
+MAX_MENU_ITEMS = 30
+
+# Environment code in host names such as "stlit1tf01" or "app42it1pe03"; the "it<n>" part
+# keeps ordinary names ending in te/pe ("remote", "pipe") out of the groups
+_GROUP_RE = re.compile(r"it\d*(tf|te|pf|pe)\d*$", re.IGNORECASE)
+
+
+def host_group(host: str) -> Optional[str]:
+    """
+    Get the environment group code of a host name
+
+    Args:
+        host: SSH host name
+
+    Returns:
+        Upper-case code (TF, TE, PF or PE), or None if the name has none
+    """
+    match = _GROUP_RE.search(host)
+    return match.group(1).upper() if match else None
+
+
+class HostBucket:
+    """
+    A node of a tray submenu tree over a list of hosts
+
+    Small buckets are leaves listing their hosts. Larger ones are split on
+    first access, by environment group code when hosts carry one, otherwise
+    by name prefix (runs of prefixes are merged so no level exceeds
+    max_items entries). Children are only computed when asked for, so
+    building the top of the tree costs the same whatever the host count.
+    """
+
+    __slots__ = ("label", "hosts", "max_items", "_prefix_len", "_grouped", "_children")
+
+    def __init__(self, label: str, hosts: List[str], max_items: int = MAX_MENU_ITEMS,
+                 prefix_len: int = 0, grouped: bool = False):
+        """
+        Args:
+            label: Menu text of the bucket
+            hosts: Hosts in the bucket, in display order
+            max_items: Maximum entries per submenu
+            prefix_len: Length of the name prefix all hosts are known to share
+            grouped: Whether the hosts were already split by group code
+        """
+        self.label = label
+        self.hosts = hosts
+        self.max_items = max(2, max_items)
+        self._prefix_len = prefix_len
+        self._grouped = grouped
+        self._children: Optional[List['HostBucket']] = None
+
+    @property
+    def is_leaf(self) -> bool:
+        """True if the bucket lists its hosts directly"""
+        return len(self.hosts) <= self.max_items
+
+    def children(self) -> List['HostBucket']:
+        """
+        Get the sub-buckets of a non-leaf bucket, computing them on first use
+
+        Returns:
+            List of HostBucket (empty for leaves)
+        """
+        if self._children is None:
+            self._children = [] if self.is_leaf else self._split()
+        return self._children
+
+    def _split(self) -> List['HostBucket']:
+        if not self._grouped:
+            groups: Dict[str, List[str]] = {}
+            for host in self.hosts:
+                groups.setdefault(host_group(host) or "Other", []).append(host)
+            if len(groups) > 1:
+                labels = sorted(groups, key=lambda label: (label == "Other", label))
+                return [HostBucket(label, groups[label], self.max_items, self._prefix_len, grouped=True)
+                        for label in labels]
+
+        hosts = sorted(self.hosts, key=str.lower)
+        longest = max(len(host) for host in hosts)
+        prefix_len = self._prefix_len + 1
+        while prefix_len <= longest:
+            prefixes: Dict[str, List[str]] = {}
+            for host in hosts:
+                prefixes.setdefault(host[:prefix_len].lower(), []).append(host)
+            if len(prefixes) > 1:
+                return self._merge_prefixes(prefixes, prefix_len)
+            prefix_len += 1
+
+        # Same name repeated: plain fixed-size chunks
+        return [HostBucket(f"{hosts[i]} ({i + 1}-{min(i + self.max_items, len(hosts))})",
+                           hosts[i:i + self.max_items], self.max_items, longest, True)
+                for i in range(0, len(hosts), self.max_items)]
+
+    def _merge_prefixes(self, prefixes: Dict[str, List[str]], prefix_len: int) -> List['HostBucket']:
+        if len(prefixes) <= self.max_items:
+            return [HostBucket(f"{prefix}…", hosts, self.max_items, prefix_len, True)
+                    for prefix, hosts in prefixes.items()]
+
+        # Too many distinct prefixes: merge neighbours into ranges of similar size
+        target = -(-len(self.hosts) // self.max_items)
+        buckets = []
+        run: List[str] = []
+        run_hosts: List[str] = []
+        for prefix, hosts in prefixes.items():
+            run.append(prefix)
+            run_hosts.extend(hosts)
+            if len(run_hosts) >= target:
+                buckets.append(self._range_bucket(run, run_hosts, prefix_len))
+                run, run_hosts = [], []
+        if run:
+            buckets.append(self._range_bucket(run, run_hosts, prefix_len))
+        return buckets
+
+    def _range_bucket(self, run: List[str], hosts: List[str], prefix_len: int) -> 'HostBucket':
+        if len(run) == 1:
+            return HostBucket(f"{run[0]}…", hosts, self.max_items, prefix_len, True)
+        # The run's hosts only share prefix_len - 1 characters; the next split separates them again
+        return HostBucket(f"{run[0]}… – {run[-1]}…", hosts, self.max_items, prefix_len - 1, True)
@@ -1,13 +1,22 @@
 import pystray
 from PIL import Image, ImageDraw
+import logging
 import threading
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Set
 import os
 from pathlib import Path
 import sys
+import time
 
+from ..config.config_loader import ConfigLoader
 from ..ssh.ssh_config_parser import SshConfigParser
 from ..ssh.ssh_launcher import SshLauncher
+from ..ssh.control_master import ControlMasterManager
+from ..diagnostics.profiling import profiler
+from ..diagnostics.tracing import tracer
+from .menu_buckets import HostBucket
+
+logger = logging.getLogger(__name__)
 
 
 class TrayIconManager:
@@ -16,6 +25,11 @@ class TrayIconManager:
     def __init__(self):
         self.icon = None
         self.host_map = {}
+        self.warmer = None
+        self.watcher = None
+        self.control_server = None
+        self.reachability = None
+        self.sessions = None
     
     def create_icon_image(self) -> Image.Image:
         """
@@ -48,41 +62,169 @@ class TrayIconManager:
         # Parse SSH config to get host mapping
         self.host_map = SshConfigParser.parse_ssh_config()
         
-        # Create TEST section
+        # Create TEST and PROD sections; host entries are only built when a submenu is populated
         if self.host_map.get("TEST"):
-            test_items = []
-            for host in self.host_map["TEST"]:
-                # Fix lambda closure issue by using partial function
-                def make_connect_callback(hostname):
-                    return lambda icon, item: self.connect_to_host(hostname)
-                
-                test_items.append(
-                    pystray.MenuItem(host, make_connect_callback(host))
-                )
             menu_items.append(pystray.Menu.SEPARATOR)
-            menu_items.append(pystray.MenuItem("TEST", pystray.Menu(*test_items)))
+            menu_items.append(pystray.MenuItem("TEST", self._bucket_menu(HostBucket("TEST", self.host_map["TEST"]))))
         
-        # Create PROD section
         if self.host_map.get("PROD"):
-            prod_items = []
-            for host in self.host_map["PROD"]:
-                # Fix lambda closure issue by using partial function
-                def make_connect_callback(hostname):
-                    return lambda icon, item: self.connect_to_host(hostname)
-                
-                prod_items.append(
-                    pystray.MenuItem(host, make_connect_callback(host))
-                )
-            menu_items.append(pystray.MenuItem("PROD", pystray.Menu(*prod_items)))
+            menu_items.append(pystray.MenuItem("PROD", self._bucket_menu(HostBucket("PROD", self.host_map["PROD"]))))
+        
+        # Live ControlMaster sessions, rebuilt each time the submenu opens
+        if ControlMasterManager.available():
+            menu_items.append(pystray.Menu.SEPARATOR)
+            menu_items.append(pystray.MenuItem("Jump sessions", pystray.Menu(self._jump_session_items)))
+        
+        # Launched ssh sessions with their last CPU/memory sample
+        if self.sessions is not None:
+            if not ControlMasterManager.available():
+                menu_items.append(pystray.Menu.SEPARATOR)
+            menu_items.append(pystray.MenuItem("Open sessions", pystray.Menu(self._session_items)))
         
         # Add separator and exit option
         menu_items.append(pystray.Menu.SEPARATOR)
+        menu_items.append(pystray.MenuItem("Diagnostics", pystray.Menu(self._diagnostics_items)))
         menu_items.append(pystray.MenuItem("Settings", self.open_settings))
+        menu_items.append(pystray.MenuItem("Reload configuration", lambda icon, item: self.reload_configuration()))
         menu_items.append(pystray.MenuItem("Reboot", self.reboot_application))
         menu_items.append(pystray.MenuItem("Exit", self.quit_application))
         
         return pystray.Menu(*menu_items)
     
+    def _bucket_menu(self, bucket: HostBucket) -> pystray.Menu:
+        """
+        Create a dynamic submenu for a bucket of hosts
+        
+        The items are generated the first time pystray asks for them and then
+        reused, so large sections cost nothing until they are populated and
+        nested buckets split themselves only when reached.
+        
+        Args:
+            bucket: Hosts to list, split into nested buckets when too many
+            
+        Returns:
+            pystray.Menu whose items are built on demand
+        """
+        cache = []
+        
+        def make_connect_callback(hostname):
+            # Starting a jump host's ControlMaster can take seconds: keep the menu responsive
+            return lambda icon, item: threading.Thread(target=self.connect_to_host, args=(hostname,),
+                                                       name=f"connect-{hostname}", daemon=True).start()
+        
+        def make_label(hostname):
+            # Evaluated each time pystray renders the menu, so badges follow the probe results
+            return lambda item: self._host_label(hostname)
+        
+        def items():
+            if not cache:
+                if bucket.is_leaf:
+                    cache.extend(pystray.MenuItem(make_label(host), make_connect_callback(host))
+                                 for host in bucket.hosts)
+                else:
+                    cache.extend(pystray.MenuItem(f"{child.label} ({len(child.hosts)})", self._bucket_menu(child))
+                                 for child in bucket.children())
+            return cache
+        
+        return pystray.Menu(items)
+    
+    def _host_label(self, host: str) -> str:
+        """Get a host's menu text with its reachability badge (none until probed)"""
+        if self.reachability is None:
+            return host
+        result = self.reachability.get(host)
+        if result is None:
+            return host
+        return f"● {host}" if result.up else f"○ {host} (down)"
+    
+    def _jump_session_items(self) -> List[pystray.MenuItem]:
+        """
+        Build the items of the "Jump sessions" submenu
+        
+        Returns:
+            One entry per live ControlMaster with a "Close" action
+        """
+        masters = ControlMasterManager.shared().live_masters()
+        
+        def make_close_callback(hostname):
+            return lambda icon, item: ControlMasterManager.shared().stop(hostname)
+        
+        items = []
+        for master in masters:
+            label = f"{master.host} (pid {master.pid})" if master.pid else master.host
+            items.append(pystray.MenuItem(label, pystray.Menu(
+                pystray.MenuItem("Close", make_close_callback(master.host))
+            )))
+        
+        # Warm-up progress for jump hosts that are not live (yet)
+        live = {master.host for master in masters}
+        if self.warmer is not None:
+            for host, state in self.warmer.status().items():
+                if host not in live and state != "ready":
+                    items.append(pystray.MenuItem(f"{host}: warm-up {state}", None, enabled=False))
+        
+        if not items:
+            return [pystray.MenuItem("No live sessions", None, enabled=False)]
+        return items
+    
+    def _session_items(self) -> List[pystray.MenuItem]:
+        """
+        Build the items of the "Open sessions" submenu
+        
+        Returns:
+            One entry per tracked ssh session with a "Close" action, then "Close all"
+        """
+        usage = {sample.pid: sample for sample in self.sessions.usage()}
+        
+        def make_close_callback(pid):
+            return lambda icon, item: self.sessions.close(pid)
+        
+        items = []
+        for session in self.sessions.sessions():
+            label = session.describe()
+            sample = usage.get(session.ssh_pid or session.pid)
+            if sample is not None:
+                label += f" - {sample.cpu_percent:.1f}% CPU, {sample.rss / 1048576:.0f} MiB"
+            items.append(pystray.MenuItem(label, pystray.Menu(
+                pystray.MenuItem("Close", make_close_callback(session.pid))
+            )))
+        
+        if not items:
+            return [pystray.MenuItem("No open sessions", None, enabled=False)]
+        items.append(pystray.Menu.SEPARATOR)
+        items.append(pystray.MenuItem("Close all sessions", lambda icon, item: self.sessions.close_all()))
+        return items
+    
+    def _diagnostics_items(self) -> List[pystray.MenuItem]:
+        """
+        Build the items of the "Diagnostics" submenu
+        
+        Returns:
+            One disabled line per traced connect phase plus a log export action
+        """
+        summary = tracer.summary()
+        items = [
+            pystray.MenuItem(
+                f"{name}: {stats['count']}x, p50 {stats['p50'] * 1000:.0f}ms, "
+                f"p95 {stats['p95'] * 1000:.0f}ms, max {stats['max'] * 1000:.0f}ms",
+                None, enabled=False
+            )
+            for name, stats in summary.items()
+        ]
+        if not items:
+            items.append(pystray.MenuItem("No connections traced yet", None, enabled=False))
+        if self.reachability is not None:
+            results = [result for result in map(self.reachability.get, self._menu_hosts()) if result is not None]
+            up = sum(1 for result in results if result.up)
+            items.append(pystray.Menu.SEPARATOR)
+            items.append(pystray.MenuItem(f"Reachability: {up} up, {len(results) - up} down", None, enabled=False))
+            items.append(pystray.MenuItem("Check hosts now", lambda icon, item: self.check_hosts_now()))
+        items.append(pystray.Menu.SEPARATOR)
+        items.append(pystray.MenuItem(
+            "Write report to log", lambda icon, item: logger.info("Connect phase timings:\n" + tracer.format_summary())
+        ))
+        return items
+    
     def open_settings(self, icon: pystray.Icon, item) -> None:
         """Open the SSH config file in the default editor"""
         try:
@@ -101,20 +243,25 @@ class TrayIconManager:
         Args:
             host: SSH hostname to connect to
         """
+        from ..diagnostics.logs import log_event
+        
         print(f"Connecting to {host}...")
-        SshLauncher.connect(host)
+        log_event("connect", host=host, source="tray")
+        with profiler.section("connect"):
+            SshLauncher.connect(host)
     
     def reboot_application(self, icon: pystray.Icon, item) -> None:
         """Restart the application"""
         import subprocess
-        import logging
-        
-        logging.info("Rebooting application...")
+        logger.info("Rebooting application...")
         print("Rebooting application...")
         
         try:
             # Stop the tray icon first
             self.icon.stop()
+            # Release the control socket so the new instance does not see this one as running
+            if self.control_server is not None:
+                self.control_server.stop()
             
             if getattr(sys, 'frozen', False):
                 # Running as compiled executable - use batch launcher for reliability
@@ -124,7 +271,7 @@ class TrayIconManager:
                 
                 if launcher_script.exists():
                     # Use the batch launcher (more reliable for PyInstaller)
-                    logging.info(f"Using batch launcher: {launcher_script}")
+                    logger.info(f"Using batch launcher: {launcher_script}")
                     subprocess.Popen(
                         [str(launcher_script)],
                         shell=True,
@@ -133,7 +280,7 @@ class TrayIconManager:
                     )
                 else:
                     # Fallback: direct exe launch with proper working directory
-                    logging.info(f"Launcher not found, direct restart: {exe_path}")
+                    logger.info(f"Launcher not found, direct restart: {exe_path}")
                     subprocess.Popen(
                         [str(exe_path)],
                         creationflags=subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS,
@@ -143,13 +290,13 @@ class TrayIconManager:
                 # Running as Python script - simple restart
                 executable = sys.executable
                 args = [executable] + sys.argv
-                logging.info(f"Restarting Python script: {' '.join(args)}")
+                logger.info(f"Restarting Python script: {' '.join(args)}")
                 subprocess.Popen(
                     args,
                     creationflags=subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
                 )
             
-            logging.info("Reboot initiated, exiting current instance")
+            logger.info("Reboot initiated, exiting current instance")
             print("Reboot initiated successfully")
             
             # Exit cleanly
@@ -157,7 +304,7 @@ class TrayIconManager:
             
         except Exception as e:
             error_msg = f"Error rebooting application: {e}"
-            logging.error(error_msg, exc_info=True)
+            logger.error(error_msg, exc_info=True)
             print(error_msg)
             
             # Show error notification
@@ -180,22 +327,42 @@ class TrayIconManager:
             item: The menu item that was clicked
         """
         print("Quitting application...")
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.reachability is not None:
+            self.reachability.stop()
+        if self.sessions is not None:
+            self.sessions.stop_monitor()
+            try:
+                if ConfigLoader.load().close_sessions_on_exit:
+                    self.sessions.close_all()
+            except Exception as e:
+                logger.error(f"Closing ssh sessions failed: {e}")
+        if self.control_server is not None:
+            self.control_server.stop()
+        # Zero the vault key and any decrypted credentials before exiting
+        from ..security.vault import Vault
+        Vault.shared().lock()
         icon.stop()
     
-    def init_tray(self) -> None:
-        """Initialize and start the system tray icon"""
-        import logging
+    def init_tray(self, on_ready: Optional[Callable[[], None]] = None) -> None:
+        """
+        Initialize and start the system tray icon
         
+        Args:
+            on_ready: Called from a background thread once the icon is visible
+        """
         try:
-            logging.info("Creating tray icon image...")
+            logger.info("Creating tray icon image...")
             # Create icon image
             icon_image = self.create_icon_image()
             
-            logging.info("Creating tray menu...")
+            logger.info("Creating tray menu...")
             # Create menu
-            menu = self.create_menu()
+            with profiler.section("create_menu"):
+                menu = self.create_menu()
             
-            logging.info("Creating pystray icon...")
+            logger.info("Creating pystray icon...")
             # Create and start tray icon
             self.icon = pystray.Icon(
                 "SSH Connection Manager",
@@ -206,16 +373,22 @@ class TrayIconManager:
             test_count = len(self.host_map.get('TEST', []))
             prod_count = len(self.host_map.get('PROD', []))
             
-            logging.info(f"Starting SSH Connection Manager with {test_count} TEST hosts and {prod_count} PROD hosts")
+            logger.info(f"Starting SSH Connection Manager with {test_count} TEST hosts and {prod_count} PROD hosts")
             print(f"Starting SSH Connection Manager with {test_count} TEST hosts and {prod_count} PROD hosts")
             
+            def setup(icon: pystray.Icon) -> None:
+                # pystray leaves the icon hidden when a setup callback is given
+                icon.visible = True
+                if on_ready is not None:
+                    on_ready()
+            
             # Run the tray icon (this blocks)
-            logging.info("Running tray icon (this will block)...")
-            self.icon.run()
+            logger.info("Running tray icon (this will block)...")
+            self.icon.run(setup=setup)
             
         except Exception as e:
             error_msg = f"Error initializing tray icon: {e}"
-            logging.error(error_msg, exc_info=True)
+            logger.error(error_msg, exc_info=True)
             print(error_msg)
             
             # Show error notification if possible
@@ -242,6 +415,106 @@ class TrayIconManager:
         thread.start()
         return thread
     
+    def start_watcher(self) -> None:
+        """Reload the menu automatically when ~/.ssh/config, config.yml or settings.xml change"""
+        from ..config.file_watcher import FileWatcher
+        
+        if self.watcher is None:
+            paths = [SshConfigParser.default_config_path()] + ConfigLoader.watched_paths()
+            self.watcher = FileWatcher(paths, self.reload_configuration)
+            self.watcher.start()
+    
+    def start_reachability(self) -> None:
+        """Probe every host in the background and badge menu entries as up or down"""
+        from ..ssh.reachability import ReachabilityChecker
+        
+        if self.reachability is None:
+            self.reachability = ReachabilityChecker.shared()
+            self.reachability.start(on_change=self.refresh_menu)
+    
+    def start_sessions(self) -> None:
+        """Adopt ssh sessions left running by a previous instance and sample their usage"""
+        from ..ssh.sessions import SessionRegistry
+        
+        if not SessionRegistry.available():
+            return
+        self.sessions = SessionRegistry.shared()
+        try:
+            config = SshConfigParser.load_config()
+            hosts = self._menu_hosts()
+            forwards = {}
+            for host in hosts:
+                resolved = config.resolve(host)
+                ports = [forward.listen_port for forward in list(resolved.local_forwards) + list(resolved.dynamic_forwards)]
+                if ports:
+                    forwards[host] = tuple(ports)
+            self.sessions.adopt_running(hosts, forwards)
+        except Exception as e:
+            logger.error(f"Adopting running sessions failed: {e}")
+        self.sessions.start_monitor()
+        self.refresh_menu()
+    
+    def check_hosts_now(self) -> None:
+        """Re-probe every host now instead of waiting for cached results to expire"""
+        def run():
+            try:
+                self.reachability.check(self._menu_hosts(), force=True)
+            except Exception as e:
+                logger.error(f"Reachability check failed: {e}")
+            self.refresh_menu()
+        
+        if self.reachability is not None:
+            threading.Thread(target=run, name="reachability-now", daemon=True).start()
+    
+    def _menu_hosts(self) -> List[str]:
+        return list(dict.fromkeys(host for hosts in self.host_map.values() for host in hosts))
+    
+    def reload_configuration(self, changed_paths: Optional[Set[Path]] = None) -> None:
+        """
+        Re-read changed configuration files and swap in an updated menu
+        
+        Replaces a full application reboot: the SSH config is parsed again,
+        the host map diffed against the current one and the menu only
+        rebuilt when hosts were added, removed or moved.
+        
+        Args:
+            changed_paths: Files that changed. If None, everything is reloaded
+        """
+        started = time.monotonic()
+        ssh_config_path = SshConfigParser.default_config_path()
+        
+        if changed_paths is None or any(path != ssh_config_path for path in changed_paths):
+            try:
+                config = ConfigLoader.load()
+                logger.info(f"Reloaded configuration with {len(config.connections)} connections")
+                from ..diagnostics.logs import set_levels
+                set_levels(config.log_levels)
+            except Exception as e:
+                logger.error(f"Keeping previous configuration, reload failed: {e}")
+        
+        if changed_paths is None or ssh_config_path in changed_paths:
+            old_map = self.host_map
+            new_map = SshConfigParser.parse_ssh_config()
+            changes = SshConfigParser.diff_host_maps(old_map, new_map)
+            for section, (added, removed) in changes.items():
+                logger.info(f"{section}: {len(added)} host(s) added, {len(removed)} removed")
+            if changes:
+                if self.icon is not None:
+                    # Setting the menu makes pystray rebuild the native menu
+                    self.icon.menu = self.create_menu()
+                else:
+                    self.host_map = new_map
+        
+        logger.info(f"Configuration reload took {(time.monotonic() - started) * 1000:.1f}ms")
+    
+    def refresh_menu(self) -> None:
+        """Redraw the menu so dynamic entries (e.g. warm-up status) are current"""
+        if self.icon is not None:
+            try:
+                self.icon.update_menu()
+            except Exception:
+                pass
+    
     def stop(self) -> None:
         """Stop the tray icon"""
         if self.icon:
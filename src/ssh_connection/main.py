@@ -12,35 +12,48 @@ import sys
 import argparse
 import os
 from pathlib import Path
+from typing import Optional
 
-from .gui.tray_icon_manager import TrayIconManager
+# CLI paths only import what they use: the tray (pystray, PIL), GUI automation
+# (pyautogui) and crypto stacks are loaded on first use, not at startup.
 from .ssh.ssh_config_parser import SshConfigParser
-from .ssh.ssh_launcher import SshLauncher
-from .config.config_loader import ConfigLoader
+from .diagnostics.profiling import profiler
+from .diagnostics.tracing import tracer
 
 
 class SshConnectionApp:
     """Main SSH Connection Manager application"""
     
     def __init__(self):
-        self.tray_manager = TrayIconManager()
+        self.tray_manager = None
+        self.control_server = None
     
     def run(self) -> None:
         """Run the application with system tray interface"""
+        # With --profile, startup is captured up to the point the tray takes over
+        profiler.start("startup")
         import logging
+        from .config.config_loader import ConfigLoader
+        from .diagnostics.logs import log_event, setup_logging
+        from .gui.tray_icon_manager import TrayIconManager
+        from .security.vault import Vault
+        from .ssh.prewarm import JumpHostWarmer
+        
+        logger = logging.getLogger(__name__)
+        self.tray_manager = TrayIconManager()
+        # Lookups run on menu and warm-up threads: never prompt on the console that started the tray
+        Vault.shared().interactive = False
         
-        # Setup logging for debugging
-        log_file = Path.home() / "ssh_connection_debug.log"
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler() if not getattr(sys, 'frozen', False) else logging.NullHandler()
-            ]
-        )
+        # Log calls only enqueue records; a background thread writes and rotates the files
+        console = not getattr(sys, 'frozen', False)
+        log_file = setup_logging(console=console)
         
-        logging.info("SSH Connection Manager starting...")
+        logger.info("SSH Connection Manager starting...")
+        
+        # Own the control socket: refuses a second tray and serves CLI invocations
+        if not self._start_control_server():
+            profiler.stop("startup")
+            return
         
         # Hide console window when running as executable (after logging setup)
         if os.name == 'nt' and getattr(sys, 'frozen', False):  # Windows and running as exe
@@ -62,23 +75,45 @@ class SshConnectionApp:
         
         try:
             # Test configuration loading
-            logging.info("Loading configuration...")
+            logger.info("Loading configuration...")
             config = ConfigLoader.load()
-            logging.info(f"Loaded configuration with {len(config.connections)} connections")
+            logger.info(f"Loaded configuration with {len(config.connections)} connections")
+            # Rotation and per-module levels from config.yml
+            setup_logging(log_file, module_levels=config.log_levels, rotation=config.log_rotation,
+                          backups=config.log_backups, console=console)
             
             # Test SSH config parsing
-            logging.info("Parsing SSH configuration...")
+            logger.info("Parsing SSH configuration...")
             host_map = SshConfigParser.parse_ssh_config()
             total_hosts = sum(len(hosts) for hosts in host_map.values())
-            logging.info(f"Parsed SSH config with {total_hosts} hosts in {len(host_map)} sections")
+            logger.info(f"Parsed SSH config with {total_hosts} hosts in {len(host_map)} sections")
+            
+            # Warm up jump hosts in the background once the tray icon is visible
+            warmer = JumpHostWarmer.from_config()
+            warmer.on_change = self.tray_manager.refresh_menu
+            self.tray_manager.warmer = warmer
+            self.tray_manager.control_server = self.control_server
+            
+            def on_ready() -> None:
+                warmer.start()
+                # Up/down badges for the host menus, refreshed when results expire
+                self.tray_manager.start_reachability()
+                # Track ssh sessions, including those a previous instance left running
+                self.tray_manager.start_sessions()
+                # Pick up edits to the SSH config and credentials without a reboot
+                self.tray_manager.start_watcher()
+            
+            profiler.stop("startup")
             
             # Start tray icon
-            logging.info("Initializing system tray...")
-            self.tray_manager.init_tray()
+            logger.info("Initializing system tray...")
+            self.tray_manager.init_tray(on_ready=on_ready)
             
         except Exception as e:
+            profiler.stop("startup")
             error_msg = f"Error starting application: {e}"
-            logging.error(error_msg, exc_info=True)
+            logger.error(error_msg, exc_info=True)
+            log_event("failure", stage="startup", error=str(e))
             
             # Show error message in popup if running as exe
             if getattr(sys, 'frozen', False):
@@ -95,6 +130,282 @@ class SshConnectionApp:
             
             sys.exit(1)
     
+    def _start_control_server(self) -> bool:
+        """
+        Start serving CLI commands over the local control socket
+        
+        Returns:
+            False if another tray instance is already running
+        """
+        import logging
+        from .daemon.ipc import AlreadyRunningError, ControlServer
+        
+        self.control_server = ControlServer(self.control_handlers())
+        try:
+            self.control_server.start()
+        except AlreadyRunningError:
+            message = "SSH Connection Manager is already running (see the system tray)."
+            logging.getLogger(__name__).info(message)
+            print(message)
+            if getattr(sys, 'frozen', False) and os.name == 'nt':
+                try:
+                    import ctypes
+                    ctypes.windll.user32.MessageBoxW(0, message, "SSH Connection Manager", 0x40)
+                except:
+                    pass
+            return False
+        except OSError as e:
+            # CLI forwarding is a convenience; the tray works without it
+            logging.getLogger(__name__).warning(f"Control socket unavailable: {e}")
+            self.control_server = None
+        return True
+    
+    def control_handlers(self) -> dict:
+        """
+        Get the commands the tray process serves to CLI invocations
+        
+        Returns:
+            Dict mapping command name to a handler taking the argument dict
+        """
+        def connect(args):
+            # Starting a ControlMaster can outlast the CLI's reply timeout: reply at once
+            import threading
+            threading.Thread(target=self.tray_manager.connect_to_host, args=(args["host"],),
+                             name=f"connect-{args['host']}", daemon=True).start()
+            return f"Connecting to {args['host']}..."
+        
+        def quick_connect(args):
+            from .ssh.host_search import HostSearchIndex
+            results = HostSearchIndex.for_current_config().search(args["query"], 1)
+            if not results:
+                return f"No hosts matching '{args['query']}'"
+            return connect({"host": results[0].host})
+        
+        def reload(args):
+            self.tray_manager.reload_configuration()
+            return "Configuration reloaded"
+        
+        def vault_unlock(args):
+            from .security.vault import Vault
+            Vault.shared().unlock(args["passphrase"])
+            return "Vault unlocked for this session"
+        
+        return {
+            "ping": lambda args: "pong",
+            "list-hosts": lambda args: self.host_list_text(),
+            "find": lambda args: self.search_text(args["query"], args.get("limit", 20)),
+            "connect": connect,
+            "quick-connect": quick_connect,
+            "reload": reload,
+            "stats": lambda args: tracer.format_summary(),
+            "check": lambda args: self.check_text(args.get("pattern", "*")),
+            "vault-unlock": vault_unlock,
+        }
+    
+    def host_list_text(self) -> str:
+        """Render the TEST/PROD host list printed by --list-hosts"""
+        host_map = SshConfigParser.parse_ssh_config()
+        lines = ["Available SSH hosts:"]
+        for section, hosts in host_map.items():
+            lines.append(f"\n{section}:")
+            lines.extend(f"  - {host}" for host in hosts)
+        return "\n".join(lines)
+    
+    def check_text(self, pattern: str = "*") -> str:
+        """
+        Probe hosts and render the reachability table printed by --check
+        
+        Args:
+            pattern: Glob selecting the hosts to check
+            
+        Returns:
+            One line per host with its status, then a summary line
+        """
+        import fnmatch
+        import time
+        from .ssh.reachability import ReachabilityChecker
+        
+        config = SshConfigParser.load_config()
+        hosts = [host for host in dict.fromkeys(host for section in config.host_map.values() for host in section)
+                 if fnmatch.fnmatch(host.lower(), pattern.lower())]
+        if not hosts:
+            return f"No hosts matching '{pattern}'"
+        
+        started = time.monotonic()
+        results = ReachabilityChecker.shared().check(hosts, config)
+        elapsed = time.monotonic() - started
+        
+        width = max(len(host) for host in hosts)
+        lines = [f"{'HOST':<{width}}  {'STATUS':<7} {'LATENCY':>8}  ENDPOINT"]
+        for host in hosts:
+            result = results.get(host)
+            if result is None:
+                lines.append(f"{host:<{width}}  {'-':<7} {'':>8}  not probed (ProxyCommand)")
+                continue
+            endpoint = f"{result.endpoint.address}:{result.endpoint.port}"
+            if result.endpoint.via:
+                endpoint += f" via {result.endpoint.via}"
+            if result.up:
+                lines.append(f"{host:<{width}}  {'up':<7} {result.latency * 1000:>6.1f}ms  {endpoint}")
+            else:
+                lines.append(f"{host:<{width}}  {'down':<7} {'':>8}  {endpoint} ({result.error})")
+        
+        up = sum(1 for result in results.values() if result.up)
+        lines.append(f"\n{up} up, {len(results) - up} down, {len(hosts) - len(results)} not probed "
+                     f"({elapsed:.2f}s)")
+        return "\n".join(lines)
+    
+    def run_exec(self, command: str, section: Optional[str] = None, pattern: Optional[str] = None,
+                 parallel: int = 8, engine: str = "auto") -> int:
+        """
+        Run a command on every selected host, streaming output prefixed with the host
+        
+        Args:
+            command: Remote command line
+            section: TEST or PROD to select that section's hosts
+            pattern: Glob selecting hosts by name
+            parallel: Maximum hosts running at the same time
+            engine: auto, ssh or inprocess
+            
+        Returns:
+            Exit code: 0 if the command succeeded everywhere, 1 otherwise
+        """
+        from .ssh.fanout import FanOut, format_outcomes, select_hosts
+        
+        config = SshConfigParser.load_config()
+        hosts = select_hosts(config, section, pattern)
+        if not hosts:
+            print("No hosts selected")
+            return 1
+        
+        print(f"Running '{command}' on {len(hosts)} host(s), {parallel} at a time\n")
+        outcomes = FanOut(command, parallel=parallel, engine=engine, config=config).run(hosts)
+        print()
+        print(format_outcomes(outcomes))
+        return 0 if all(outcome.exit_code == 0 for outcome in outcomes) else 1
+    
+    def push_file(self, source: str, pattern: str, dest: Optional[str] = None, parallel: int = 8) -> int:
+        """
+        Copy a file to every host matching a glob, staging it once per jump host
+        
+        Args:
+            source: Local file
+            pattern: Glob selecting the target hosts
+            dest: Destination path on the targets. If None, the file name in the login directory
+            parallel: Maximum concurrent uploads to hosts without a jump host
+            
+        Returns:
+            Exit code: 0 if every copy was verified, 1 otherwise
+        """
+        import threading
+        from .ssh.fanout import select_hosts
+        from .ssh.push import BulkPush, format_results
+        from .ssh.transport_pool import TransportPool
+        
+        if not TransportPool.available():
+            print("--push needs the in-process SSH engine: pip install paramiko")
+            return 1
+        if not Path(source).is_file():
+            print(f"File not found: {source}")
+            return 1
+        
+        config = SshConfigParser.load_config()
+        hosts = select_hosts(config, pattern=pattern)
+        if not hosts:
+            print("No hosts selected")
+            return 1
+        
+        lock = threading.Lock()
+        
+        def progress(host: str, sent: int, total: int) -> None:
+            with lock:
+                print(f"{host}: {sent * 100 // max(total, 1)}% ({sent / 1048576:.1f}/{total / 1048576:.1f} MiB)",
+                      flush=True)
+        
+        dest = dest or Path(source).name
+        print(f"Pushing {source} to {dest} on {len(hosts)} host(s)\n")
+        push = BulkPush(Path(source), dest, parallel=parallel, config=config, progress=progress)
+        results = push.run(hosts)
+        print()
+        print(format_results(results))
+        return 0 if all(result.ok for result in results) else 1
+    
+    def open_vault(self):
+        """
+        Unlock the credential vault, creating it on first use
+        
+        Returns:
+            The unlocked Vault, or None if it stays locked
+        """
+        import getpass
+        from .security.vault import PASSPHRASE_ENV, Vault
+        
+        vault = Vault.shared()
+        if vault.exists():
+            if not vault.ensure_unlocked():
+                print(f"Vault {vault.path} is locked")
+                return None
+            return vault
+        
+        passphrase = os.environ.get(PASSPHRASE_ENV)
+        if passphrase is None:
+            passphrase = getpass.getpass("New vault passphrase: ")
+            if not passphrase or passphrase != getpass.getpass("Repeat passphrase: "):
+                print("Passphrases are empty or do not match")
+                return None
+        vault.unlock(passphrase)
+        print(f"Created vault {vault.path}")
+        return vault
+    
+    def vault_set(self, name: str) -> int:
+        """
+        Store a username and password in the vault for a host, host glob or "default"
+        
+        Args:
+            name: Entry name
+            
+        Returns:
+            Exit code
+        """
+        import getpass
+        
+        vault = self.open_vault()
+        if vault is None:
+            return 1
+        username = input(f"Username for {name} (empty for none): ").strip() or None
+        password = getpass.getpass(f"Password for {name} (empty for none): ") or None
+        vault.set(name, username, password)
+        print(f"Stored vault entry '{name.lower()}'")
+        return 0
+    
+    def vault_list_text(self) -> str:
+        """Render the vault entry names printed by --vault-list (no secrets are decrypted)"""
+        from .security.vault import Vault
+        
+        vault = Vault.shared()
+        if not vault.exists():
+            return f"No vault at {vault.path}"
+        names = vault.names()
+        return "\n".join([f"Vault entries ({vault.path}):"] + [f"  - {name}" for name in names])
+    
+    def vault_migrate(self) -> int:
+        """
+        Move the encryptedUser values of every config.yml into the vault
+        
+        Returns:
+            Exit code
+        """
+        from .config.config_loader import ConfigLoader
+        from .security.vault import migrate_encrypted_users
+        
+        vault = self.open_vault()
+        if vault is None:
+            return 1
+        report = migrate_encrypted_users(vault, ConfigLoader._candidate_paths(None))
+        print("\n".join(report) if report else "No encryptedUser values found")
+        ConfigLoader.invalidate()
+        return 0
+    
     def test_connection(self, host: str) -> None:
         """
         Test SSH connection to specified host
@@ -102,8 +413,63 @@ class SshConnectionApp:
         Args:
             host: SSH hostname to test
         """
+        from .ssh.ssh_launcher import SshLauncher
+        
         print(f"Testing connection to {host}...")
-        SshLauncher.connect(host)
+        if SshLauncher.pty_available():
+            # The section ends (and its report is written) before the exit
+            with profiler.section("connect"):
+                exit_code = SshLauncher.connect_pty(host)
+            sys.exit(exit_code)
+        with profiler.section("connect"):
+            SshLauncher.connect(host)
+
+    def find_hosts(self, query: str, limit: int = 20) -> None:
+        """
+        Print hosts matching a search query, best matches first
+
+        Args:
+            query: Text to search for in host names, HostName values and aliases
+            limit: Maximum number of results to print
+        """
+        print(self.search_text(query, limit))
+
+    def search_text(self, query: str, limit: int = 20) -> str:
+        """
+        Render ranked search results as printed by --find
+
+        Args:
+            query: Text to search for in host names, HostName values and aliases
+            limit: Maximum number of results
+
+        Returns:
+            One line per result, best first
+        """
+        from .ssh.host_search import HostSearchIndex
+
+        results = HostSearchIndex.for_current_config().search(query, limit)
+        if not results:
+            return f"No hosts matching '{query}'"
+        lines = []
+        for rank, result in enumerate(results, 1):
+            via = "" if result.matched == result.host.lower() else f"  ({result.source}: {result.matched})"
+            lines.append(f"{rank:3}. {result.host}{via}")
+        return "\n".join(lines)
+
+    def quick_connect(self, query: str) -> None:
+        """
+        Connect to the best-ranked host for a search query
+
+        Args:
+            query: Text to search for in host names, HostName values and aliases
+        """
+        from .ssh.host_search import HostSearchIndex
+
+        results = HostSearchIndex.for_current_config().search(query, 1)
+        if not results:
+            print(f"No hosts matching '{query}'")
+            return
+        self.test_connection(results[0].host)
 
 
 def main() -> None:
@@ -121,28 +487,294 @@ def main() -> None:
         action="store_true",
         help="List all available SSH hosts from config"
     )
+    parser.add_argument(
+        "--find",
+        type=str,
+        metavar="QUERY",
+        help="Search hosts by name, HostName or alias and list ranked matches"
+    )
+    parser.add_argument(
+        "--quick-connect",
+        type=str,
+        metavar="QUERY",
+        help="Connect to the best match for a host search query"
+    )
+    parser.add_argument(
+        "--check",
+        nargs="?",
+        const="*",
+        metavar="PATTERN",
+        help="Probe whether hosts (optionally matching a glob) accept TCP connections"
+    )
+    parser.add_argument(
+        "--exec",
+        type=str,
+        metavar="COMMAND",
+        help="Run COMMAND on the hosts selected by --section and/or --hosts"
+    )
+    parser.add_argument(
+        "--section",
+        type=str.upper,
+        choices=["TEST", "PROD"],
+        help="Select the hosts of a config section for --exec"
+    )
+    parser.add_argument(
+        "--hosts",
+        type=str,
+        metavar="GLOB",
+        help="Select hosts by name pattern for --exec"
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=8,
+        metavar="N",
+        help="Maximum hosts --exec runs on at the same time (default: 8)"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["auto", "ssh", "inprocess"],
+        default="auto",
+        help="How --exec connects: ssh processes or in-process paramiko transports (default: auto)"
+    )
+    parser.add_argument(
+        "--push",
+        type=str,
+        metavar="FILE",
+        help="Copy FILE to the hosts selected by --to (needs paramiko)"
+    )
+    parser.add_argument(
+        "--to",
+        type=str,
+        metavar="GLOB",
+        help="Target hosts of --push"
+    )
+    parser.add_argument(
+        "--dest",
+        type=str,
+        metavar="PATH",
+        help="Destination path for --push (default: the file name in the login directory)"
+    )
+    parser.add_argument(
+        "--vault-set",
+        type=str,
+        metavar="NAME",
+        help="Store credentials in the vault for a host, host glob or 'default' (prompts)"
+    )
+    parser.add_argument(
+        "--vault-list",
+        action="store_true",
+        help="List the credential vault entries"
+    )
+    parser.add_argument(
+        "--vault-migrate",
+        action="store_true",
+        help="Re-encrypt legacy encryptedUser values from config.yml into the vault"
+    )
+    parser.add_argument(
+        "--vault-unlock",
+        action="store_true",
+        help="Unlock the vault inside the running tray application for this session"
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print connect phase timings when the command finishes"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile startup, menu creation and the first connect; reports are written next to the log"
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile, also report the top allocation sites (tracemalloc)"
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=30,
+        metavar="N",
+        help="Entries per --profile report table (default: 30)"
+    )
     parser.add_argument(
         "--daemon",
         action="store_true",
         help="Run as daemon with system tray (default)"
     )
+    parser.add_argument(
+        "--standalone",
+        action="store_true",
+        help="Run the command in this process even if the tray application is running"
+    )
     
     args = parser.parse_args()
+    if args.exec and not (args.section or args.hosts):
+        parser.error("--exec needs --section and/or --hosts")
+    if args.push and not args.to:
+        parser.error("--push needs --to")
+    
+    if args.profile or args.profile_memory:
+        profiler.enable(memory=args.profile_memory, top=args.profile_top)
+    
+    if not args.standalone and not profiler.enabled:
+        exit_code = _forward_to_daemon(args)
+        if exit_code is not None:
+            sys.exit(exit_code)
     
     app = SshConnectionApp()
     
-    # Handle command line options
+    try:
+        _run_command(app, args)
+    finally:
+        if args.stats:
+            print("\nConnect phase timings:")
+            print(tracer.format_summary())
+        if profiler.enabled:
+            # A startup that ended early (e.g. an exception before the tray) still gets its report
+            profiler.stop("startup")
+            print(profiler.format_reports())
+
+
+def _forward_to_daemon(args: argparse.Namespace) -> Optional[int]:
+    """
+    Run a CLI command inside the running tray process, if there is one
+    
+    Connections that need this terminal (the pseudo-terminal path on
+    Linux/macOS) always run locally.
+    
+    Args:
+        args: Parsed command line options
+        
+    Returns:
+        Exit code, or None to run the command in this process
+    """
+    from .daemon.ipc import send_command
+    
+    if args.exec or args.push:
+        # Streams output to this terminal
+        return None
+    if args.vault_set or args.vault_list or args.vault_migrate:
+        # Prompts on this terminal and writes the vault file directly
+        return None
+    if args.vault_unlock:
+        import getpass
+        passphrase = getpass.getpass("Vault passphrase: ")
+        try:
+            reply = send_command("vault-unlock", passphrase=passphrase)
+        except OSError as e:
+            return _daemon_failed("vault-unlock", e)
+        if reply is None:
+            print("SSH Connection Manager is not running; commands unlock the vault when they need it")
+            return 1
+        if not reply.get("ok"):
+            print(f"Error from running SSH Connection Manager: {reply.get('error')}", file=sys.stderr)
+            return 1
+        print(reply["result"])
+        return 0
     if args.list_hosts:
-        host_map = SshConfigParser.parse_ssh_config()
-        print("Available SSH hosts:")
-        for section, hosts in host_map.items():
-            print(f"\n{section}:")
-            for host in hosts:
-                print(f"  - {host}")
+        command, arguments = "list-hosts", {}
+    elif args.find:
+        command, arguments = "find", {"query": args.find}
+    elif args.check:
+        command, arguments = "check", {"pattern": args.check}
+    elif args.quick_connect or args.test_host:
+        from .ssh.ssh_launcher import SshLauncher
+        if SshLauncher.pty_available():
+            return None
+        if args.quick_connect:
+            command, arguments = "quick-connect", {"query": args.quick_connect}
+        else:
+            command, arguments = "connect", {"host": args.test_host}
+    elif args.stats:
+        command, arguments = "stats", {}
+    else:
+        # Tray launch: the new process itself refuses to start if one is running
+        return None
+    
+    # Probing a large inventory can outlast the default reply timeout
+    timeout = 60.0 if command == "check" else 10.0
+    try:
+        reply = send_command(command, timeout=timeout, **arguments)
+    except OSError as e:
+        return _daemon_failed(command, e, timeout)
+    if reply is None:
+        return None
+    if not reply.get("ok"):
+        print(f"Error from running SSH Connection Manager: {reply.get('error')}", file=sys.stderr)
+        return 1
+    print(reply["result"])
+    if args.stats and command != "stats":
+        try:
+            stats = send_command("stats")
+        except OSError:
+            stats = None
+        if stats is not None and stats.get("ok"):
+            print("\nConnect phase timings (tray process):")
+            print(stats["result"])
+    return 0
+
+
+def _daemon_failed(command: str, error: OSError, timeout: float = 10.0) -> int:
+    """
+    Report a running tray process that did not answer
+    
+    The command may still be running there, so it is not run again locally.
+    
+    Returns:
+        Exit code
+    """
+    import socket
+    
+    if isinstance(error, socket.timeout):
+        print(f"No reply from the running SSH Connection Manager within {timeout:.0f}s; "
+              f"'{command}' may still be running there", file=sys.stderr)
+    else:
+        print(f"Could not reach the running SSH Connection Manager: {error}", file=sys.stderr)
+    return 1
+
+
+def _run_command(app: SshConnectionApp, args: argparse.Namespace) -> None:
+    """Dispatch the parsed command line options"""
+    if args.list_hosts:
+        print(app.host_list_text())
+    
+    elif args.find:
+        app.find_hosts(args.find)
+    
+    elif args.check:
+        print(app.check_text(args.check))
+    
+    elif args.exec:
+        sys.exit(app.run_exec(args.exec, args.section, args.hosts, args.parallel, args.engine))
+    
+    elif args.push:
+        sys.exit(app.push_file(args.push, args.to, args.dest, args.parallel))
+    
+    elif args.vault_set:
+        sys.exit(app.vault_set(args.vault_set))
+    
+    elif args.vault_list:
+        print(app.vault_list_text())
+    
+    elif args.vault_migrate:
+        sys.exit(app.vault_migrate())
+    
+    elif args.vault_unlock:
+        print("SSH Connection Manager is not running; commands unlock the vault when they need it")
+        sys.exit(1)
+    
+    elif args.quick_connect:
+        app.quick_connect(args.quick_connect)
     
     elif args.test_host:
         app.test_connection(args.test_host)
     
+    elif args.stats:
+        # Timings live in the tray process; this one has nothing to add (printed on exit)
+        print("SSH Connection Manager is not running.")
+    
     else:
         # Default: run with system tray
         app.run()
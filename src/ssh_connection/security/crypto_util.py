@@ -1,5 +1,6 @@
 import os
 import base64
+from functools import lru_cache
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 
@@ -18,6 +19,17 @@ class CryptoUtil:
         key = computer_name[:16].ljust(16, '0')
         return key.encode('utf-8')
     
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _cipher(key: bytes) -> Cipher:
+        """
+        Get the AES-ECB cipher for a key, built once and reused
+        
+        Legacy scheme kept to read encryptedUser values; new credentials
+        belong in the vault (see security.vault).
+        """
+        return Cipher(algorithms.AES(key), modes.ECB(), backend=default_backend())
+    
     @staticmethod
     def encrypt(data: str) -> str:
         """
@@ -30,15 +42,8 @@ class CryptoUtil:
             Base64 encoded encrypted string
         """
         try:
-            key = CryptoUtil._get_key()
-            
-            # Create cipher with ECB mode (to match Java implementation)
-            cipher = Cipher(
-                algorithms.AES(key),
-                modes.ECB(),
-                backend=default_backend()
-            )
-            encryptor = cipher.encryptor()
+            # ECB mode to match the Java implementation
+            encryptor = CryptoUtil._cipher(CryptoUtil._get_key()).encryptor()
             
             # Pad data to 16-byte boundary
             data_bytes = data.encode('utf-8')
@@ -64,18 +69,10 @@ class CryptoUtil:
             Decrypted string
         """
         try:
-            key = CryptoUtil._get_key()
-            
             # Decode from base64
             encrypted_bytes = base64.b64decode(encrypted)
             
-            # Create cipher with ECB mode
-            cipher = Cipher(
-                algorithms.AES(key),
-                modes.ECB(),
-                backend=default_backend()
-            )
-            decryptor = cipher.decryptor()
+            decryptor = CryptoUtil._cipher(CryptoUtil._get_key()).decryptor()
             
             # Decrypt
             decrypted_padded = decryptor.update(encrypted_bytes) + decryptor.finalize()
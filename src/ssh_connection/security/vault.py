@@ -0,0 +1,528 @@
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Environment variable holding the passphrase for unattended unlocks (tray autostart, scripts)
+PASSPHRASE_ENV = "SSH_CONNECTION_VAULT_PASSPHRASE"
+
+# Entry used for hosts no other entry matches
+DEFAULT_ENTRY = "default"
+
+FORMAT_VERSION = 1
+_CHECK_PLAINTEXT = b"ssh-connection-vault"
+_NONCE_SIZE = 12
+
+
+class VaultLockedError(RuntimeError):
+    """Raised when entries are read or written before the vault is unlocked"""
+
+
+class VaultEntry(NamedTuple):
+    """Credentials stored for a host pattern or environment"""
+    username: Optional[str]
+    password: Optional[str]
+
+
+class _CachedEntry:
+    """Decrypted entry held as mutable buffers so it can be overwritten"""
+
+    def __init__(self, username: Optional[str], password: Optional[str], expires: float):
+        self.username = bytearray(username.encode("utf-8")) if username is not None else None
+        self.password = bytearray(password.encode("utf-8")) if password is not None else None
+        self.expires = expires
+
+    def entry(self) -> VaultEntry:
+        return VaultEntry(
+            self.username.decode("utf-8") if self.username is not None else None,
+            self.password.decode("utf-8") if self.password is not None else None
+        )
+
+    def wipe(self) -> None:
+        for buffer in (self.username, self.password):
+            if buffer is not None:
+                buffer[:] = bytes(len(buffer))
+        self.username = self.password = None
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+class Vault:
+    """
+    Encrypted file of per-host and per-environment credentials
+
+    Entries are named by a host name, a host glob ("*it1p*") or "default",
+    and each holds a username and/or password. Every entry is sealed with
+    AES-256-GCM under its own random nonce, with the entry name as
+    associated data, so entries cannot be altered or swapped unnoticed.
+    The key is derived from a passphrase with scrypt; the salt and cost
+    parameters are stored in the file.
+
+    The scrypt cost is paid once, by unlock(); the derived key then stays in
+    memory for the rest of the session. Decrypted entries are cached, indexed
+    by name, for ttl seconds, after which their buffers are zeroed and the
+    next lookup decrypts again (AES-GCM only, no key derivation). lock()
+    zeroes the key and every cached entry. Python may still hold transient
+    copies (decoded strings, OpenSSL's key schedule); wiping bounds how long
+    plaintext stays in the process, it does not make it unobservable.
+    """
+
+    _shared: Optional['Vault'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = 300.0, cost: int = 2 ** 15):
+        """
+        Args:
+            path: Vault file. If None, uses ~/.ssh_connection/vault.json
+            ttl: Seconds a decrypted entry stays cached
+            cost: scrypt N used when creating the vault or changing its passphrase
+        """
+        self.path = Path(path) if path else Path.home() / ".ssh_connection" / "vault.json"
+        self.ttl = ttl
+        self.cost = cost
+        self._lock = threading.RLock()
+        self._data: Optional[dict] = None
+        self._key: Optional[bytearray] = None
+        self._aead = None
+        self._cache: Dict[str, _CachedEntry] = {}
+        # Memoized host -> entry name lookups (None: no entry matches)
+        self._host_index: Dict[str, Optional[str]] = {}
+        self._prompted = False
+        self._hinted = False
+        # Prompt for the passphrase on the terminal; the tray turns this off
+        self.interactive = True
+        self._purger: Optional[threading.Timer] = None
+
+    @staticmethod
+    def shared() -> 'Vault':
+        """Get the process-wide vault"""
+        with Vault._shared_lock:
+            if Vault._shared is None:
+                Vault._shared = Vault()
+            return Vault._shared
+
+    def exists(self) -> bool:
+        """Check whether the vault file has been created"""
+        return self.path.exists()
+
+    @property
+    def unlocked(self) -> bool:
+        """True once the key has been derived for this session"""
+        return self._aead is not None
+
+    def unlock(self, passphrase: str) -> None:
+        """
+        Derive the key from the passphrase and keep it for the session
+
+        Creates an empty vault if the file does not exist yet.
+
+        Args:
+            passphrase: Vault passphrase
+
+        Raises:
+            ValueError: If the passphrase is wrong
+        """
+        from cryptography.exceptions import InvalidTag
+
+        with self._lock:
+            create = not self.exists()
+            data = self._new_data() if create else self._read()
+            key = self._derive_key(passphrase, data["kdf"])
+            aead = self._cipher(key)
+            if create:
+                data["check"] = self._seal_check(aead)
+            else:
+                try:
+                    aead.decrypt(*self._split(data["check"]), b"check")
+                except InvalidTag:
+                    key[:] = bytes(len(key))
+                    raise ValueError("Wrong vault passphrase")
+            self._drop_key()
+            self._data, self._key, self._aead = data, key, aead
+            self._host_index.clear()
+            if create:
+                self._write()
+
+    def ensure_unlocked(self) -> bool:
+        """
+        Unlock the vault on first use, if it exists
+
+        The passphrase comes from SSH_CONNECTION_VAULT_PASSPHRASE, else it is
+        prompted for on the terminal (three attempts), but only on the main
+        thread of an interactive command: lookups from the tray, its menu and
+        warm-up threads leave the vault locked and point to --vault-unlock
+        instead of waiting on a prompt nobody sees. Once the passphrase was
+        tried, the vault is not asked for again in this process.
+
+        Returns:
+            True if the vault is unlocked
+        """
+        with self._lock:
+            if self.unlocked:
+                return True
+            if self._prompted or not self.exists():
+                return False
+
+            passphrase = os.environ.get(PASSPHRASE_ENV)
+            if passphrase is not None:
+                self._prompted = True
+                try:
+                    self.unlock(passphrase)
+                    return True
+                except ValueError:
+                    print(f"{PASSPHRASE_ENV} does not unlock {self.path}")
+                    return False
+            if not (self.interactive and threading.current_thread() is threading.main_thread()
+                    and sys.stdin and sys.stdin.isatty()):
+                if not self._hinted:
+                    self._hinted = True
+                    print("The credential vault is locked; unlock it with --vault-unlock")
+                return False
+            self._prompted = True
+
+        # Prompt without holding the lock: other lookups see a locked vault meanwhile instead of blocking
+        import getpass
+        for _ in range(3):
+            try:
+                self.unlock(getpass.getpass(f"Vault passphrase ({self.path}): "))
+                return True
+            except ValueError as e:
+                print(e)
+            except (EOFError, KeyboardInterrupt):
+                break
+        return False
+
+    def lock(self) -> None:
+        """Zero the derived key and every cached entry"""
+        with self._lock:
+            self.wipe_cache()
+            self._drop_key()
+            self._host_index.clear()
+            if self._purger is not None:
+                self._purger.cancel()
+                self._purger = None
+
+    def wipe_cache(self) -> None:
+        """Zero and drop every decrypted entry; the vault stays unlocked"""
+        with self._lock:
+            for cached in self._cache.values():
+                cached.wipe()
+            self._cache.clear()
+
+    def purge_expired(self) -> int:
+        """
+        Zero and drop cached entries older than the TTL
+
+        Returns:
+            Number of entries wiped
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [name for name, cached in self._cache.items() if cached.expires <= now]
+            for name in expired:
+                self._cache.pop(name).wipe()
+            return len(expired)
+
+    def _schedule_purge(self) -> None:
+        """Wipe expired entries in the background even if nothing reads the vault again"""
+        if self._purger is not None or not self._cache:
+            return
+        delay = max(0.1, min(cached.expires for cached in self._cache.values()) - time.monotonic())
+
+        def purge() -> None:
+            with self._lock:
+                self._purger = None
+                self.purge_expired()
+                self._schedule_purge()
+
+        self._purger = threading.Timer(delay, purge)
+        self._purger.daemon = True
+        self._purger.start()
+
+    def names(self) -> List[str]:
+        """Get the entry names in file order"""
+        with self._lock:
+            data = self._data if self._data is not None else (self._read() if self.exists() else None)
+            return list(data["entries"]) if data else []
+
+    def get(self, name: str) -> Optional[VaultEntry]:
+        """
+        Get an entry by name, decrypting it if it is not cached
+
+        Args:
+            name: Entry name
+
+        Returns:
+            VaultEntry, or None if there is no such entry
+
+        Raises:
+            VaultLockedError: If the vault is locked
+        """
+        name = name.lower()
+        now = time.monotonic()
+        with self._lock:
+            self._require_unlocked()
+            cached = self._cache.get(name)
+            if cached is not None:
+                if cached.expires > now:
+                    return cached.entry()
+                self._cache.pop(name).wipe()
+
+            sealed = self._data["entries"].get(name)
+            if sealed is None:
+                return None
+            plaintext = bytearray(self._aead.decrypt(*self._split(sealed), name.encode("utf-8")))
+            try:
+                fields = json.loads(plaintext.decode("utf-8"))
+            finally:
+                plaintext[:] = bytes(len(plaintext))
+            cached = _CachedEntry(fields.get("username"), fields.get("password"), now + self.ttl)
+            self._cache[name] = cached
+            self._schedule_purge()
+            return cached.entry()
+
+    def lookup(self, host: str) -> Optional[VaultEntry]:
+        """
+        Get the entry for a host: an exact name first, then the first matching glob
+
+        The "default" entry is not considered; see default().
+
+        Args:
+            host: SSH host name
+
+        Returns:
+            VaultEntry, or None if no entry matches
+        """
+        key = host.lower()
+        with self._lock:
+            self._require_unlocked()
+            try:
+                name = self._host_index[key]
+            except KeyError:
+                entries = self._data["entries"]
+                if key in entries and key != DEFAULT_ENTRY:
+                    name = key
+                else:
+                    name = next((pattern for pattern in entries
+                                 if pattern != DEFAULT_ENTRY and fnmatchcase(key, pattern)), None)
+                self._host_index[key] = name
+            return self.get(name) if name is not None else None
+
+    def default(self) -> Optional[VaultEntry]:
+        """Get the "default" entry, used for hosts nothing else covers"""
+        return self.get(DEFAULT_ENTRY)
+
+    def set(self, name: str, username: Optional[str] = None, password: Optional[str] = None) -> None:
+        """
+        Store an entry and save the vault
+
+        Args:
+            name: Host name, host glob or "default"
+            username: Username, or None to leave it unset
+            password: Password, or None to leave it unset
+        """
+        name = name.lower()
+        with self._lock:
+            self._require_unlocked()
+            self._seal(name, {"username": username, "password": password})
+            self._forget(name)
+            self._write()
+
+    def set_many(self, entries: Iterable[Tuple[str, Optional[str], Optional[str]]]) -> int:
+        """
+        Store several entries with a single save
+
+        Args:
+            entries: (name, username, password) tuples
+
+        Returns:
+            Number of entries stored
+        """
+        count = 0
+        with self._lock:
+            self._require_unlocked()
+            for name, username, password in entries:
+                name = name.lower()
+                self._seal(name, {"username": username, "password": password})
+                self._forget(name)
+                count += 1
+            if count:
+                self._write()
+        return count
+
+    def remove(self, name: str) -> bool:
+        """
+        Delete an entry and save the vault
+
+        Returns:
+            True if the entry existed
+        """
+        name = name.lower()
+        with self._lock:
+            self._require_unlocked()
+            if self._data["entries"].pop(name, None) is None:
+                return False
+            self._forget(name)
+            self._write()
+            return True
+
+    def change_passphrase(self, passphrase: str) -> int:
+        """
+        Re-encrypt every entry under a key derived from a new passphrase and salt
+
+        Returns:
+            Number of entries re-encrypted
+        """
+        with self._lock:
+            self._require_unlocked()
+            entries = {}
+            for name in list(self._data["entries"]):
+                entry = self.get(name)
+                entries[name] = {"username": entry.username, "password": entry.password}
+            data = self._new_data()
+            key = self._derive_key(passphrase, data["kdf"])
+            aead = self._cipher(key)
+            data["check"] = self._seal_check(aead)
+            self.wipe_cache()
+            self._drop_key()
+            self._data, self._key, self._aead = data, key, aead
+            for name, fields in entries.items():
+                self._seal(name, fields)
+            self._write()
+            return len(entries)
+
+    def _seal(self, name: str, fields: dict) -> None:
+        plaintext = bytearray(json.dumps(fields).encode("utf-8"))
+        try:
+            nonce = os.urandom(_NONCE_SIZE)
+            self._data["entries"][name] = _b64(nonce + self._aead.encrypt(nonce, bytes(plaintext),
+                                                                          name.encode("utf-8")))
+        finally:
+            plaintext[:] = bytes(len(plaintext))
+
+    def _forget(self, name: str) -> None:
+        cached = self._cache.pop(name, None)
+        if cached is not None:
+            cached.wipe()
+        self._host_index.clear()
+
+    def _require_unlocked(self) -> None:
+        if not self.unlocked:
+            raise VaultLockedError(f"Vault {self.path} is locked")
+
+    def _drop_key(self) -> None:
+        if self._key is not None:
+            self._key[:] = bytes(len(self._key))
+        self._key = None
+        self._aead = None
+
+    def _new_data(self) -> dict:
+        """Create an empty vault description with a fresh salt"""
+        kdf = {"name": "scrypt", "n": self.cost, "r": 8, "p": 1, "salt": _b64(os.urandom(16))}
+        return {"version": FORMAT_VERSION, "kdf": kdf, "check": "", "entries": {}}
+
+    @staticmethod
+    def _seal_check(aead) -> str:
+        """Encrypt a known value that tells a wrong passphrase from a tampered entry"""
+        nonce = os.urandom(_NONCE_SIZE)
+        return _b64(nonce + aead.encrypt(nonce, _CHECK_PLAINTEXT, b"check"))
+
+    @staticmethod
+    def _derive_key(passphrase: str, kdf: dict) -> bytearray:
+        """Run scrypt with the stored parameters (the expensive step)"""
+        from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+        if kdf.get("name") != "scrypt":
+            raise ValueError(f"Unsupported vault key derivation: {kdf.get('name')}")
+        scrypt = Scrypt(salt=base64.b64decode(kdf["salt"]), length=32, n=kdf["n"], r=kdf["r"], p=kdf["p"])
+        return bytearray(scrypt.derive(passphrase.encode("utf-8")))
+
+    @staticmethod
+    def _cipher(key: bytearray):
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        return AESGCM(bytes(key))
+
+    @staticmethod
+    def _split(sealed: str) -> Tuple[bytes, bytes]:
+        raw = base64.b64decode(sealed)
+        return raw[:_NONCE_SIZE], raw[_NONCE_SIZE:]
+
+    def _read(self) -> dict:
+        with open(self.path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported vault format version: {data.get('version')}")
+        return data
+
+    def _write(self) -> None:
+        """Save atomically, readable by the owner only"""
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        temp = self.path.with_name(self.path.name + ".tmp")
+        descriptor = os.open(str(temp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            json.dump(self._data, file, indent=2)
+        os.replace(str(temp), str(self.path))
+
+
+def migrate_encrypted_users(vault: Vault, config_paths: Iterable[Path]) -> List[str]:
+    """
+    Re-encrypt legacy encryptedUser values into the vault in one batch
+
+    Each value is decrypted with the old COMPUTERNAME-keyed scheme and
+    stored as the username of the "default" entry (existing passwords are
+    kept). If the files hold different users, the first one wins and the
+    rest are stored as "default@<n>" for manual renaming, n being the
+    file's 1-based position in config_paths (the report names each file).
+
+    Args:
+        vault: Unlocked vault
+        config_paths: config.yml files to read
+
+    Returns:
+        One line per file describing what happened
+    """
+    import yaml
+    from .crypto_util import CryptoUtil
+
+    report = []
+    pending: Dict[str, Tuple[str, Optional[str], Optional[str]]] = {}
+    default = vault.default()
+    for position, path in enumerate(config_paths, 1):
+        if not path.exists():
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                encrypted = (yaml.safe_load(file) or {}).get("encryptedUser")
+        except Exception as e:
+            report.append(f"{path}: unreadable ({e})")
+            continue
+        if not encrypted:
+            continue
+        try:
+            username = CryptoUtil.decrypt(encrypted)
+        except RuntimeError as e:
+            report.append(f"{path}: {e}")
+            continue
+
+        same = next((name for name, user, _ in pending.values() if user == username), None)
+        if same is not None:
+            report.append(f"{path}: same user as the '{same}' entry")
+            continue
+        if DEFAULT_ENTRY not in pending:
+            name = DEFAULT_ENTRY
+            password = default.password if default else None
+        else:
+            # Candidates share directory names (resources/): only the position is unique
+            name, password = f"{DEFAULT_ENTRY}@{position}", None
+        pending[name] = (name, username, password)
+        report.append(f"{path}: migrated to '{name}', encryptedUser can be removed from this file")
+
+    vault.set_many(pending.values())
+    return report
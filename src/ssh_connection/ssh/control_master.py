@@ -0,0 +1,367 @@
+import hashlib
+import os
+import re
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .ssh_config_parser import SshConfig, SshConfigParser, _is_pattern
+
+
+@dataclass
+class MasterInfo:
+    """A live ControlMaster connection"""
+    host: str
+    control_path: Path
+    pid: Optional[int]
+    started_at: float
+
+
+def _first_hop(proxy_jump: str) -> str:
+    """Get the host name of the first hop of a ProxyJump value ([user@]host[:port],...)"""
+    return proxy_jump.split(",")[0].rsplit("@", 1)[-1].split(":")[0]
+
+
+def find_jump_hosts(config: SshConfig) -> List[str]:
+    """
+    Find the jump hosts of an SSH config
+
+    A host is a jump host when another host reaches it through ProxyJump, or
+    when its own Host block forwards a local port to some other machine's SSH
+    port (the login_test/login_prod layout: "LocalForward 2222 stlit1tf01:22").
+    Only looks at the blocks themselves, so it stays cheap on large configs.
+
+    Args:
+        config: Parsed SSH config model
+
+    Returns:
+        Jump host names in file order
+    """
+    jump_hosts: Dict[str, None] = {}
+    for block in config.blocks:
+        if block.patterns is None:
+            continue
+        names = [name for name in block.patterns if not _is_pattern(name)]
+        if names and any(forward.dest_port == 22 for forward in block.local_forwards):
+            for name in names:
+                jump_hosts.setdefault(name, None)
+        for key, value in block.options:
+            if key == "proxyjump" and value.lower() != "none":
+                jump_hosts.setdefault(_first_hop(value), None)
+    return list(jump_hosts)
+
+
+def jump_host_for(config: SshConfig, host: str) -> Optional[str]:
+    """
+    Find the jump host a target is reached through
+
+    Either the first ProxyJump hop, or for "HostName localhost / Port 2222"
+    targets the jump host whose LocalForward listens on that port.
+
+    Args:
+        config: Parsed SSH config model
+        host: Target host name
+
+    Returns:
+        Jump host name, or None for hosts reached directly
+    """
+    target = config.resolve(host)
+    if target.proxy_jump:
+        return _first_hop(target.proxy_jump)
+    if target.hostname not in ("localhost", "127.0.0.1"):
+        return None
+    for jump in find_jump_hosts(config):
+        if jump != host and any(forward.listen_port == target.port
+                                for forward in config.resolve(jump).local_forwards):
+            return jump
+    return None
+
+
+class ControlMasterManager:
+    """
+    Keeps one multiplexed ssh ControlMaster per jump host
+
+    Later sessions and forwards reuse the master's authenticated transport
+    instead of paying a new TCP + key exchange + authentication round trip.
+    Masters live in a private ControlPath directory and exit on their own
+    after ControlPersist of idle time. POSIX only: Windows OpenSSH does not
+    support connection multiplexing.
+    """
+
+    _shared: Optional['ControlMasterManager'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, control_dir: Optional[Path] = None, control_persist: str = "10m",
+                 ssh_binary: str = "ssh"):
+        """
+        Args:
+            control_dir: Directory for ControlPath sockets. If None, uses ~/.ssh/ssh_connection_cm
+            control_persist: Idle time before a master exits (ssh ControlPersist syntax)
+            ssh_binary: ssh executable to run
+        """
+        self.control_dir = control_dir or Path.home() / ".ssh" / "ssh_connection_cm"
+        self.control_persist = control_persist
+        self.ssh_binary = ssh_binary
+        self._masters: Dict[str, MasterInfo] = {}
+        self._lock = threading.Lock()
+        # One per host: the warmer, fan-out and tray clicks may start the same master at once
+        self._host_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def shared() -> 'ControlMasterManager':
+        """Get the process-wide manager, configured from config.yml"""
+        with ControlMasterManager._shared_lock:
+            if ControlMasterManager._shared is None:
+                control_persist = "10m"
+                try:
+                    from ..config.config_loader import ConfigLoader
+                    control_persist = ConfigLoader.load().control_persist
+                except Exception:
+                    pass
+                ControlMasterManager._shared = ControlMasterManager(control_persist=control_persist)
+            return ControlMasterManager._shared
+
+    @staticmethod
+    def available() -> bool:
+        """Check whether ControlMaster multiplexing is supported on this platform"""
+        return os.name != 'nt'
+
+    def control_path(self, host: str) -> Path:
+        """
+        Get the ControlPath socket for a host
+
+        The name is a short hash so the path stays under the ~104 byte limit
+        of Unix socket addresses.
+        """
+        digest = hashlib.sha1(host.encode("utf-8")).hexdigest()[:16]
+        return self.control_dir / f"{digest}.sock"
+
+    def ssh_options(self, host: str) -> List[str]:
+        """
+        Get ssh options that make a connection to host create or reuse its master
+
+        Args:
+            host: SSH host name
+
+        Returns:
+            List of ssh command line arguments
+        """
+        return [
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={self.control_path(host)}",
+            "-o", f"ControlPersist={self.control_persist}",
+        ]
+
+    def proxy_options(self, jump_host: str) -> List[str]:
+        """
+        Get ssh options that tunnel a ProxyJump target through the jump host's master
+
+        Args:
+            jump_host: Jump host name
+
+        Returns:
+            List of ssh command line arguments (empty if no master is running)
+        """
+        if not self.check(jump_host):
+            return []
+        return ["-o", f"ProxyCommand={self.ssh_binary} -o ControlPath={self.control_path(jump_host)} "
+                      f"-W %h:%p {jump_host}"]
+
+    def _ensure_control_dir(self) -> None:
+        self.control_dir.mkdir(parents=True, exist_ok=True)
+        os.chmod(self.control_dir, 0o700)
+
+    def start_master(self, host: str, password: Optional[str] = None, user: Optional[str] = None,
+                     timeout: float = 30.0) -> bool:
+        """
+        Open a background ControlMaster for host unless a healthy one exists
+
+        ssh runs with -f under a pseudo-terminal so a password prompt can be
+        answered; it backgrounds itself once authenticated.
+
+        Args:
+            host: Jump host name
+            password: Password for the prompt, None for key-based authentication
+            user: Login name, None to use the SSH config
+            timeout: Seconds to wait for authentication
+
+        Returns:
+            True if a master is running afterwards
+        """
+        with self._lock:
+            host_lock = self._host_locks.setdefault(host, threading.Lock())
+        with host_lock:
+            return self._start_master(host, password, user, timeout)
+
+    def _start_master(self, host: str, password: Optional[str], user: Optional[str], timeout: float) -> bool:
+        state = self._probe(host)
+        if state:
+            return True
+        if state is None:
+            # A busy master may answer late: removing its socket would orphan it with its forwards
+            print(f"ControlMaster for {host} did not answer 'ssh -O check'; not starting another one")
+            return False
+
+        from .pty_session import PtySshSession
+
+        self._ensure_control_dir()
+        control_path = self.control_path(host)
+        if control_path.exists():
+            # Stale socket left behind by a master that died
+            control_path.unlink()
+
+        argv = [self.ssh_binary, "-f", "-N"] + self.ssh_options(host)
+        argv[argv.index("ControlMaster=auto")] = "ControlMaster=yes"
+        if user:
+            argv += ["-l", user]
+        session = PtySshSession(argv + [host], password=password, auth_timeout=timeout,
+                                output=lambda data: None)
+        session.start()
+        if session.authenticate() != "exited":
+            # Stuck on a prompt nobody can answer (host key, wrong password, ...)
+            session.terminate()
+        exit_code = session.wait(drain=False)
+        if exit_code != 0:
+            print(f"ControlMaster for {host} failed to start (ssh exit code {exit_code})")
+            return False
+        return self.check(host)
+
+    def check(self, host: str) -> bool:
+        """
+        Check master health with ``ssh -O check``
+
+        Args:
+            host: Jump host name
+
+        Returns:
+            True if the master answers
+        """
+        return self._probe(host) is True
+
+    def _probe(self, host: str) -> Optional[bool]:
+        """
+        Run ``ssh -O check`` for host
+
+        Returns:
+            True if the master answers, False if there is none (no socket, or
+            ssh says so), None if the check itself failed or timed out
+        """
+        control_path = self.control_path(host)
+        if not control_path.exists():
+            with self._lock:
+                self._masters.pop(host, None)
+            return False
+
+        try:
+            result = subprocess.run(
+                [self.ssh_binary, "-O", "check", "-o", f"ControlPath={control_path}", host],
+                capture_output=True, text=True, timeout=5
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+
+        if result.returncode != 0:
+            with self._lock:
+                self._masters.pop(host, None)
+            return False
+
+        match = re.search(r"pid=(\d+)", result.stderr + result.stdout)
+        pid = int(match.group(1)) if match else None
+        with self._lock:
+            info = self._masters.get(host)
+            if info is None or info.pid != pid:
+                self._masters[host] = MasterInfo(host, control_path, pid, time.time())
+        return True
+
+    def stop(self, host: str) -> None:
+        """Ask a master to exit (``ssh -O exit``)"""
+        control_path = self.control_path(host)
+        if control_path.exists():
+            try:
+                subprocess.run(
+                    [self.ssh_binary, "-O", "exit", "-o", f"ControlPath={control_path}", host],
+                    capture_output=True, timeout=5
+                )
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        with self._lock:
+            self._masters.pop(host, None)
+
+    def stop_all(self) -> None:
+        """Ask every known master to exit"""
+        for host in [info.host for info in self.live_masters(refresh=False)]:
+            self.stop(host)
+
+    def live_masters(self, refresh: bool = True) -> List[MasterInfo]:
+        """
+        Get the masters that are currently running
+
+        Masters exit on their own after ControlPersist of idle time; a refresh
+        re-checks every known master and drops the ones that are gone.
+
+        Args:
+            refresh: Re-check health with ``ssh -O check`` first
+
+        Returns:
+            List of MasterInfo
+        """
+        if refresh:
+            with self._lock:
+                hosts = set(self._masters)
+            # Masters outlive the process that started them; pick up jump hosts with a socket
+            try:
+                hosts.update(host for host in find_jump_hosts(SshConfigParser.load_config())
+                             if self.control_path(host).exists())
+            except Exception:
+                pass
+            for host in sorted(hosts):
+                self.check(host)
+        with self._lock:
+            return list(self._masters.values())
+
+    def connect_options(self, host: str, config: Optional[SshConfig] = None,
+                        credentials: Optional[Callable[[str], Tuple[Optional[str], Optional[str]]]] = None
+                        ) -> List[str]:
+        """
+        Get ssh options for an interactive connection that reuses jump host masters
+
+        Jump hosts get ControlMaster=auto so the session itself becomes (or
+        joins) the master. For targets behind a jump host the jump master is
+        started first if needed: LocalForward-style targets then find their
+        forwarded port already open, ProxyJump targets are tunnelled through it.
+
+        Args:
+            host: SSH host name being opened
+            config: Parsed SSH config. If None, loads ~/.ssh/config
+            credentials: Callable mapping a host to (user, password), used to
+                start a missing jump master
+
+        Returns:
+            List of ssh command line arguments
+        """
+        if not self.available():
+            return []
+        config = config or SshConfigParser.load_config()
+        if host in find_jump_hosts(config):
+            self._ensure_control_dir()
+            return self.ssh_options(host)
+
+        jump = jump_host_for(config, host)
+        if jump is None:
+            return []
+        user, password = credentials(jump) if credentials else (None, None)
+        if not self.start_master(jump, password, user):
+            return []
+        if config.resolve(host).proxy_jump:
+            return self.proxy_options(jump)
+        return []
+
+
+if __name__ == "__main__":
+    manager = ControlMasterManager.shared()
+    print(f"Jump hosts: {find_jump_hosts(SshConfigParser.load_config())}")
+    for master in manager.live_masters():
+        print(f"  {master.host}: pid={master.pid} {master.control_path}")
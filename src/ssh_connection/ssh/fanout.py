@@ -0,0 +1,277 @@
+import fnmatch
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .control_master import ControlMasterManager, _first_hop, find_jump_hosts, jump_host_for
+from .ssh_config_parser import SshConfig, SshConfigParser
+
+ENGINES = ("auto", "ssh", "inprocess")
+
+
+class HostOutcome(NamedTuple):
+    """How a command ended on one host"""
+    host: str
+    exit_code: Optional[int]
+    duration: float
+    error: Optional[str] = None
+
+
+def select_hosts(config: SshConfig, section: Optional[str] = None,
+                 pattern: Optional[str] = None) -> List[str]:
+    """
+    Pick fan-out targets from the SSH config
+
+    Args:
+        config: Parsed SSH config model
+        section: TEST or PROD to take that section's hosts
+        pattern: Glob matched case-insensitively against every concrete host
+
+    Returns:
+        Matching host names in config order (both filters apply when given)
+    """
+    if section is not None:
+        hosts = list(config.host_map.get(section.upper(), []))
+    else:
+        hosts = config.hosts()
+    if pattern is not None:
+        hosts = [host for host in hosts if fnmatch.fnmatch(host.lower(), pattern.lower())]
+    return hosts
+
+
+class _LineWriter:
+    """Turns output chunks into complete lines prefixed with the host name"""
+
+    def __init__(self, host: str, emit: Callable[[str, str], None], skip_prompts: bool = False):
+        self.host = host
+        self.emit = emit
+        self.skip_prompts = skip_prompts
+        self._partial = b""
+
+    def feed(self, data: bytes) -> None:
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._emit(line)
+
+    def close(self) -> None:
+        if self._partial:
+            self._emit(self._partial)
+            self._partial = b""
+
+    def _emit(self, line: bytes) -> None:
+        line = line.rstrip(b"\r")
+        if self.skip_prompts:
+            from .pty_session import PromptWatcher
+            if PromptWatcher.PASSWORD_PROMPT.search(line):
+                return
+        self.emit(self.host, line.decode("utf-8", "replace"))
+
+
+class FanOut:
+    """
+    Runs one command on many hosts at once and streams their output
+
+    Output is forwarded line by line as it arrives, prefixed with the host,
+    so nothing is held back until a host finishes. At most ``parallel``
+    hosts run at a time, and at most ``per_jump`` of them behind the same
+    jump host (its sshd limits concurrent sessions, 10 by default). The
+    in-process engine also runs no more hosts than the transport pool holds.
+
+    Two engines are available: ``ssh`` starts one ssh process per host
+    (passwords are answered through a pseudo-terminal on POSIX, jump hosts
+    get a ControlMaster first so targets behind them skip a handshake);
+    ``inprocess`` opens exec channels on pooled paramiko transports. ``auto``
+    uses the in-process engine when paramiko is installed.
+    """
+
+    def __init__(self, command: str, parallel: int = 8, per_jump: int = 8, engine: str = "auto",
+                 config: Optional[SshConfig] = None, emit: Optional[Callable[[str, str], None]] = None,
+                 connect_timeout: int = 10):
+        """
+        Args:
+            command: Remote command line
+            parallel: Maximum hosts running at the same time
+            per_jump: Maximum hosts running at the same time behind one jump host
+            engine: auto, ssh or inprocess
+            config: Parsed SSH config. If None, loads ~/.ssh/config
+            emit: Called with (host, line) for every output line, defaults to printing
+            connect_timeout: Seconds allowed to connect to each host
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(ENGINES)}")
+        if engine == "auto":
+            from .transport_pool import TransportPool
+            engine = "inprocess" if TransportPool.available() else "ssh"
+        self.command = command
+        self.parallel = max(1, parallel)
+        self.per_jump = max(1, per_jump)
+        self.engine = engine
+        self.config = config or SshConfigParser.load_config()
+        self.emit = emit or self._print_line
+        self.connect_timeout = connect_timeout
+        self._print_lock = threading.Lock()
+        self._width = 0
+        self._jump_hosts = set()
+
+    def run(self, hosts: List[str]) -> List[HostOutcome]:
+        """
+        Run the command on every host
+
+        Args:
+            hosts: Target host names
+
+        Returns:
+            One HostOutcome per host, in the given order
+        """
+        if not hosts:
+            return []
+        from .reachability import plan_endpoints
+
+        self._width = max(len(host) for host in hosts)
+        self._jump_hosts = set(find_jump_hosts(self.config))
+        # ProxyJump first hop or LocalForward owner of every target, resolved in one pass
+        jumps = {host: endpoint.via for host, endpoint in plan_endpoints(self.config, hosts).items()}
+        jumps.update({host: jump_host_for(self.config, host) for host in hosts if host not in jumps})
+        limits: Dict[Optional[str], threading.Semaphore] = {
+            jump: threading.Semaphore(self.per_jump) for jump in set(jumps.values()) if jump is not None
+        }
+        if self.engine == "ssh":
+            self._start_jump_masters([jump for jump in limits])
+
+        def run_one(host: str) -> HostOutcome:
+            limit = limits.get(jumps[host])
+            if limit is None:
+                return self._run_host(host)
+            with limit:
+                return self._run_host(host)
+
+        workers = min(self.parallel, len(hosts))
+        if self.engine == "inprocess":
+            from .transport_pool import TransportPool
+
+            # Every running host holds a pooled transport, and its jump host up to max_per_host more
+            pool = TransportPool.shared()
+            workers = min(workers, max(1, pool.max_total - pool.max_per_host * len(limits)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fanout") as executor:
+            return list(executor.map(run_one, hosts))
+
+    def _run_host(self, host: str) -> HostOutcome:
+        started = time.monotonic()
+        try:
+            if self.engine == "inprocess":
+                exit_code = self._run_inprocess(host)
+            else:
+                exit_code = self._run_ssh(host)
+        except Exception as e:
+            self.emit(host, f"error: {e}")
+            return HostOutcome(host, None, time.monotonic() - started, str(e))
+        return HostOutcome(host, exit_code, time.monotonic() - started)
+
+    def _run_inprocess(self, host: str) -> int:
+        from .transport_pool import TransportPool
+
+        writer = _LineWriter(host, self.emit)
+        channel = TransportPool.shared().exec_channel(host, self.command, timeout=self.connect_timeout,
+                                                      combine_stderr=True)
+        try:
+            while True:
+                data = channel.recv(32768)
+                if not data:
+                    break
+                writer.feed(data)
+            writer.close()
+            return channel.recv_exit_status()
+        finally:
+            channel.close()
+
+    def _run_ssh(self, host: str) -> int:
+        from ..config.config_loader import ConfigLoader
+
+        config = ConfigLoader.load()
+        user = config.get_username(host)
+        argv = ["ssh", "-o", f"ConnectTimeout={self.connect_timeout}"] + self._connect_options(host)
+        if user:
+            argv += ["-l", user]
+        argv += [host, self.command]
+
+        if os.name != 'nt':
+            from .pty_session import PtySshSession
+
+            writer = _LineWriter(host, self.emit, skip_prompts=True)
+            session = PtySshSession(argv, password=config.get_password(host),
+                                    accept_new_host_key=config.accept_new_host_keys, output=writer.feed)
+            session.start()
+            exit_code = session.wait()
+            writer.close()
+            return exit_code
+
+        # No pseudo-terminals on Windows: key or agent authentication only
+        writer = _LineWriter(host, self.emit)
+        process = subprocess.Popen(argv[:1] + ["-o", "BatchMode=yes"] + argv[1:],
+                                   stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        for line in process.stdout:
+            writer.feed(line)
+        writer.close()
+        return process.wait()
+
+    def _connect_options(self, host: str) -> List[str]:
+        manager = ControlMasterManager.shared()
+        if not manager.available():
+            return []
+        if host in self._jump_hosts:
+            return manager.ssh_options(host)
+        proxy_jump = self.config.resolve(host).proxy_jump
+        if proxy_jump:
+            return manager.proxy_options(_first_hop(proxy_jump))
+        return []
+
+    def _start_jump_masters(self, jumps: List[str]) -> None:
+        """Authenticate each jump host once before its targets start"""
+        from ..config.config_loader import ConfigLoader
+
+        manager = ControlMasterManager.shared()
+        if not jumps or not manager.available():
+            return
+        config = ConfigLoader.load()
+
+        def start(jump: str) -> None:
+            if not manager.start_master(jump, config.get_password(jump), config.get_username(jump),
+                                        timeout=self.connect_timeout * 3):
+                self.emit(jump, "warning: jump host master not started, targets connect on their own")
+
+        with ThreadPoolExecutor(max_workers=min(self.parallel, len(jumps)), thread_name_prefix="fanout-jump") as executor:
+            list(executor.map(start, jumps))
+
+    def _print_line(self, host: str, line: str) -> None:
+        with self._print_lock:
+            print(f"{host:<{self._width}} | {line}", flush=True)
+
+
+def format_outcomes(outcomes: List[HostOutcome]) -> str:
+    """
+    Render the per-host summary printed after a fan-out
+
+    Args:
+        outcomes: Results of FanOut.run
+
+    Returns:
+        Table of exit code and duration per host plus a totals line
+    """
+    if not outcomes:
+        return "No hosts selected"
+    width = max(len("HOST"), max(len(outcome.host) for outcome in outcomes))
+    lines = [f"{'HOST':<{width}}  {'EXIT':>4}  {'TIME':>8}"]
+    for outcome in outcomes:
+        exit_code = "-" if outcome.exit_code is None else str(outcome.exit_code)
+        line = f"{outcome.host:<{width}}  {exit_code:>4}  {outcome.duration:>7.2f}s"
+        if outcome.error:
+            line += f"  {outcome.error}"
+        lines.append(line)
+    ok = sum(1 for outcome in outcomes if outcome.exit_code == 0)
+    slowest = max(outcomes, key=lambda outcome: outcome.duration)
+    lines.append(f"\n{ok}/{len(outcomes)} succeeded, slowest {slowest.host} ({slowest.duration:.2f}s)")
+    return "\n".join(lines)
@@ -0,0 +1,246 @@
+import heapq
+from collections import Counter
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .ssh_config_parser import SshConfig, SshConfigParser, _is_pattern
+
+
+class SearchResult(NamedTuple):
+    """A ranked search hit: the ssh host to open and the key that matched"""
+    host: str
+    matched: str
+    source: str
+    score: int
+
+
+# Match kinds, lower is better
+_EXACT, _PREFIX, _SUBSTRING, _FUZZY = range(4)
+
+
+def _trigrams(text: str) -> List[str]:
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+class HostSearchIndex:
+    """
+    In-memory search index over host names, HostName values and aliases
+
+    Keys are stored lowercased and numbered in rank order (shortest first,
+    then alphabetical), so every posting list is already sorted by rank and
+    a scan can stop as soon as the best results are known. Queries of three
+    or more characters walk the posting list of their rarest trigram and
+    verify the substring; shorter queries walk a one/two character prefix
+    list. When nothing contains the query, hosts sharing the most trigrams
+    are returned as fuzzy matches.
+    """
+
+    # Index built for the current SSH config and config.yml: (config, loader, index).
+    # Holding the objects (not their ids) keeps a freed config's id from matching a new one
+    _current: Optional[Tuple[object, object, 'HostSearchIndex']] = None
+
+    def __init__(self, entries: List[Tuple[str, str, str]]):
+        """
+        Args:
+            entries: (key, host, source) tuples; key is what is searched, host what is opened
+        """
+        unique: Dict[Tuple[str, str], str] = {}
+        for key, host, source in entries:
+            lowered = key.lower()
+            if lowered:
+                unique.setdefault((lowered, host), source)
+        ranked = sorted(unique.items(), key=lambda item: (len(item[0][0]), item[0][0]))
+
+        self._keys: List[str] = [key for (key, _), _ in ranked]
+        self._hosts: List[str] = [host for (_, host), _ in ranked]
+        self._sources: List[str] = [source for _, source in ranked]
+
+        postings: Dict[str, List[int]] = {}
+        short_prefixes: Dict[str, List[int]] = {}
+        for entry_id, key in enumerate(self._keys):
+            for gram in set(_trigrams(key)):
+                postings.setdefault(gram, []).append(entry_id)
+            short_prefixes.setdefault(key[:1], []).append(entry_id)
+            if len(key) > 1:
+                short_prefixes.setdefault(key[:2], []).append(entry_id)
+
+        self._postings = {gram: array('I', ids) for gram, ids in postings.items()}
+        self._short_prefixes = {prefix: array('I', ids) for prefix, ids in short_prefixes.items()}
+        self._sorted_keys = sorted(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def build(ssh_config: SshConfig, connections: Optional[List] = None) -> 'HostSearchIndex':
+        """
+        Build an index from a parsed SSH config and config.yml connections
+
+        Args:
+            ssh_config: Parsed SSH config model
+            connections: ConnectionConfig list from ConfigLoader, optional
+
+        Returns:
+            HostSearchIndex over every concrete host, its HostName and aliases
+        """
+        entries: List[Tuple[str, str, str]] = []
+        for block in ssh_config.blocks:
+            if block.patterns is None:
+                continue
+            names = [name for name in block.patterns if not _is_pattern(name)]
+            if not names:
+                continue
+            # Further names on the same Host line are aliases of the first one
+            primary = names[0]
+            entries.append((primary, primary, "host"))
+            for alias in names[1:]:
+                entries.append((alias, primary, "alias"))
+            hostname = next((value for key, value in block.options if key == "hostname"), None)
+            if hostname:
+                entries.append((hostname, primary, "hostname"))
+
+        for conn in connections or []:
+            entries.append((conn.name, conn.dest_server, "connection"))
+            entries.append((conn.dest_server, conn.dest_server, "connection"))
+
+        return HostSearchIndex(entries)
+
+    @staticmethod
+    def for_current_config() -> 'HostSearchIndex':
+        """
+        Get the index for ~/.ssh/config and config.yml, rebuilt only when either changes
+
+        Returns:
+            Shared HostSearchIndex
+        """
+        ssh_config = SshConfigParser.load_config()
+        connections = []
+        loader = None
+        try:
+            from ..config.config_loader import ConfigLoader
+            loader = ConfigLoader.load()
+            connections = loader.connections
+        except Exception as e:
+            print(f"Search index built without config.yml connections: {e}")
+
+        # The loaders return the same objects until a file changes
+        current = HostSearchIndex._current
+        if current is not None and current[0] is ssh_config and current[1] is loader:
+            return current[2]
+
+        index = HostSearchIndex.build(ssh_config, connections)
+        HostSearchIndex._current = (ssh_config, loader, index)
+        return index
+
+    def search(self, query: str, limit: int = 10) -> List[SearchResult]:
+        """
+        Find hosts matching a query, best matches first
+
+        Ranking: exact key, prefix, substring, then fuzzy trigram overlap.
+        Ties prefer shorter keys, or more shared trigrams for fuzzy matches.
+        Each host appears once, under its best-ranked key.
+
+        Args:
+            query: Text to search for (case insensitive)
+            limit: Maximum number of results
+
+        Returns:
+            List of SearchResult
+        """
+        query = query.strip().lower()
+        if not query or limit <= 0:
+            return []
+
+        if len(query) < 3:
+            best = self._prefix_matches(query, limit)
+        else:
+            best = self._substring_matches(query, limit)
+            if not best:
+                best = self._fuzzy_matches(query, limit)
+
+        return [
+            SearchResult(self._hosts[entry_id], self._keys[entry_id], self._sources[entry_id], kind)
+            for kind, _, entry_id in heapq.nsmallest(limit, best.values())
+        ]
+
+    def _prefix_matches(self, query: str, limit: int) -> Dict[str, Tuple[int, int, int]]:
+        # Prefix lists are in rank order: the first `limit` distinct hosts are the answer
+        best: Dict[str, Tuple[int, int, int]] = {}
+        keys, hosts = self._keys, self._hosts
+        for entry_id in self._short_prefixes.get(query, ()):
+            host = hosts[entry_id]
+            if host not in best:
+                best[host] = (_EXACT if keys[entry_id] == query else _PREFIX, entry_id, entry_id)
+                if len(best) >= limit:
+                    break
+        return best
+
+    def _substring_matches(self, query: str, limit: int) -> Dict[str, Tuple[int, int, int]]:
+        postings = []
+        for gram in set(_trigrams(query)):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return {}
+            postings.append(posting)
+
+        # Number of keys starting with the query, to know when all prefix hits are seen
+        prefix_total = (bisect_left(self._sorted_keys, query + "\uffff")
+                        - bisect_left(self._sorted_keys, query))
+
+        best: Dict[str, Tuple[int, int, int]] = {}
+        keys, hosts = self._keys, self._hosts
+        prefix_seen = 0
+        prefix_hosts = 0
+        for entry_id in min(postings, key=len):
+            key = keys[entry_id]
+            position = key.find(query)
+            if position < 0:
+                continue
+            if position == 0:
+                kind = _EXACT if len(key) == len(query) else _PREFIX
+                prefix_seen += 1
+            else:
+                kind = _SUBSTRING
+            host = hosts[entry_id]
+            current = best.get(host)
+            if current is None or kind < current[0]:
+                if current is None and kind != _SUBSTRING:
+                    prefix_hosts += 1
+                elif current is not None and current[0] == _SUBSTRING:
+                    prefix_hosts += 1
+                best[host] = (kind, entry_id, entry_id)
+            # Later entries are longer: stop once they can no longer change the top results
+            if prefix_hosts >= limit or (prefix_seen == prefix_total and len(best) >= limit):
+                break
+        return best
+
+    def _fuzzy_matches(self, query: str, limit: int) -> Dict[str, Tuple[int, int, int]]:
+        postings = sorted((self._postings.get(gram, ()) for gram in set(_trigrams(query))), key=len)
+        # Trigrams shared by a large part of the inventory say little about the
+        # query (e.g. "it1"); score on the selective ones only.
+        common = max(64, len(self._keys) // 16)
+        selective = [posting for posting in postings if 0 < len(posting) <= common] or postings[:1]
+        threshold = max(1, len(selective) // 2)
+
+        counts: Counter = Counter()
+        for posting in selective:
+            counts.update(posting)
+
+        best: Dict[str, Tuple[int, int, int]] = {}
+        hosts = self._hosts
+        for entry_id, shared in counts.items():
+            if shared < threshold:
+                continue
+            rank = (_FUZZY, -shared, entry_id)
+            host = hosts[entry_id]
+            if host not in best or rank < best[host]:
+                best[host] = rank
+        return best
+
+
+if __name__ == "__main__":
+    import sys
+    index = HostSearchIndex.for_current_config()
+    for result in index.search(" ".join(sys.argv[1:]) or "login"):
+        print(result)
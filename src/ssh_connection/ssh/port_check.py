@@ -0,0 +1,260 @@
+import os
+import selectors
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .ssh_config_parser import Forward, SshConfig, SshConfigParser
+
+# What to do with a forward whose local port is taken:
+#   reuse - keep using an ssh tunnel that already listens there, re-map if the owner is not ssh
+#   skip  - start the session without that forward
+#   remap - forward a free local port to the same destination instead
+#   abort - do not start the session
+POLICIES = ("reuse", "skip", "remap", "abort")
+
+
+@dataclass
+class PortConflict:
+    """A forward whose local port is already taken"""
+    forward: Forward
+    pid: Optional[int] = None
+    process: Optional[str] = None
+    cmdline: str = ""
+
+    @property
+    def owned_by_ssh(self) -> bool:
+        """True if the port belongs to an ssh client (an existing tunnel)"""
+        return (self.process or "").lower() in ("ssh", "ssh.exe")
+
+    def describe(self) -> str:
+        """Human readable owner description"""
+        if self.pid is None:
+            return "an unknown process"
+        return f"{self.process or 'process'} (pid {self.pid}){': ' + self.cmdline if self.cmdline else ''}"
+
+
+@dataclass
+class ForwardPlan:
+    """Outcome of checking a host's forwards before launching ssh"""
+    conflicts: List[PortConflict] = field(default_factory=list)
+    # Configured listen port -> port forwarded instead; shown in the tray's session entry
+    remapped: Dict[int, int] = field(default_factory=dict)
+    messages: List[str] = field(default_factory=list)
+    ssh_options: List[str] = field(default_factory=list)
+    abort: bool = False
+
+
+def _listen_address(forward: Forward) -> Tuple[int, str]:
+    """Get (address family, address) ssh binds for a forward (loopback unless given)"""
+    host = forward.listen_host
+    if host in (None, "", "localhost"):
+        return socket.AF_INET, "127.0.0.1"
+    if host == "*":
+        return socket.AF_INET, "0.0.0.0"
+    if ":" in host:
+        return socket.AF_INET6, host
+    return socket.AF_INET, host
+
+
+def probe_forwards(forwards: List[Forward], timeout: float = 0.2) -> List[Forward]:
+    """
+    Find the forwards whose local port cannot be used
+
+    All ports are bound at once with non-blocking sockets. Two forwards of
+    the same host asking for one port are caught by comparing their listen
+    addresses: with SO_REUSEADDR, Linux lets both probe sockets bind a port
+    nobody listens on. The later forward is the conflict. Ports that bind are
+    then connect-probed together (one selector, one short timeout): on
+    Windows a specific-address bind can succeed next to a wildcard listener.
+
+    Args:
+        forwards: LocalForward/DynamicForward specifications
+        timeout: Seconds to wait for all connect probes
+
+    Returns:
+        Forwards in conflict, in the given order
+    """
+    busy: List[int] = []
+    held: List[socket.socket] = []
+    bindable: List[int] = []
+    seen: List[Tuple[str, int]] = []
+    try:
+        for index, forward in enumerate(forwards):
+            family, address = _listen_address(forward)
+            if any(port == forward.listen_port and (other == address or "0.0.0.0" in (other, address)
+                                                    or "::" in (other, address))
+                   for other, port in seen):
+                busy.append(index)
+                continue
+            seen.append((address, forward.listen_port))
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            if os.name != 'nt':
+                # Same as ssh: a port in TIME_WAIT is not a conflict
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                sock.bind((address, forward.listen_port))
+            except OSError:
+                sock.close()
+                busy.append(index)
+                continue
+            held.append(sock)
+            bindable.append(index)
+    finally:
+        for sock in held:
+            sock.close()
+
+    busy.extend(_connect_probe(forwards, bindable, timeout))
+    return [forwards[index] for index in sorted(busy)]
+
+
+def _connect_probe(forwards: List[Forward], indices: List[int], timeout: float) -> List[int]:
+    """Non-blocking connect to the listen ports of forwards[indices] at once; returns those that accept"""
+    if not indices:
+        return []
+    selector = selectors.DefaultSelector()
+    listening: List[int] = []
+    try:
+        for index in indices:
+            forward = forwards[index]
+            family, address = _listen_address(forward)
+            if address in ("0.0.0.0", "::"):
+                address = "127.0.0.1" if family == socket.AF_INET else "::1"
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            result = sock.connect_ex((address, forward.listen_port))
+            if result == 0:
+                listening.append(index)
+                sock.close()
+            else:
+                selector.register(sock, selectors.EVENT_WRITE, index)
+
+        deadline = time.monotonic() + timeout
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(remaining):
+                sock = key.fileobj
+                if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    listening.append(key.data)
+                selector.unregister(sock)
+                sock.close()
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+    return listening
+
+
+def find_port_owners(ports: List[int]) -> Dict[int, Tuple[int, str, str]]:
+    """
+    Look up which processes listen on local TCP ports
+
+    Args:
+        ports: Port numbers
+
+    Returns:
+        Dict mapping port to (pid, process name, command line); ports whose
+        owner cannot be determined (e.g. no permission) are left out
+    """
+    try:
+        import psutil
+    except ImportError:
+        return {}
+
+    wanted = set(ports)
+    owners: Dict[int, Tuple[int, str, str]] = {}
+    try:
+        connections = psutil.net_connections(kind="tcp")
+    except (psutil.AccessDenied, OSError):
+        return owners
+    for conn in connections:
+        if conn.status != psutil.CONN_LISTEN or not conn.laddr or conn.pid is None:
+            continue
+        port = conn.laddr.port
+        if port in wanted and port not in owners:
+            try:
+                process = psutil.Process(conn.pid)
+                owners[port] = (conn.pid, process.name(), " ".join(process.cmdline()))
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                owners[port] = (conn.pid, "", "")
+    return owners
+
+
+def free_port(family: int = socket.AF_INET, address: str = "127.0.0.1") -> int:
+    """Get a port that is currently unused on a local address from the OS"""
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.bind((address, 0))
+        return sock.getsockname()[1]
+
+
+def _bind_spec(forward: Forward, port: int) -> str:
+    """Format the [bind_address:]port of a -L/-D option, keeping the forward's listen address"""
+    host = forward.listen_host
+    if not host:
+        return str(port)
+    if ":" in host:
+        return f"[{host}]:{port}"
+    return f"{host}:{port}"
+
+
+def plan_forwards(host: str, policy: str = "reuse", config: Optional[SshConfig] = None) -> ForwardPlan:
+    """
+    Check every local port a host's ssh session will bind and decide what to do
+
+    Args:
+        host: SSH host name
+        policy: One of POLICIES
+        config: Parsed SSH config. If None, loads ~/.ssh/config
+
+    Returns:
+        ForwardPlan with extra ssh options and messages for the user
+    """
+    config = config or SshConfigParser.load_config()
+    resolved = config.resolve(host)
+    forwards = list(resolved.local_forwards) + list(resolved.dynamic_forwards)
+    plan = ForwardPlan()
+    if not forwards:
+        return plan
+
+    busy = probe_forwards(forwards)
+    if not busy:
+        return plan
+
+    owners = find_port_owners([forward.listen_port for forward in busy])
+    for forward in busy:
+        pid, process, cmdline = owners.get(forward.listen_port, (None, None, ""))
+        plan.conflicts.append(PortConflict(forward, pid, process, cmdline))
+
+    for conflict in plan.conflicts:
+        forward = conflict.forward
+        port = forward.listen_port
+        target = f"{forward.dest_host}:{forward.dest_port}" if forward.dest_host else "SOCKS proxy"
+        prefix = f"Local port {port} ({target}) is in use by {conflict.describe()}"
+        action = policy
+        if policy == "reuse":
+            action = "reuse" if conflict.owned_by_ssh else "remap"
+        if action == "abort":
+            plan.abort = True
+            plan.messages.append(f"{prefix}; not connecting")
+        elif action == "reuse":
+            plan.messages.append(f"{prefix}; reusing the existing tunnel")
+        elif action == "remap":
+            new_port = free_port(*_listen_address(forward))
+            plan.remapped[port] = new_port
+            # Same bind address as configured: a "*:8080" forward stays reachable from other machines
+            if forward.dest_host:
+                plan.ssh_options += ["-L", f"{_bind_spec(forward, new_port)}:{forward.dest_host}:{forward.dest_port}"]
+            else:
+                plan.ssh_options += ["-D", _bind_spec(forward, new_port)]
+            plan.messages.append(f"{prefix}; forwarding local port {new_port} instead")
+        else:
+            plan.messages.append(f"{prefix}; skipping this forward")
+
+    if not plan.abort:
+        # The configured forward still fails to bind; let ssh carry on without it
+        plan.ssh_options = ["-o", "ExitOnForwardFailure=no"] + plan.ssh_options
+    return plan
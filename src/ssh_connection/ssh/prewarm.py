@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .control_master import ControlMasterManager, find_jump_hosts
+from .ssh_config_parser import SshConfigParser
+from ..diagnostics.logs import log_event
+
+logger = logging.getLogger(__name__)
+
+
+class JumpHostWarmer:
+    """
+    Authenticates the warm set of jump hosts in the background
+
+    Each host gets a ControlMaster, so the first real click on a TEST or PROD
+    host lands on an already-open transport. Runs in daemon threads and
+    never blocks the caller; progress and failures go to the log and are
+    available through ``status()`` for the tray menu.
+    """
+
+    def __init__(self, hosts: List[str], manager: Optional[ControlMasterManager] = None,
+                 max_workers: int = 4, on_change: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            hosts: Jump hosts to warm up
+            manager: ControlMaster manager. If None, uses the shared one
+            max_workers: Maximum number of concurrent authentications
+            on_change: Called (from a worker thread) whenever a host's status changes
+        """
+        self.hosts = list(hosts)
+        self.manager = manager or ControlMasterManager.shared()
+        self.max_workers = max(1, max_workers)
+        self.on_change = on_change
+        self._status: Dict[str, str] = {host: "pending" for host in self.hosts}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def from_config() -> 'JumpHostWarmer':
+        """
+        Build a warmer for the warmHosts of config.yml
+
+        When warmHosts is not set the jump hosts of ~/.ssh/config are used; an
+        empty list disables warm-up.
+
+        Returns:
+            JumpHostWarmer (possibly with no hosts)
+        """
+        from ..config.config_loader import ConfigLoader
+
+        hosts = ConfigLoader.load().warm_hosts
+        if hosts is None:
+            hosts = find_jump_hosts(SshConfigParser.load_config())
+        return JumpHostWarmer(hosts)
+
+    def start(self) -> None:
+        """Start warming up in a background thread; returns immediately"""
+        if self._thread is not None or not self.hosts:
+            return
+        if not self.manager.available():
+            logger.info("Jump host warm-up skipped: connection multiplexing is not supported on this platform")
+            self._set_all("unsupported")
+            return
+        self._thread = threading.Thread(target=self._run, name="jump-host-warmup", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for warm-up to finish"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> Dict[str, str]:
+        """
+        Get the warm-up state of every host
+
+        Returns:
+            Dict mapping host to pending, warming, ready, failed or unsupported
+        """
+        with self._lock:
+            return dict(self._status)
+
+    def _run(self) -> None:
+        started = time.monotonic()
+        logger.info(f"Warming up {len(self.hosts)} jump host(s): {', '.join(self.hosts)}")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.hosts)),
+                                thread_name_prefix="warmup") as executor:
+            list(executor.map(self._warm, self.hosts))
+        ready = sum(1 for state in self.status().values() if state == "ready")
+        logger.info(f"Jump host warm-up finished: {ready}/{len(self.hosts)} ready "
+                     f"in {time.monotonic() - started:.1f}s")
+
+    def _warm(self, host: str) -> None:
+        from ..config.config_loader import ConfigLoader
+
+        self._set(host, "warming")
+        started = time.monotonic()
+        try:
+            config = ConfigLoader.load()
+            ready = self.manager.start_master(host, config.get_password(host), config.get_username(host))
+        except Exception as e:
+            logger.error(f"Warm-up of {host} failed: {e}")
+            log_event("failure", host=host, stage="warmup", error=str(e))
+            self._set(host, "failed")
+            return
+
+        if ready:
+            logger.info(f"Warm-up of {host} ready in {time.monotonic() - started:.1f}s")
+            self._set(host, "ready")
+        else:
+            logger.warning(f"Warm-up of {host} failed after {time.monotonic() - started:.1f}s")
+            log_event("failure", host=host, stage="warmup", duration=round(time.monotonic() - started, 3))
+            self._set(host, "failed")
+
+    def _set(self, host: str, state: str) -> None:
+        with self._lock:
+            self._status[host] = state
+        self._notify()
+
+    def _set_all(self, state: str) -> None:
+        with self._lock:
+            for host in self._status:
+                self._status[host] = state
+        self._notify()
+
+    def _notify(self) -> None:
+        if self.on_change is not None:
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.debug(f"Warm-up status callback failed: {e}")
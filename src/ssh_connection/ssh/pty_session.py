@@ -0,0 +1,309 @@
+import os
+import re
+import select
+import sys
+import time
+from typing import Callable, List, Optional
+
+
+class PromptWatcher:
+    """
+    Scans ssh terminal output and decides how to answer authentication prompts
+
+    Feed it every chunk read from the pseudo-terminal. It answers password
+    prompts (one per hop of a ProxyJump chain, up to max_passwords) and,
+    when allowed, the new host key confirmation. Once the remote shell looks
+    ready, authentication failed or a prompt needs a human, ``done`` is set
+    and the session belongs to the user. With a password to give, a shell
+    prompt seen before any password prompt only counts once a command is
+    typed after it, since login banners can end the same way.
+    """
+
+    # ssh's own password prompts: "user@host's password:", "Password:", "(user@host) Password:",
+    # "Password for user@host:". Key passphrase prompts ("Enter passphrase for key ...") are
+    # left to the user or the agent: the account password must never be typed into them
+    PASSWORD_PROMPT = re.compile(rb"(?i)(?:^|[\s(])password(?: for [^\r\n:]*)?:\s*$")
+    HOST_KEY_PROMPT = re.compile(rb"(?i)continue connecting \(yes/no(?:/\[fingerprint\])?\)\?\s*$")
+    DENIED = re.compile(rb"(?i)permission denied")
+    # A prompt such as "user@host:~$ "; the word character keeps "#####" banners out. Banners
+    # like "*** Authorized use only #" still match, so before a password was sent it is final
+    # only once something is typed on that line (see feed())
+    SHELL_READY = re.compile(rb"\w[^\r\n]*[$#>%]\s*$")
+
+    def __init__(self, password: Optional[str], accept_new_host_key: bool = False, max_passwords: int = 3):
+        self.password = password
+        self.accept_new_host_key = accept_new_host_key
+        self.max_passwords = max_passwords
+        self.passwords_sent = 0
+        self.state = "waiting"
+        self.done = False
+        self._tail = b""
+        # The line that looked like a shell prompt before any password was sent
+        self._shell_line: Optional[bytes] = None
+
+    def feed(self, data: bytes) -> Optional[bytes]:
+        """
+        Process terminal output
+
+        Args:
+            data: Bytes just read from the pseudo-terminal
+
+        Returns:
+            Bytes to write back to ssh, or None
+        """
+        if self.done:
+            return None
+
+        if self.passwords_sent and self.DENIED.search(data):
+            self.finish("denied")
+            return None
+
+        # Only the current (unterminated) line can hold a prompt
+        self._tail = (self._tail + data)[-512:]
+        if self._shell_line is not None:
+            first, newline, _ = self._tail.partition(b"\n")
+            if newline:
+                if first.rstrip() != self._shell_line:
+                    # A command was typed at the shell: later prompts (sudo, ...) are the user's
+                    self.finish("no-prompt")
+                    return None
+                # Just a banner line ending like a prompt: ssh may still ask for the password
+                self._shell_line = None
+        line = self._tail.rsplit(b"\n", 1)[-1]
+
+        if self.HOST_KEY_PROMPT.search(line):
+            self._tail = b""
+            if self.accept_new_host_key:
+                self.state = "host-key-accepted"
+                return b"yes\n"
+            self.finish("host-key")
+            return None
+
+        if self.PASSWORD_PROMPT.search(line):
+            self._tail = b""
+            if self.password is None or self.passwords_sent >= self.max_passwords:
+                self.finish("password-prompt")
+                return None
+            self.passwords_sent += 1
+            self.state = "password-sent"
+            return self.password.encode("utf-8") + b"\n"
+
+        if self.SHELL_READY.search(line):
+            if self.passwords_sent:
+                self.finish("authenticated")
+            elif self.password is None:
+                self.finish("no-prompt")
+            elif self._shell_line is None:
+                self._tail = line
+                self._shell_line = line.rstrip()
+        return None
+
+    def finish(self, state: str) -> None:
+        """Stop answering prompts and record the final state"""
+        self.state = state
+        self.done = True
+
+
+class PtySshSession:
+    """
+    Runs ssh under a pseudo-terminal and answers its prompts as they appear
+
+    Replaces the fixed sleep + blind keystroke approach: the password is sent
+    the moment ssh asks for it, so connect latency is the real handshake time,
+    and nothing is typed if a host key confirmation shows up instead. POSIX
+    only (uses the pty module).
+    """
+
+    def __init__(self, argv: List[str], password: Optional[str] = None,
+                 accept_new_host_key: bool = False, auth_timeout: float = 30.0,
+                 output: Optional[Callable[[bytes], None]] = None):
+        """
+        Args:
+            argv: Command to run, e.g. ["ssh", "user@host"]
+            password: Password to answer prompts with, None to leave prompts to the user
+            accept_new_host_key: Answer "yes" to unknown host key confirmations
+            auth_timeout: Seconds to keep watching for prompts before handing over
+            output: Callback receiving terminal output, defaults to stdout
+        """
+        self.argv = argv
+        self.watcher = PromptWatcher(password, accept_new_host_key)
+        self.auth_timeout = auth_timeout
+        self.output = output or self._write_stdout
+        self.pid: Optional[int] = None
+        self.fd: Optional[int] = None
+        self.exit_code: Optional[int] = None
+        self.started_at = 0.0
+        # Seconds from start until the shell was ready after a password was sent
+        self.auth_latency: Optional[float] = None
+
+    @staticmethod
+    def _write_stdout(data: bytes) -> None:
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+    def start(self) -> None:
+        """Fork ssh with the pseudo-terminal as its controlling terminal"""
+        import pty
+
+        self.started_at = time.monotonic()
+        pid, fd = pty.fork()
+        if pid == 0:
+            try:
+                os.execvp(self.argv[0], self.argv)
+            finally:
+                os._exit(127)
+        self.pid, self.fd = pid, fd
+        self._sync_window_size()
+
+    def authenticate(self) -> str:
+        """
+        Watch ssh output and answer prompts without user interaction
+
+        Returns:
+            Final watcher state: authenticated, no-prompt, denied, host-key,
+            password-prompt, exited or timeout
+        """
+        deadline = self.started_at + self.auth_timeout
+        while not self.watcher.done:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.watcher.finish("timeout")
+                break
+            readable, _, _ = select.select([self.fd], [], [], min(remaining, 0.2))
+            if readable:
+                if not self._pump_output():
+                    self.watcher.finish("exited")
+                    break
+            elif self.poll() is not None:
+                # ssh -f backgrounds itself without closing the terminal
+                self.watcher.finish("exited")
+                break
+        return self.watcher.state
+
+    def interact(self) -> int:
+        """
+        Hand the terminal to the user while still answering early prompts
+
+        Keystrokes go straight to ssh; until authentication is over the
+        watcher keeps answering prompts as they arrive.
+
+        Returns:
+            ssh exit code
+        """
+        import signal
+        import termios
+        import tty
+
+        stdin_fd = sys.stdin.fileno()
+        saved_mode = None
+        if os.isatty(stdin_fd):
+            saved_mode = termios.tcgetattr(stdin_fd)
+            tty.setraw(stdin_fd)
+        previous_handler = signal.signal(signal.SIGWINCH, lambda signum, frame: self._sync_window_size())
+
+        deadline = self.started_at + self.auth_timeout
+        watched = [self.fd, stdin_fd]
+        try:
+            while True:
+                if not self.watcher.done and time.monotonic() > deadline:
+                    # Never answer later prompts (e.g. sudo) with the login password
+                    self.watcher.finish("timeout")
+                try:
+                    readable, _, _ = select.select(watched, [], [], None if self.watcher.done else 0.5)
+                except InterruptedError:
+                    continue
+                if self.fd in readable and not self._pump_output():
+                    break
+                if stdin_fd in readable:
+                    data = os.read(stdin_fd, 1024)
+                    if not data:
+                        watched = [self.fd]
+                        continue
+                    os.write(self.fd, data)
+        finally:
+            signal.signal(signal.SIGWINCH, previous_handler)
+            if saved_mode is not None:
+                termios.tcsetattr(stdin_fd, termios.TCSADRAIN, saved_mode)
+
+        return self.wait()
+
+    def send(self, data: bytes) -> None:
+        """Write raw bytes to ssh's terminal"""
+        os.write(self.fd, data)
+
+    def poll(self) -> Optional[int]:
+        """
+        Check whether ssh has exited without blocking
+
+        Returns:
+            ssh exit code, or None while it is running
+        """
+        if self.exit_code is None:
+            pid, status = os.waitpid(self.pid, os.WNOHANG)
+            if pid != 0:
+                self._set_exit_code(status)
+        return self.exit_code
+
+    def terminate(self) -> None:
+        """Send SIGTERM to ssh if it is still running"""
+        import signal
+        if self.poll() is None:
+            try:
+                os.kill(self.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def wait(self, drain: bool = True) -> int:
+        """
+        Wait for ssh to exit and release the pseudo-terminal
+
+        Args:
+            drain: Keep reading output until the terminal closes. Disable for
+                ssh -f, whose background child keeps the terminal open.
+
+        Returns:
+            ssh exit code
+        """
+        if self.exit_code is None:
+            if drain:
+                while self._pump_output():
+                    pass
+            _, status = os.waitpid(self.pid, 0)
+            self._set_exit_code(status)
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        return self.exit_code
+
+    def _set_exit_code(self, status: int) -> None:
+        if os.WIFEXITED(status):
+            self.exit_code = os.WEXITSTATUS(status)
+        else:
+            self.exit_code = -os.WTERMSIG(status)
+
+    def _pump_output(self) -> bool:
+        """Read one chunk from ssh, show it and answer prompts. False on EOF."""
+        try:
+            data = os.read(self.fd, 4096)
+        except OSError:
+            # Linux raises EIO on the master once the child side is closed
+            return False
+        if not data:
+            return False
+        self.output(data)
+        reply = self.watcher.feed(data)
+        if reply is not None:
+            os.write(self.fd, reply)
+        if self.watcher.state == "authenticated" and self.auth_latency is None:
+            self.auth_latency = time.monotonic() - self.started_at
+        return True
+
+    def _sync_window_size(self) -> None:
+        """Copy the user's terminal size to the pseudo-terminal"""
+        try:
+            import fcntl
+            import termios
+            size = fcntl.ioctl(sys.stdout.fileno(), termios.TIOCGWINSZ, b"\0" * 8)
+            fcntl.ioctl(self.fd, termios.TIOCSWINSZ, size)
+        except Exception:
+            pass
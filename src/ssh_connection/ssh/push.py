@@ -0,0 +1,271 @@
+import hashlib
+import os
+import shlex
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .reachability import plan_endpoints
+from .ssh_config_parser import SshConfig, SshConfigParser
+
+CHUNK_SIZE = 256 * 1024
+
+
+class PushResult(NamedTuple):
+    """How the file got to one host"""
+    host: str
+    ok: bool
+    method: str
+    duration: float
+    error: Optional[str] = None
+
+
+def file_digest(path: Path, chunk_size: int = CHUNK_SIZE) -> Tuple[str, int]:
+    """
+    Compute the SHA-256 of a local file in chunks
+
+    Returns:
+        Tuple of (hex digest, size in bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class BulkPush:
+    """
+    Copies one file to many hosts, crossing each jump host's uplink once
+
+    Targets are grouped by the jump host they sit behind. The file is
+    streamed once to each jump host (in chunks, with progress) and checked
+    there; the jump host then copies it to its targets with scp over the
+    internal network, at most per_jump at a time. Targets the jump host
+    cannot log in to (scp needs key or forwarded agent authentication) and
+    targets without a jump host get the file streamed through a pooled
+    transport instead. Every copy is written to "<dest>.part", compared
+    against the local SHA-256 and only then renamed to its destination.
+    """
+
+    def __init__(self, source: Path, dest: str, per_jump: int = 4, parallel: int = 16,
+                 config: Optional[SshConfig] = None, pool=None,
+                 progress: Optional[Callable[[str, int, int], None]] = None,
+                 chunk_size: int = CHUNK_SIZE):
+        """
+        Args:
+            source: Local file to distribute
+            dest: Destination path on the targets
+            per_jump: Maximum concurrent copies per jump host
+            parallel: Maximum concurrent direct uploads
+            config: Parsed SSH config. If None, loads ~/.ssh/config
+            pool: TransportPool to use. If None, uses the shared one
+            progress: Called with (host, bytes sent, total bytes) while streaming
+            chunk_size: Bytes per write
+        """
+        self.source = Path(source)
+        self.dest = dest
+        self.per_jump = max(1, per_jump)
+        self.parallel = max(1, parallel)
+        self.config = config or SshConfigParser.load_config()
+        if pool is None:
+            from .transport_pool import TransportPool
+            pool = TransportPool.shared()
+        self.pool = pool
+        self.progress = progress
+        self.chunk_size = chunk_size
+        self.digest, self.size = file_digest(self.source, chunk_size)
+
+    def run(self, hosts: List[str]) -> List[PushResult]:
+        """
+        Copy the file to every host
+
+        Args:
+            hosts: Target host names
+
+        Returns:
+            One PushResult per host, in the given order
+        """
+        endpoints = plan_endpoints(self.config, hosts)
+        groups: Dict[Optional[str], List[str]] = {}
+        for host in hosts:
+            endpoint = endpoints.get(host)
+            groups.setdefault(endpoint.via if endpoint else None, []).append(host)
+
+        results: Dict[str, PushResult] = {}
+        lock = threading.Lock()
+
+        def record(group_results: List[PushResult]) -> None:
+            with lock:
+                results.update((result.host, result) for result in group_results)
+
+        jobs = [(jump, targets) for jump, targets in groups.items() if jump is not None]
+        direct = groups.get(None, [])
+        with ThreadPoolExecutor(max_workers=len(jobs) + 1, thread_name_prefix="push-group") as executor:
+            futures = [executor.submit(lambda job=job: record(self._push_via_jump(*job))) for job in jobs]
+            if direct:
+                futures.append(executor.submit(lambda: record(self._push_direct_all(direct, self.parallel))))
+            for future in futures:
+                future.result()
+        return [results[host] for host in hosts]
+
+    def _push_direct_all(self, hosts: List[str], workers: int) -> List[PushResult]:
+        with ThreadPoolExecutor(max_workers=min(workers, len(hosts)), thread_name_prefix="push") as executor:
+            return list(executor.map(self._push_direct, hosts))
+
+    def _push_direct(self, host: str) -> PushResult:
+        started = time.monotonic()
+        try:
+            self._stream(host, self.dest)
+        except Exception as e:
+            return PushResult(host, False, "stream", time.monotonic() - started, str(e))
+        return PushResult(host, True, "stream", time.monotonic() - started)
+
+    def _push_via_jump(self, jump: str, targets: List[str]) -> List[PushResult]:
+        staging = None
+        try:
+            # A private directory per run: concurrent pushes never share (or delete) each other's copy
+            staging = self._make_staging_dir(jump)
+            staged = f"{staging}/{self.digest[:16]}"
+            self._stream(jump, staged, finalize=False)
+        except Exception as e:
+            if staging is not None:
+                self._remove_staging_dir(jump, staging)
+            # Staging failed: fall back to streaming to every target through the jump transport
+            results = self._push_direct_all(targets, self.per_jump)
+            return [result._replace(error=result.error or f"staging on {jump} failed: {e}")
+                    if not result.ok else result for result in results]
+
+        def relay(host: str) -> PushResult:
+            host_started = time.monotonic()
+            try:
+                self._relay(jump, staged, host)
+                return PushResult(host, True, f"relay via {jump}", time.monotonic() - host_started)
+            except Exception as relay_error:
+                result = self._push_direct(host)
+                if result.ok:
+                    return result._replace(method=f"stream ({relay_error})")
+                return result
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.per_jump, len(targets)),
+                                    thread_name_prefix=f"push-{jump}") as executor:
+                return list(executor.map(relay, targets))
+        finally:
+            self._remove_staging_dir(jump, staging)
+
+    def _make_staging_dir(self, jump: str) -> str:
+        """Create a 0700 staging directory on the jump host with mktemp and return its path"""
+        exit_code, output = self._exec(jump, 'mktemp -d "${TMPDIR:-/tmp}/ssh-connection-push.XXXXXXXXXX"')
+        path = output.strip()
+        if exit_code != 0 or not path.startswith("/"):
+            raise RuntimeError(path or f"mktemp exited with {exit_code}")
+        return path
+
+    def _remove_staging_dir(self, jump: str, staging: str) -> None:
+        """Remove a staging directory created by _make_staging_dir (and nothing else)"""
+        try:
+            self._exec(jump, f"rm -rf -- {shlex.quote(staging)}")
+        except Exception:
+            pass
+
+    def _relay(self, jump: str, staged: str, host: str) -> None:
+        """Have the jump host scp its staged copy to a target, then verify it there"""
+        address, port = self._address_from(jump, host)
+        user, _ = self.pool.credentials(host)
+        target = f"{user}@{address}" if user else address
+        part = f"{self.dest}.part"
+        command = (f"scp -q -o BatchMode=yes -o ConnectTimeout=10 -P {port} "
+                   f"{shlex.quote(staged)} {shlex.quote(target + ':' + part)}")
+        exit_code, output = self._exec(jump, command, forward_agent=True)
+        if exit_code != 0:
+            raise RuntimeError(output.strip() or f"scp exited with {exit_code}")
+        self._finalize(host, part)
+
+    def _address_from(self, jump: str, host: str) -> Tuple[str, int]:
+        """Get the address a target has on the jump host's side"""
+        resolved = self.config.resolve(host)
+        if resolved.proxy_jump:
+            return resolved.hostname, resolved.port
+        for forward in self.config.resolve(jump).local_forwards:
+            if forward.listen_port == resolved.port and forward.dest_host:
+                return forward.dest_host, forward.dest_port
+        return resolved.hostname, resolved.port
+
+    def _stream(self, host: str, path: str, finalize: bool = True) -> None:
+        """Write the file to host:path through an exec channel, in chunks"""
+        part = f"{path}.part" if finalize else path
+        channel = self.pool.exec_channel(host, f"umask 077 && cat > {shlex.quote(part)}")
+        try:
+            sent = 0
+            last_report = -1
+            with open(self.source, "rb") as source:
+                for chunk in iter(lambda: source.read(self.chunk_size), b""):
+                    channel.sendall(chunk)
+                    sent += len(chunk)
+                    # Report every 10%
+                    step = sent * 10 // max(self.size, 1)
+                    if self.progress is not None and step != last_report:
+                        last_report = step
+                        self.progress(host, sent, self.size)
+            channel.shutdown_write()
+            exit_code = channel.recv_exit_status()
+            if exit_code != 0:
+                error = channel.recv_stderr(4096).decode("utf-8", "replace").strip()
+                raise RuntimeError(error or f"upload exited with {exit_code}")
+        finally:
+            channel.close()
+        if finalize:
+            self._finalize(host, part)
+        elif self._remote_digest(host, path) != self.digest:
+            raise RuntimeError(f"checksum mismatch on {host}:{path}")
+
+    def _finalize(self, host: str, part: str) -> None:
+        """Verify the uploaded part against the local checksum and move it into place"""
+        if self._remote_digest(host, part) != self.digest:
+            self._exec(host, f"rm -f {shlex.quote(part)}")
+            raise RuntimeError(f"checksum mismatch on {host}")
+        exit_code, output = self._exec(host, f"mv -f {shlex.quote(part)} {shlex.quote(self.dest)}")
+        if exit_code != 0:
+            raise RuntimeError(output.strip() or f"mv exited with {exit_code}")
+
+    def _remote_digest(self, host: str, path: str) -> Optional[str]:
+        exit_code, output = self._exec(host, f"sha256sum {shlex.quote(path)} 2>/dev/null")
+        if exit_code != 0 or not output:
+            return None
+        return output.split()[0]
+
+    def _exec(self, host: str, command: str, forward_agent: bool = False) -> Tuple[int, str]:
+        channel = self.pool.exec_channel(host, command, combine_stderr=True,
+                                         forward_agent=forward_agent and bool(os.environ.get("SSH_AUTH_SOCK")))
+        try:
+            output = channel.makefile("rb").read().decode("utf-8", "replace")
+            return channel.recv_exit_status(), output
+        finally:
+            channel.close()
+
+
+def format_results(results: List[PushResult]) -> str:
+    """
+    Render the per-host summary printed after --push
+
+    Returns:
+        Table of status, method and duration per host plus a totals line
+    """
+    if not results:
+        return "No hosts selected"
+    width = max(len("HOST"), max(len(result.host) for result in results))
+    lines = [f"{'HOST':<{width}}  {'STATUS':<6}  {'TIME':>8}  METHOD"]
+    for result in results:
+        status = "ok" if result.ok else "FAILED"
+        line = f"{result.host:<{width}}  {status:<6}  {result.duration:>7.2f}s  {result.method}"
+        if result.error:
+            line += f"  {result.error}"
+        lines.append(line)
+    ok = sum(1 for result in results if result.ok)
+    lines.append(f"\n{ok}/{len(results)} verified")
+    return "\n".join(lines)
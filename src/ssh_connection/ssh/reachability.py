@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .control_master import _first_hop, find_jump_hosts
+from .ssh_config_parser import SshConfig, SshConfigParser
+
+logger = logging.getLogger(__name__)
+
+_LOOPBACK = ("localhost", "127.0.0.1", "::1")
+
+
+class Endpoint(NamedTuple):
+    """Address probed for a host, and the jump host it is reached through"""
+    address: str
+    port: int
+    via: Optional[str]
+
+
+class ProbeResult(NamedTuple):
+    """Outcome of one reachability probe"""
+    host: str
+    endpoint: Endpoint
+    up: bool
+    latency: Optional[float]
+    error: Optional[str]
+    checked_at: float
+
+
+def _hop_port(hop: str, default: int) -> int:
+    """Get the port of a ProxyJump hop ([user@]host[:port]), default if none is given"""
+    host = hop.split(",")[0].rsplit("@", 1)[-1]
+    if ":" in host:
+        try:
+            return int(host.rsplit(":", 1)[1])
+        except ValueError:
+            pass
+    return default
+
+
+def plan_endpoints(config: SshConfig, hosts: Iterable[str]) -> Dict[str, Endpoint]:
+    """
+    Work out which TCP endpoint tells whether each host can be reached
+
+    Direct hosts are probed at HostName:Port. Hosts pointing at a local port
+    (HostName localhost / Port 2222) are probed there too: that port is the
+    jump host's LocalForward, so the probe goes through the tunnel. ProxyJump
+    hosts cannot be reached without ssh; their first hop is probed instead.
+    Hosts using ProxyCommand are left out.
+
+    Args:
+        config: Parsed SSH config model
+        hosts: Host names to plan
+
+    Returns:
+        Dict mapping host name to Endpoint
+    """
+    # Local port -> jump host forwarding it, computed once for the whole inventory
+    forwarded: Dict[int, str] = {}
+    for jump in find_jump_hosts(config):
+        for forward in config.resolve(jump).local_forwards:
+            forwarded.setdefault(forward.listen_port, jump)
+
+    endpoints: Dict[str, Endpoint] = {}
+    for host in hosts:
+        resolved = config.resolve(host)
+        proxy_command = resolved.get("proxycommand")
+        if proxy_command is not None and proxy_command.lower() != "none":
+            continue
+        if resolved.proxy_jump:
+            jump = _first_hop(resolved.proxy_jump)
+            jump_resolved = config.resolve(jump)
+            endpoints[host] = Endpoint(jump_resolved.hostname,
+                                       _hop_port(resolved.proxy_jump, jump_resolved.port), jump)
+        elif resolved.hostname in _LOOPBACK:
+            via = forwarded.get(resolved.port)
+            endpoints[host] = Endpoint(resolved.hostname, resolved.port, via if via != host else None)
+        else:
+            endpoints[host] = Endpoint(resolved.hostname, resolved.port, None)
+    return endpoints
+
+
+async def _probe(address: str, port: int, timeout: float,
+                 semaphore: asyncio.Semaphore) -> Tuple[bool, Optional[float], Optional[str]]:
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout)
+        except asyncio.TimeoutError:
+            return False, None, "timeout"
+        except socket.gaierror:
+            return False, None, "unknown host"
+        except OSError as e:
+            return False, None, os.strerror(e.errno) if e.errno else str(e)
+        latency = time.perf_counter() - started
+        writer.close()
+        return True, latency, None
+
+
+async def _probe_all(endpoints: List[Tuple[str, int]], timeout: float,
+                     concurrency: int) -> List[Tuple[bool, Optional[float], Optional[str]]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(_probe(address, port, timeout, semaphore)
+                                  for address, port in endpoints))
+
+
+def probe_endpoints(endpoints: List[Tuple[str, int]], timeout: float = 1.5,
+                    concurrency: int = 256) -> List[Tuple[bool, Optional[float], Optional[str]]]:
+    """
+    TCP-connect to many endpoints concurrently on a private event loop
+
+    Args:
+        endpoints: (address, port) pairs
+        timeout: Seconds allowed per connection attempt
+        concurrency: Maximum number of connection attempts in flight
+
+    Returns:
+        (up, latency in seconds, error) per endpoint, in the given order
+    """
+    if not endpoints:
+        return []
+    return asyncio.run(_probe_all(endpoints, timeout, max(1, concurrency)))
+
+
+class ReachabilityChecker:
+    """
+    Probes hosts of the SSH config and caches the results for a while
+
+    Each distinct endpoint is probed once per check, however many hosts share
+    it (all ProxyJump hosts behind one bastion cost one probe). Results stay
+    fresh for ttl seconds; check() only probes hosts without a fresh result.
+    """
+
+    _shared: Optional['ReachabilityChecker'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, ttl: float = 120.0, timeout: float = 1.5, concurrency: int = 256):
+        """
+        Args:
+            ttl: Seconds a probe result stays valid
+            timeout: Seconds allowed per connection attempt
+            concurrency: Maximum number of connection attempts in flight
+        """
+        self.ttl = ttl
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self._results: Dict[str, ProbeResult] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def shared() -> 'ReachabilityChecker':
+        """Get the process-wide checker"""
+        with ReachabilityChecker._shared_lock:
+            if ReachabilityChecker._shared is None:
+                ReachabilityChecker._shared = ReachabilityChecker()
+            return ReachabilityChecker._shared
+
+    def check(self, hosts: Optional[List[str]] = None, config: Optional[SshConfig] = None,
+              force: bool = False) -> Dict[str, ProbeResult]:
+        """
+        Probe hosts whose cached result is missing or expired
+
+        Args:
+            hosts: Host names to check. If None, every TEST/PROD host
+            config: Parsed SSH config. If None, loads ~/.ssh/config
+            force: Probe even hosts with a fresh result
+
+        Returns:
+            Dict mapping host name to its ProbeResult, in the given order
+            (hosts that cannot be probed are left out)
+        """
+        config = config or SshConfigParser.load_config()
+        if hosts is None:
+            hosts = list(dict.fromkeys(host for section in config.host_map.values() for host in section))
+
+        now = time.monotonic()
+        with self._lock:
+            stale = [host for host in hosts if force or not self._fresh(self._results.get(host), now)]
+
+        if stale:
+            endpoints = plan_endpoints(config, stale)
+            unique = list(dict.fromkeys((endpoint.address, endpoint.port) for endpoint in endpoints.values()))
+            outcomes = dict(zip(unique, probe_endpoints(unique, self.timeout, self.concurrency)))
+            checked_at = time.monotonic()
+            with self._lock:
+                for host, endpoint in endpoints.items():
+                    up, latency, error = outcomes[(endpoint.address, endpoint.port)]
+                    self._results[host] = ProbeResult(host, endpoint, up, latency, error, checked_at)
+
+        with self._lock:
+            return {host: self._results[host] for host in hosts if host in self._results}
+
+    def get(self, host: str) -> Optional[ProbeResult]:
+        """
+        Get the cached result of a host
+
+        Returns:
+            ProbeResult, or None if the host was not probed or the result expired
+        """
+        with self._lock:
+            result = self._results.get(host)
+        return result if self._fresh(result, time.monotonic()) else None
+
+    def clear(self) -> None:
+        """Forget all cached results"""
+        with self._lock:
+            self._results.clear()
+
+    def start(self, on_change: Optional[Callable[[], None]] = None) -> None:
+        """
+        Re-check every TEST/PROD host in a daemon thread each time results expire
+
+        Args:
+            on_change: Called from the checker thread after every check
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(on_change,),
+                                        name="reachability", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background checks"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
+
+    def _fresh(self, result: Optional[ProbeResult], now: float) -> bool:
+        return result is not None and now - result.checked_at < self.ttl
+
+    def _run(self, on_change: Optional[Callable[[], None]]) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                results = self.check()
+                up = sum(1 for result in results.values() if result.up)
+                logger.info(f"Reachability: {up}/{len(results)} hosts up "
+                             f"({time.monotonic() - started:.1f}s)")
+                if on_change is not None:
+                    on_change()
+            except Exception as e:
+                logger.error(f"Reachability check failed: {e}")
+            self._stop.wait(self.ttl)
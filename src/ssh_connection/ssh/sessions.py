@@ -0,0 +1,560 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Process names of the OpenSSH client
+_SSH_NAMES = ("ssh", "ssh.exe")
+
+# ssh options that take an argument (attached, as in -p22, or as the next word)
+_SSH_VALUE_FLAGS = set("BbcDEeFIiJLlmOoPpQRSWw")
+
+# Slack between psutil's create_time() and the wall clock when matching a PID to a launch
+_CREATE_TIME_SLACK = 1.0
+
+
+@dataclass
+class Session:
+    """An ssh session started (or found running) by this application"""
+    host: str
+    pid: int
+    forwards: Tuple[int, ...] = ()
+    method: str = ""
+    started: float = field(default_factory=time.time)
+    # The ssh client itself, once found below or next to the launcher process
+    ssh_pid: Optional[int] = None
+
+    def describe(self) -> str:
+        pid = self.ssh_pid or self.pid
+        text = f"{self.host} (pid {pid})"
+        if self.forwards:
+            text += f" ports {', '.join(str(port) for port in self.forwards)}"
+        return text
+
+
+class SessionUsage(NamedTuple):
+    """CPU and memory of one session's processes at the last sample"""
+    host: str
+    pid: int
+    cpu_percent: float
+    rss: int
+    processes: int
+
+
+def _parse_ssh_args(args: List[str]) -> Tuple[Set[str], List[Tuple[str, str]], Optional[str]]:
+    """
+    Split ssh arguments like ssh's own getopt does
+
+    Flags may be clustered (-tt, -fN); an option that takes a value consumes
+    the rest of its word or the next one. Options are read before and right
+    after the destination, the first other word after it starts the command.
+
+    Returns:
+        (flags without a value, (flag, value) options, destination or None)
+    """
+    flags: Set[str] = set()
+    options: List[Tuple[str, str]] = []
+    destination = None
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        index += 1
+        if arg == "--":
+            if destination is None and index < len(args):
+                destination = args[index]
+            break
+        if not arg.startswith("-") or arg == "-":
+            if destination is not None:
+                break
+            destination = arg
+            continue
+        for position, flag in enumerate(arg[1:], 1):
+            if flag not in _SSH_VALUE_FLAGS:
+                flags.add(flag)
+                continue
+            value = arg[position + 1:]
+            if not value and index < len(args):
+                value = args[index]
+                index += 1
+            options.append((flag, value))
+            break
+    return flags, options, destination
+
+
+def _targets_host(cmdline: List[str], host: str) -> bool:
+    """
+    Check whether an ssh command line is an interactive session to host
+
+    ControlMasters (-M, -O, ControlMaster=yes) and ProxyJump relays (-W) are
+    managed elsewhere and never count as sessions.
+    """
+    flags, options, destination = _parse_ssh_args(cmdline[1:])
+    if "M" in flags or any(flag in ("O", "W") for flag, _ in options):
+        return False
+    for flag, value in options:
+        if flag == "o" and re.split(r"[\s=]+", value.strip().lower(), 1) == ["controlmaster", "yes"]:
+            return False
+    if destination is None:
+        return False
+    host = host.lower()
+    destination = destination.lower()
+    return destination == host or destination.endswith("@" + host)
+
+
+class SessionRegistry:
+    """
+    Tracks the ssh processes the launcher starts
+
+    Launchers often exit right away (cmd /c start, batch files), so each
+    session remembers the launcher PID and, once found, the PID of the ssh
+    client: a descendant of the launcher, or else the ssh process targeting
+    the host that started within scan_window seconds of the launch. Sessions
+    whose processes are gone are dropped on the next read.
+
+    Each PID is looked up once, at register time or when it is found, and the
+    psutil.Process is kept for the life of the session: a launcher that exits
+    right away may have its PID reused by an unrelated program, which a fresh
+    lookup would then adopt (and close). With a state_path, the resolved ssh
+    clients are also written there so adopt_running() after a restart only
+    picks up the processes this application started.
+
+    sample() measures CPU and memory of every session's process tree; the
+    psutil.Process objects are kept between samples so cpu_percent() is the
+    usage since the previous sample, and start_monitor() takes one every
+    interval seconds in the background. Readers (the tray menu) only see the
+    last sample and never touch the processes.
+    """
+
+    _shared: Optional['SessionRegistry'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, scan_window: float = 30.0, state_path: Optional[Path] = None):
+        """
+        Args:
+            scan_window: Seconds after a launch during which its ssh process is looked for
+            state_path: File recording the launched ssh clients for adopt_running(). If None, nothing is recorded
+        """
+        self.scan_window = scan_window
+        self.state_path = state_path
+        self._saved: List[dict] = []
+        self._sessions: Dict[int, Session] = {}
+        self._processes: Dict[int, object] = {}
+        self._usage: Dict[int, SessionUsage] = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+
+    @staticmethod
+    def available() -> bool:
+        """Check whether psutil can be imported"""
+        try:
+            import psutil  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    @staticmethod
+    def shared() -> 'SessionRegistry':
+        """Get the process-wide registry"""
+        with SessionRegistry._shared_lock:
+            if SessionRegistry._shared is None:
+                SessionRegistry._shared = SessionRegistry(state_path=Path.home() / ".ssh_connection" / "sessions.json")
+            return SessionRegistry._shared
+
+    def register(self, host: str, pid: int, forwards: Iterable[int] = (), method: str = "") -> Session:
+        """
+        Track a launched process
+
+        Args:
+            host: SSH host it connects to
+            pid: PID of the launched process (ssh itself or its launcher)
+            forwards: Local ports the session listens on
+            method: How it was launched, e.g. "batch" or "powershell"
+
+        Returns:
+            The new Session
+        """
+        import psutil
+
+        session = Session(host, pid, tuple(sorted(set(forwards))), method, time.time())
+        with self._lock:
+            try:
+                process = psutil.Process(pid)
+                # Created after the launch: the launcher exited and its PID went to another program
+                if process.create_time() <= session.started + _CREATE_TIME_SLACK:
+                    self._processes[pid] = process
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+            self._sessions[pid] = session
+        return session
+
+    def sessions(self) -> List[Session]:
+        """
+        Get the live sessions, oldest first
+
+        Resolves ssh PIDs that are still unknown and drops sessions whose
+        processes have exited.
+        """
+        with self._lock:
+            unresolved = []
+            for pid, session in list(self._sessions.items()):
+                if session.ssh_pid is not None:
+                    if not self._alive(session.ssh_pid):
+                        self._drop(pid)
+                    continue
+                found = self._ssh_below(session)
+                if found is not None:
+                    session.ssh_pid = found
+                elif time.time() - session.started < self.scan_window:
+                    unresolved.append(session)
+                elif not self._alive(pid):
+                    self._drop(pid)
+            if unresolved:
+                self._scan(unresolved)
+            self._save()
+            return sorted(self._sessions.values(), key=lambda session: session.started)
+
+    def find(self, host: str) -> Optional[Session]:
+        """
+        Get a live session to a host
+
+        Args:
+            host: SSH host name (case-insensitive)
+
+        Returns:
+            The oldest live session to the host, or None
+        """
+        host = host.lower()
+        return next((session for session in self.sessions() if session.host.lower() == host), None)
+
+    def owner_of(self, port: int) -> Optional[Session]:
+        """Get the live session that forwards a local port"""
+        return next((session for session in self.sessions() if port in session.forwards), None)
+
+    def adopt_running(self, hosts: Iterable[str], forwards: Optional[Dict[str, Tuple[int, ...]]] = None) -> int:
+        """
+        Track ssh processes a previous instance started for known hosts
+
+        Picks up sessions left by a previous instance (after "Reboot") so they
+        are deduplicated and can be closed like new ones. Only the clients
+        recorded in state_path are considered, and only while their PID still
+        belongs to the same process: sessions the user opened by hand are
+        never adopted.
+
+        Args:
+            hosts: Host names to look for
+            forwards: Local ports per host, for records that have none
+
+        Returns:
+            Number of sessions adopted
+        """
+        wanted = {host.lower(): host for host in hosts}
+        forwards = forwards or {}
+        adopted = 0
+        with self._lock:
+            known = {session.ssh_pid or pid for pid, session in self._sessions.items()}
+            for record in self._load():
+                host = wanted.get(str(record.get("host", "")).lower())
+                if host is None or record.get("pid") in known:
+                    continue
+                process = self._recorded_process(record)
+                if process is None:
+                    continue
+                ports = tuple(record.get("forwards") or forwards.get(host, ()))
+                session = Session(host, process.pid, tuple(sorted(set(ports))), "adopted",
+                                  float(record["create_time"]), process.pid)
+                self._sessions[process.pid] = session
+                self._processes[process.pid] = process
+                known.add(process.pid)
+                adopted += 1
+            self._save()
+        if adopted:
+            logger.info(f"Adopted {adopted} running ssh session(s)")
+        return adopted
+
+    def sample(self) -> List[SessionUsage]:
+        """
+        Measure CPU and memory of every session's processes
+
+        Returns:
+            One SessionUsage per live session
+        """
+        import psutil
+
+        usage: Dict[int, SessionUsage] = {}
+        seen = set()
+        for session in self.sessions():
+            cpu, rss, count = 0.0, 0, 0
+            for process in self._tree(session):
+                seen.add(process.pid)
+                try:
+                    with process.oneshot():
+                        cpu += process.cpu_percent(None)
+                        rss += process.memory_info().rss
+                    count += 1
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            usage[session.pid] = SessionUsage(session.host, session.ssh_pid or session.pid, cpu, rss, count)
+        with self._lock:
+            self._usage = usage
+            # Forget cached Process objects of processes that are gone
+            for pid in [pid for pid in self._processes if pid not in seen]:
+                del self._processes[pid]
+        return list(usage.values())
+
+    def usage(self) -> List[SessionUsage]:
+        """Get the last sample without touching any process"""
+        with self._lock:
+            return list(self._usage.values())
+
+    def start_monitor(self, interval: float = 15.0, on_update: Optional[Callable[[], None]] = None) -> None:
+        """
+        Sample in a background thread every interval seconds
+
+        Args:
+            interval: Seconds between samples
+            on_update: Called after each sample
+        """
+        if self._monitor is not None:
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.sample()
+                    if on_update is not None:
+                        on_update()
+                except Exception as e:
+                    logger.debug(f"Session sample failed: {e}")
+                self._stop.wait(interval)
+
+        self._monitor = threading.Thread(target=run, name="session-monitor", daemon=True)
+        self._monitor.start()
+
+    def stop_monitor(self) -> None:
+        """Stop the background sampling"""
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=2)
+            self._monitor = None
+
+    def close(self, pid: int, timeout: float = 3.0) -> bool:
+        """
+        Terminate one session's processes, killing those that do not exit in time
+
+        Args:
+            pid: Session launcher PID (Session.pid)
+            timeout: Seconds to wait before killing
+
+        Returns:
+            True if the session was tracked
+        """
+        with self._lock:
+            session = self._sessions.get(pid)
+            if session is None:
+                return False
+            processes = self._tree(session)
+            self._drop(pid)
+            self._save()
+        self._terminate(processes, timeout)
+        return True
+
+    def close_all(self, timeout: float = 3.0) -> int:
+        """
+        Terminate every tracked session
+
+        Returns:
+            Number of sessions closed
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            processes = [process for session in sessions for process in self._tree(session)]
+            for session in sessions:
+                self._drop(session.pid)
+            self._save()
+        self._terminate(processes, timeout)
+        if sessions:
+            logger.info(f"Closed {len(sessions)} ssh session(s)")
+        return len(sessions)
+
+    def _terminate(self, processes: list, timeout: float) -> None:
+        import psutil
+
+        # Children first, so a launcher cannot respawn or report a half-closed tree
+        processes = list(reversed(processes))
+        for process in processes:
+            try:
+                process.terminate()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        _, alive = psutil.wait_procs(processes, timeout=timeout)
+        for process in alive:
+            try:
+                process.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+
+    def _process(self, pid: int):
+        """Get the cached psutil.Process, or None if it has exited (or its PID was reused)"""
+        process = self._processes.get(pid)
+        if process is not None and process.is_running():
+            return process
+        return None
+
+    def _keep(self, process):
+        """Cache a newly found process unless a running one is already cached for its PID"""
+        cached = self._process(process.pid)
+        if cached is None:
+            cached = self._processes[process.pid] = process
+        return cached
+
+    def _alive(self, pid: int) -> bool:
+        """Check a PID through its cached Process, which notices PID reuse; unknown PIDs are not alive"""
+        import psutil
+
+        process = self._processes.get(pid)
+        if process is None:
+            return False
+        try:
+            # An exited ssh whose parent has not reaped it yet is gone too
+            return process.is_running() and process.status() != psutil.STATUS_ZOMBIE
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+
+    def _tree(self, session: Session) -> list:
+        """Get the launcher, its descendants and the ssh process, parents first"""
+        import psutil
+
+        processes = []
+        launcher = self._process(session.pid)
+        if launcher is not None:
+            processes.append(launcher)
+            try:
+                processes.extend(self._process(child.pid) or child for child in launcher.children(recursive=True))
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        if session.ssh_pid is not None and all(process.pid != session.ssh_pid for process in processes):
+            ssh = self._process(session.ssh_pid)
+            if ssh is not None:
+                processes.append(ssh)
+        return processes
+
+    def _ssh_below(self, session: Session) -> Optional[int]:
+        """Find the ssh client among the launcher and its descendants"""
+        import psutil
+
+        launcher = self._process(session.pid)
+        if launcher is None:
+            return None
+        try:
+            for process in [launcher] + launcher.children(recursive=True):
+                if process.name().lower() in _SSH_NAMES:
+                    self._keep(process)
+                    return process.pid
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+        return None
+
+    def _scan(self, unresolved: List[Session]) -> None:
+        """Match detached ssh processes to launches whose launcher already exited"""
+        import psutil
+
+        claimed = {session.ssh_pid for session in self._sessions.values() if session.ssh_pid}
+        for process in psutil.process_iter(["pid", "name", "cmdline", "create_time"]):
+            info = process.info
+            if (info["name"] or "").lower() not in _SSH_NAMES or info["pid"] in claimed:
+                continue
+            for session in unresolved:
+                if (session.ssh_pid is None and (info["create_time"] or 0) >= session.started - 2
+                        and _targets_host(info["cmdline"] or [], session.host)):
+                    self._keep(process)
+                    session.ssh_pid = info["pid"]
+                    claimed.add(info["pid"])
+                    break
+
+    def _drop(self, pid: int) -> None:
+        session = self._sessions.pop(pid, None)
+        self._usage.pop(pid, None)
+        if session is not None:
+            for key in (session.pid, session.ssh_pid):
+                self._processes.pop(key, None)
+
+    def _records(self) -> List[dict]:
+        """Describe the resolved ssh clients for the state file"""
+        import psutil
+
+        records = []
+        for session in self._sessions.values():
+            process = self._process(session.ssh_pid) if session.ssh_pid else None
+            if process is None:
+                continue
+            try:
+                create_time = process.create_time()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            records.append({"host": session.host, "pid": process.pid, "create_time": create_time,
+                            "forwards": list(session.forwards), "method": session.method})
+        return sorted(records, key=lambda record: record["pid"])
+
+    @staticmethod
+    def _recorded_process(record: dict):
+        """Get the ssh process of a state file record, or None if its PID now belongs to another process"""
+        import psutil
+
+        try:
+            process = psutil.Process(int(record["pid"]))
+            if abs(process.create_time() - float(record["create_time"])) > _CREATE_TIME_SLACK:
+                return None
+            if process.name().lower() not in _SSH_NAMES:
+                return None
+            return process
+        except (KeyError, TypeError, ValueError, psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+
+    def _load(self) -> List[dict]:
+        if self.state_path is None:
+            return []
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as file:
+                records = json.load(file).get("sessions", [])
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, AttributeError) as e:
+            logger.debug(f"Ignoring session state {self.state_path}: {e}")
+            return []
+        return [record for record in records if isinstance(record, dict)]
+
+    def _save(self) -> None:
+        """
+        Write the resolved ssh clients to state_path when they changed
+
+        Records of other instances (e.g. a CLI --test run) are kept while
+        their processes are alive, so the file is pruned but never clobbered.
+        """
+        if self.state_path is None:
+            return
+        records = self._records()
+        if records == self._saved:
+            return
+        # Ours now, or ours before and since closed
+        mine = {record["pid"] for record in records + self._saved}
+        others = [record for record in self._load()
+                  if record.get("pid") not in mine and self._recorded_process(record) is not None]
+        try:
+            self.state_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            temp = self.state_path.with_name(self.state_path.name + ".tmp")
+            descriptor = os.open(str(temp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump({"sessions": others + records}, file, indent=2)
+            os.replace(str(temp), str(self.state_path))
+            self._saved = records
+        except OSError as e:
+            logger.debug(f"Could not save session state {self.state_path}: {e}")
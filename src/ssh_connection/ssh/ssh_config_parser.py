@@ -1,29 +1,491 @@
 import os
+import re
+import sys
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+
+# Keywords whose values accumulate across matching blocks instead of first-value-wins
+_MULTI_VALUE_KEYS = frozenset({
+    "identityfile", "certificatefile", "sendenv", "setenv",
+    "localforward", "remoteforward", "dynamicforward",
+})
+
+_FORWARD_KEYS = ("localforward", "remoteforward", "dynamicforward")
+
+# "Keyword value", "Keyword=value" and "Keyword = value" are all valid ssh_config syntax
+_LINE_RE = re.compile(r'(\S+?)(?:\s*=\s*|\s+)(.*)$')
+
+
+class Forward(NamedTuple):
+    """A single LocalForward/RemoteForward/DynamicForward specification"""
+    listen_host: Optional[str]
+    listen_port: int
+    dest_host: Optional[str]
+    dest_port: Optional[int]
+
+
+class HostBlock:
+    """Immutable record for one Host block of an SSH config file"""
+
+    __slots__ = ("patterns", "options", "local_forwards", "remote_forwards",
+                 "dynamic_forwards", "section", "lineno")
+
+    def __init__(self, patterns: Optional[Tuple[str, ...]], options: Tuple[Tuple[str, str], ...],
+                 local_forwards: Tuple[Forward, ...] = (), remote_forwards: Tuple[Forward, ...] = (),
+                 dynamic_forwards: Tuple[Forward, ...] = (), section: Optional[str] = None,
+                 lineno: int = 0):
+        object.__setattr__(self, "patterns", patterns)
+        object.__setattr__(self, "options", options)
+        object.__setattr__(self, "local_forwards", local_forwards)
+        object.__setattr__(self, "remote_forwards", remote_forwards)
+        object.__setattr__(self, "dynamic_forwards", dynamic_forwards)
+        object.__setattr__(self, "section", section)
+        object.__setattr__(self, "lineno", lineno)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        return f"HostBlock(patterns={self.patterns!r}, line={self.lineno})"
+
+    def matches(self, host: str) -> bool:
+        """
+        Check whether this block applies to a host, honouring '!' negation
+
+        Match blocks (patterns is None) are not evaluated and never apply.
+
+        Args:
+            host: Host name as typed on the ssh command line
+
+        Returns:
+            True if any positive pattern matches and no negated pattern does
+        """
+        if self.patterns is None:
+            return False
+        host = host.lower()
+        matched = False
+        for pattern in self.patterns:
+            if pattern.startswith("!"):
+                if _match_pattern(host, pattern[1:]):
+                    return False
+            elif not matched and _match_pattern(host, pattern):
+                matched = True
+        return matched
+
+
+class ResolvedHost:
+    """Effective options for a host after applying every matching block in order"""
+
+    __slots__ = ("name", "values", "local_forwards", "remote_forwards", "dynamic_forwards")
+
+    def __init__(self, name: str, values: Dict[str, Tuple[str, ...]],
+                 local_forwards: Tuple[Forward, ...], remote_forwards: Tuple[Forward, ...],
+                 dynamic_forwards: Tuple[Forward, ...]):
+        self.name = name
+        self.values = values
+        self.local_forwards = local_forwards
+        self.remote_forwards = remote_forwards
+        self.dynamic_forwards = dynamic_forwards
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Get the effective (first) value of an option, keyword is case insensitive"""
+        values = self.values.get(key.lower())
+        return values[0] if values else default
+
+    def get_all(self, key: str) -> Tuple[str, ...]:
+        """Get every value of a cumulative option such as IdentityFile"""
+        return self.values.get(key.lower(), ())
+
+    @property
+    def options(self) -> Dict[str, str]:
+        """Effective single value per option, like the output of ``ssh -G``"""
+        return {key: values[0] for key, values in self.values.items()}
+
+    @property
+    def hostname(self) -> str:
+        return self.get("hostname", self.name)
+
+    @property
+    def port(self) -> int:
+        try:
+            return int(self.get("port", "22"))
+        except ValueError:
+            return 22
+
+    @property
+    def user(self) -> Optional[str]:
+        return self.get("user")
+
+    @property
+    def proxy_jump(self) -> Optional[str]:
+        jump = self.get("proxyjump")
+        return None if jump is None or jump.lower() == "none" else jump
+
+    def __repr__(self) -> str:
+        return f"ResolvedHost({self.name!r}, hostname={self.hostname!r}, port={self.port})"
+
+
+class SshConfig:
+    """Parsed SSH config: ordered Host blocks plus the TEST/PROD host map"""
+
+    __slots__ = ("path", "blocks", "host_map", "_index")
+
+    def __init__(self, blocks: Tuple[HostBlock, ...], host_map: Dict[str, List[str]],
+                 path: Optional[Path] = None):
+        self.path = path
+        self.blocks = blocks
+        self.host_map = host_map
+        self._index: Optional[PatternIndex] = None
+
+    @property
+    def index(self) -> "PatternIndex":
+        """Compiled pattern index over all blocks, built on first use"""
+        if self._index is None:
+            self._index = PatternIndex(self.blocks)
+        return self._index
+
+    def hosts(self) -> List[str]:
+        """
+        Get every concrete (non-pattern) host name in file order
+
+        Returns:
+            List of unique host names defined by Host lines
+        """
+        seen = {}
+        for block in self.blocks:
+            if block.patterns is None:
+                continue
+            for pattern in block.patterns:
+                if not _is_pattern(pattern):
+                    seen.setdefault(pattern, None)
+        return list(seen)
+
+    def matching_blocks(self, host: str) -> List[HostBlock]:
+        """Get the blocks that apply to a host, in file order"""
+        blocks = self.blocks
+        return [blocks[index] for index in self.index.match(host)]
+
+    def resolve(self, host: str) -> ResolvedHost:
+        """
+        Compute effective options for a host the way OpenSSH does
+
+        Blocks are applied in file order and the first value obtained for each
+        keyword wins, except cumulative keywords (forwards, IdentityFile, ...)
+        which collect values from every matching block.
+
+        Args:
+            host: Host name as typed on the ssh command line
+
+        Returns:
+            ResolvedHost with effective options and forwards
+        """
+        return _merge_blocks(host, self.matching_blocks(host))
+
+    def resolve_all(self) -> Dict[str, ResolvedHost]:
+        """
+        Resolve effective options for every concrete host in the config
+
+        Uses the compiled pattern index, so the cost grows linearly with the
+        number of hosts rather than hosts x patterns.
+
+        Returns:
+            Dict mapping host name to its ResolvedHost, in file order
+        """
+        return {host: self.resolve(host) for host in self.hosts()}
+
+
+def _is_pattern(name: str) -> bool:
+    """Check whether a Host token is a wildcard or negated pattern"""
+    return "*" in name or "?" in name or name.startswith("!")
+
+
+def _translate_pattern(pattern: str) -> str:
+    """Translate an ssh_config pattern to a regex; only '*' and '?' are special"""
+    return "".join(
+        ".*" if char == "*" else "." if char == "?" else re.escape(char)
+        for char in pattern.lower()
+    )
+
+
+@lru_cache(maxsize=4096)
+def _compile_pattern(pattern: str) -> Pattern:
+    return re.compile(_translate_pattern(pattern) + r"\Z", re.DOTALL)
+
+
+def _match_pattern(host: str, pattern: str) -> bool:
+    """Match a lowercased host against one ssh_config pattern ('*' and '?' wildcards)"""
+    if "*" not in pattern and "?" not in pattern:
+        return host == pattern.lower()
+    return _compile_pattern(pattern).match(host) is not None
+
+
+class PatternIndex:
+    """
+    Compiled matcher over the Host patterns of every block
+
+    Literal patterns go into a dict keyed on the lowercased name. Wildcard
+    patterns are bucketed by their first character when it is literal
+    ("app*", "stl?t1*"), with the patterns that start with a wildcard
+    ("*it1p*") in a shared bucket. Each bucket is folded into one regex of
+    optional lookaheads, each with an empty capture group, so a single
+    match() reports every pattern of the bucket that applies to a host.
+    Looking up a host costs one dict probe plus the regex of its first
+    character's bucket and the shared one: only the wildcard patterns that
+    could match are evaluated, not every pattern of the file.
+    """
+
+    __slots__ = ("_exact", "_always", "_wild", "_negated_blocks")
+
+    def __init__(self, blocks: Tuple[HostBlock, ...]):
+        exact: Dict[str, List[Tuple[int, bool]]] = {}
+        always: List[int] = []
+        wild_parts: Dict[str, List[str]] = {}
+        wild_refs: Dict[str, List[Tuple[int, bool]]] = {}
+        negated_blocks = set()
+
+        for index, block in enumerate(blocks):
+            if block.patterns is None:
+                continue
+            for pattern in block.patterns:
+                negated = pattern.startswith("!")
+                if negated:
+                    pattern = pattern[1:]
+                    negated_blocks.add(index)
+                if pattern == "*" and not negated:
+                    always.append(index)
+                elif "*" in pattern or "?" in pattern:
+                    bucket = "" if pattern[0] in "*?" else pattern[0].lower()
+                    wild_parts.setdefault(bucket, []).append(f"(?:(?={_translate_pattern(pattern)}\\Z)())?")
+                    wild_refs.setdefault(bucket, []).append((index, negated))
+                else:
+                    exact.setdefault(pattern.lower(), []).append((index, negated))
+
+        self._exact = exact
+        self._always = tuple(always)
+        self._wild: Dict[str, Tuple[Pattern, Tuple[Tuple[int, bool], ...]]] = {
+            bucket: (re.compile("".join(parts), re.DOTALL), tuple(wild_refs[bucket]))
+            for bucket, parts in wild_parts.items()
+        }
+        self._negated_blocks = frozenset(negated_blocks)
+
+    def match(self, host: str) -> List[int]:
+        """
+        Get the indices of every block that applies to a host
+
+        Args:
+            host: Host name as typed on the ssh command line
+
+        Returns:
+            Sorted block indices (file order)
+        """
+        host = host.lower()
+        positive = set(self._always)
+        negative = set()
+
+        for index, negated in self._exact.get(host, ()):
+            (negative if negated else positive).add(index)
+
+        for bucket in ("", host[:1]):
+            wild = self._wild.get(bucket)
+            if wild is None:
+                continue
+            regex, refs = wild
+            for group_number, group in enumerate(regex.match(host).groups()):
+                if group is not None:
+                    index, negated = refs[group_number]
+                    (negative if negated else positive).add(index)
+
+        if negative:
+            positive -= negative
+        return sorted(positive)
+
+
+def _merge_blocks(host: str, blocks: List[HostBlock]) -> ResolvedHost:
+    """Fold matching blocks into a ResolvedHost with first-value-wins semantics"""
+    values: Dict[str, Tuple[str, ...]] = {}
+    local_forwards: List[Forward] = []
+    remote_forwards: List[Forward] = []
+    dynamic_forwards: List[Forward] = []
+
+    for block in blocks:
+        for key, value in block.options:
+            if key in _MULTI_VALUE_KEYS:
+                values[key] = values.get(key, ()) + (value,)
+            elif key not in values:
+                values[key] = (value,)
+        local_forwards.extend(block.local_forwards)
+        remote_forwards.extend(block.remote_forwards)
+        dynamic_forwards.extend(block.dynamic_forwards)
+
+    return ResolvedHost(host, values, tuple(local_forwards),
+                        tuple(remote_forwards), tuple(dynamic_forwards))
+
+
+def _split_port(spec: str) -> Tuple[Optional[str], Optional[int]]:
+    """Split '[host:]port' (including '[v6]:port') into host and integer port"""
+    if spec.startswith("["):
+        host, _, port = spec[1:].partition("]")
+        port = port.lstrip(":")
+    elif ":" in spec:
+        host, _, port = spec.rpartition(":")
+    else:
+        host, port = None, spec
+    try:
+        return host or None, int(port)
+    except ValueError:
+        return host or None, None
+
+
+def _parse_forward(key: str, args: List[str]) -> Optional[Forward]:
+    """Parse the arguments of a forward keyword, None if unsupported (e.g. unix sockets)"""
+    if not args:
+        return None
+    listen_host, listen_port = _split_port(args[0])
+    if listen_port is None:
+        return None
+    if key == "dynamicforward":
+        return Forward(listen_host, listen_port, None, None)
+    if len(args) < 2:
+        return None
+    dest_host, dest_port = _split_port(args[1])
+    return Forward(listen_host, listen_port, dest_host, dest_port)
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
 
 
 class SshConfigParser:
     """Parser for SSH configuration files that organizes hosts into TEST and PROD sections"""
-    
+
+    # Process-wide cache of parsed configs: path -> ((mtime_ns, size, inode), SshConfig)
+    _cache: Dict[str, Tuple[Tuple[int, int, int], SshConfig]] = {}
+    _cache_lock = threading.Lock()
+    _cache_hits = 0
+    _cache_misses = 0
+
+    @staticmethod
+    def default_config_path() -> Path:
+        """Get the default SSH config location (~/.ssh/config)"""
+        return Path.home() / ".ssh" / "config"
+
     @staticmethod
-    def parse_ssh_config() -> Dict[str, List[str]]:
+    def parse_ssh_config(config_path: Optional[Path] = None) -> Dict[str, List[str]]:
         """
         Parse SSH config file and extract hosts organized by TEST/PROD sections
-        
+
+        Results are cached per file and keyed on (path, mtime_ns, size, inode), so
+        repeated calls only cost a stat() until the file changes on disk. The
+        returned map is shared between callers and must not be modified.
+
+        Args:
+            config_path: Path to SSH config. If None, uses default ~/.ssh/config
+
         Returns:
             Dict mapping section names (TEST, PROD) to lists of hostnames
         """
+        return SshConfigParser.load_config(config_path).host_map
+
+    @staticmethod
+    def load_config(config_path: Optional[Path] = None) -> SshConfig:
+        """
+        Load the full SSH config model, served from the stat-keyed cache when unchanged
+
+        Args:
+            config_path: Path to SSH config. If None, uses default ~/.ssh/config
+
+        Returns:
+            SshConfig with every Host block; empty if the file is missing
+        """
+        ssh_config_path = Path(config_path) if config_path is not None else SshConfigParser.default_config_path()
+        cache_path = str(ssh_config_path)
+
+        try:
+            st = os.stat(ssh_config_path)
+        except FileNotFoundError:
+            print(f"SSH config file not found: {ssh_config_path}")
+            return SshConfig((), {"TEST": [], "PROD": []}, ssh_config_path)
+        except Exception as e:
+            print(f"Error parsing SSH config: {e}")
+            return SshConfig((), {"TEST": [], "PROD": []}, ssh_config_path)
+
+        stat_key = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+        with SshConfigParser._cache_lock:
+            cached = SshConfigParser._cache.get(cache_path)
+            if cached is not None and cached[0] == stat_key:
+                SshConfigParser._cache_hits += 1
+                return cached[1]
+            SshConfigParser._cache_misses += 1
+
+        config = SshConfigParser._parse_file(ssh_config_path)
+
+        with SshConfigParser._cache_lock:
+            SshConfigParser._cache[cache_path] = (stat_key, config)
+
+        return config
+
+    @staticmethod
+    def resolve(host: str, config_path: Optional[Path] = None) -> ResolvedHost:
+        """
+        Get effective options for a host from the (cached) SSH config
+
+        Args:
+            host: Host name as typed on the ssh command line
+            config_path: Path to SSH config. If None, uses default ~/.ssh/config
+
+        Returns:
+            ResolvedHost with effective options and forwards
+        """
+        return SshConfigParser.load_config(config_path).resolve(host)
+
+    @staticmethod
+    def _parse_file(ssh_config_path: Path) -> SshConfig:
+        """
+        Build the SSH config model in a single pass over the file
+
+        Comment banners containing TEST or PROD switch the current section, Host
+        lines open a new block and every other keyword is attached to the open
+        block. Options before the first Host line form an implicit ``Host *``
+        block. Match blocks are kept but never applied.
+
+        Args:
+            ssh_config_path: Path to the SSH config file
+
+        Returns:
+            SshConfig for the file
+        """
         host_map = {"TEST": [], "PROD": []}
+        blocks: List[HostBlock] = []
         current_section = None
-        
-        ssh_config_path = Path.home() / ".ssh" / "config"
-        
+        intern = sys.intern
+
+        patterns: Optional[Tuple[str, ...]] = ("*",)
+        block_section = None
+        block_line = 0
+        options: List[Tuple[str, str]] = []
+        forwards: Tuple[List[Forward], ...] = ([], [], [])
+
+        def flush() -> None:
+            if block_line or options or any(forwards):
+                blocks.append(HostBlock(
+                    patterns, tuple(options),
+                    tuple(forwards[0]), tuple(forwards[1]), tuple(forwards[2]),
+                    block_section, block_line,
+                ))
+
         try:
             with open(ssh_config_path, 'r', encoding='utf-8') as file:
-                for line in file:
+                for lineno, line in enumerate(file, 1):
                     line = line.strip()
-                    
+                    if not line:
+                        continue
+
                     # Handle comment lines for section detection
                     if line.startswith("#"):
                         line_upper = line.upper()
@@ -31,25 +493,99 @@ class SshConfigParser:
                             current_section = "TEST"
                         elif "PROD" in line_upper:
                             current_section = "PROD"
-                    
-                    # Handle Host lines
-                    elif line.lower().startswith("host "):
-                        parts = line.split()
-                        if len(parts) > 1:
-                            for i in range(1, len(parts)):
-                                host = parts[i]
-                                # Skip wildcard hosts and add to current section if defined
-                                if host != "*" and "*" not in host and current_section:
-                                    host_map[current_section].append(host)
-        
+                        continue
+
+                    match = _LINE_RE.match(line)
+                    if match:
+                        keyword, rest = match.group(1), match.group(2).strip()
+                    else:
+                        keyword, rest = line, ""
+                    key = intern(keyword.lower())
+
+                    if key == "host" or key == "match":
+                        flush()
+                        options = []
+                        forwards = ([], [], [])
+                        block_section = current_section
+                        block_line = lineno
+                        if key == "match":
+                            patterns = None
+                            continue
+
+                        patterns = tuple(_unquote(p) for p in rest.split())
+                        for host in patterns:
+                            # Skip wildcard hosts and add to current section if defined
+                            if not _is_pattern(host) and current_section:
+                                host_map[current_section].append(host)
+
+                    elif key in _FORWARD_KEYS:
+                        forward = _parse_forward(key, rest.split())
+                        if forward is not None:
+                            forwards[_FORWARD_KEYS.index(key)].append(forward)
+                        options.append((key, rest))
+
+                    else:
+                        options.append((key, _unquote(rest)))
+
+                flush()
+
         except FileNotFoundError:
             print(f"SSH config file not found: {ssh_config_path}")
         except Exception as e:
             print(f"Error parsing SSH config: {e}")
-        
-        return host_map
+
+        return SshConfig(tuple(blocks), host_map, ssh_config_path)
+
+    @staticmethod
+    def diff_host_maps(old: Dict[str, List[str]], new: Dict[str, List[str]]
+                       ) -> Dict[str, Tuple[List[str], List[str]]]:
+        """
+        Compare two section -> hosts maps
+
+        Args:
+            old: Host map before a reload
+            new: Host map after a reload
+
+        Returns:
+            Dict mapping each changed section to (added hosts, removed hosts);
+            empty when nothing changed. A section whose hosts were only
+            reordered maps to two empty lists.
+        """
+        changes = {}
+        for section in list(old) + [name for name in new if name not in old]:
+            before, after = old.get(section, []), new.get(section, [])
+            if before == after:
+                continue
+            before_set, after_set = set(before), set(after)
+            changes[section] = ([host for host in after if host not in before_set],
+                                [host for host in before if host not in after_set])
+        return changes
+
+    @staticmethod
+    def cache_stats() -> Dict[str, int]:
+        """
+        Get parsed-config cache counters
+
+        Returns:
+            Dict with hits, misses and number of cached files
+        """
+        with SshConfigParser._cache_lock:
+            return {
+                "hits": SshConfigParser._cache_hits,
+                "misses": SshConfigParser._cache_misses,
+                "entries": len(SshConfigParser._cache),
+            }
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop all cached configs and reset the hit/miss counters"""
+        with SshConfigParser._cache_lock:
+            SshConfigParser._cache.clear()
+            SshConfigParser._cache_hits = 0
+            SshConfigParser._cache_misses = 0
 
 
 if __name__ == "__main__":
     host_map = SshConfigParser.parse_ssh_config()
-    print(host_map)
\ No newline at end of file
+    print(host_map)
+    print(SshConfigParser.cache_stats())
@@ -1,9 +1,72 @@
+import os
 import subprocess
 import time
-import pyautogui
-from typing import Optional
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
 
 from ..config.config_loader import ConfigLoader, ConnectionConfig
+from ..diagnostics.logs import log_event
+from ..diagnostics.tracing import tracer
+from .port_check import ForwardPlan
+
+
+class TerminalBackend(ABC):
+    """
+    Where an interactive ssh command is opened for the user
+    
+    A backend starts the command in a terminal, takes care of typing the
+    password, and returns the PID the session registry tracks. Selected by
+    terminalBackend in config.yml, see SshLauncher.backend().
+    """
+    
+    name = ""
+    
+    @abstractmethod
+    def open(self, host: str, command: List[str], password: Optional[str] = None) -> Optional[int]:
+        """
+        Open command in a terminal
+        
+        Args:
+            host: SSH host name
+            command: ssh command line
+            password: Password to type when ssh asks for it
+            
+        Returns:
+            PID to track, or None if nothing was started
+        """
+    
+    def focus(self, host: str) -> bool:
+        """
+        Bring the terminal of an open session to the front
+        
+        Returns:
+            False if the backend cannot
+        """
+        return False
+
+
+class PowerShellBackend(TerminalBackend):
+    """One PowerShell console per host, with the password typed through GUI automation (Windows)"""
+    
+    name = "powershell"
+    
+    def open(self, host: str, command: List[str], password: Optional[str] = None) -> Optional[int]:
+        # Launch PowerShell exactly like Java with inheritIO equivalent
+        with tracer.span("connect.spawn", host):
+            process = subprocess.Popen([
+                'cmd', '/c', 'start', 'powershell', '-NoExit', '-Command', " ".join(command)
+            ], 
+            shell=False, 
+            stdin=None, 
+            stdout=None, 
+            stderr=None,
+            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS)
+        
+        # Automatically input password after delay (async to not block)
+        import threading
+        password_thread = threading.Thread(target=SshLauncher._input_password, args=(password, host), daemon=True)
+        password_thread.start()
+        return process.pid
 
 
 class SshLauncher:
@@ -40,28 +103,42 @@ class SshLauncher:
         Args:
             name: SSH host name as defined in SSH config
         """
+        if SshLauncher._reuse_session(name):
+            backend = SshLauncher.backend()
+            if backend is not None:
+                backend.focus(name)
+            return
+        
         try:
             print(f"Launching SSH command for: {name}")
+            backend = SshLauncher.backend()
+            if backend is None:
+                return
             
             # Use direct batch launcher for maximum speed (like Java executable)
             from pathlib import Path
             script_dir = Path(__file__).parent.parent.parent.parent
             batch_file = script_dir / "quick_ssh.bat"
             
-            if batch_file.exists():
+            # The batch file cannot take extra ssh options: only use it when every forward is free
+            if backend.name == "powershell" and batch_file.exists() and not SshLauncher._has_port_conflicts(name):
                 # Launch using batch file for native speed
-                process = subprocess.Popen([
-                    str(batch_file), name
-                ], 
-                shell=False,
-                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS)
+                with tracer.span("connect.spawn", name):
+                    process = subprocess.Popen([
+                        str(batch_file), name
+                    ], 
+                    shell=False,
+                    creationflags=subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS)
                 print(f"SSH launched via batch file - maximum speed")
+                log_event("launch", host=name, method="batch", pid=process.pid)
+                SshLauncher._track(name, process.pid, "batch")
                 
                 # Auto-input password after 3 seconds (async)
                 import threading
-                config = ConfigLoader.load()
-                password = config.get_password()
-                password_thread = threading.Thread(target=SshLauncher._input_password, args=(password,), daemon=True)
+                with tracer.span("connect.config_load", name):
+                    config = ConfigLoader.load()
+                    password = config.get_password(name)
+                password_thread = threading.Thread(target=SshLauncher._input_password, args=(password, name), daemon=True)
                 password_thread.start()
             else:
                 # Fallback to Python method
@@ -69,54 +146,271 @@ class SshLauncher:
             
         except Exception as e:
             print(f"Error launching SSH connection: {e}")
+            log_event("failure", host=name, stage="launch", method="batch", error=str(e))
             # Fallback to Python method
             SshLauncher._connect_python_method(name)
     
+    @staticmethod
+    def backend() -> Optional[TerminalBackend]:
+        """
+        Get the terminal backend selected by terminalBackend in config.yml
+        
+        "auto" opens PowerShell consoles on Windows and tmux windows elsewhere.
+        PowerShell only runs on Windows and there is no other POSIX backend:
+        without tmux, sessions can only be opened from a terminal (--test).
+        
+        Returns:
+            The backend, or None (after saying why) if none can run here
+        """
+        from .tmux_backend import TmuxBackend
+        
+        choice = ConfigLoader.load().terminal_backend
+        if choice == "auto":
+            choice = "powershell" if os.name == 'nt' else "tmux"
+        if choice == "tmux":
+            if TmuxBackend.available():
+                return TmuxBackend.shared()
+            print("No terminal backend: tmux is not available. Install it, or connect from a terminal with --test")
+            return None
+        if os.name != 'nt':
+            print("No terminal backend: PowerShell is only supported on Windows. Install tmux "
+                  "and set terminalBackend to auto or tmux, or connect from a terminal with --test")
+            return None
+        return PowerShellBackend()
+    
     @staticmethod
     def _connect_python_method(name: str) -> None:
         """
-        Fallback Python method for SSH connection
+        Open the ssh command with the terminal backend (the fallback when quick_ssh.bat cannot be used)
         
         Args:
             name: SSH host name as defined in SSH config
         """
-        config = ConfigLoader.load()
-        username = config.get_username()
+        backend = SshLauncher.backend()
+        if backend is None:
+            return
         
-        # Build SSH command with explicit username if available
-        if username:
-            command = f"ssh {username}@{name}"
-        else:
-            command = f"ssh {name}"
+        with tracer.span("connect.config_load", name):
+            config = ConfigLoader.load()
+            username = config.get_username(name)
+            password = config.get_password(name)
         
-        print(f"Using Python fallback method for: {command}")
+        plan = SshLauncher._forward_plan(name, config)
+        if plan is None:
+            return
         
-        # Launch PowerShell exactly like Java with inheritIO equivalent
-        process = subprocess.Popen([
-            'cmd', '/c', 'start', 'powershell', '-NoExit', '-Command', command
-        ], 
-        shell=False, 
-        stdin=None, 
-        stdout=None, 
-        stderr=None,
-        creationflags=subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS)
+        # Build SSH command with explicit username if available
+        command = (["ssh"] + SshLauncher._master_options(name, config) + plan.ssh_options
+                   + [f"{username}@{name}" if username else name])
+        
+        print(f"Using {backend.name} for: {' '.join(command)}")
+        pid = backend.open(name, command, password)
+        if pid is None:
+            return
         
         print(f"SSH process started")
+        log_event("launch", host=name, method=backend.name, pid=pid, forwards=len(plan.ssh_options),
+                  remapped=plan.remapped)
+        SshLauncher._track(name, pid, backend.name, plan.remapped)
+    
+    @staticmethod
+    def pty_available() -> bool:
+        """Check whether connect_pty() can be used (POSIX with an interactive terminal)"""
+        import os
+        import sys
+        return os.name != 'nt' and sys.stdin.isatty()
+    
+    @staticmethod
+    def connect_pty(name: str) -> int:
+        """
+        Connect in the current terminal, answering ssh prompts through a pseudo-terminal
         
-        # Automatically input password after delay (async to not block)
-        import threading
-        password = config.get_password()
-        password_thread = threading.Thread(target=SshLauncher._input_password, args=(password,), daemon=True)
-        password_thread.start()
+        The password is sent the moment ssh asks for it instead of after a fixed
+        delay, and a host key confirmation is never mistaken for the password
+        prompt. The terminal is then handed to the user.
+        
+        Args:
+            name: SSH host name as defined in SSH config
+            
+        Returns:
+            ssh exit code
+        """
+        from .pty_session import PtySshSession
+        
+        log_event("connect", host=name, source="terminal")
+        with tracer.span("connect.config_load", name):
+            config = ConfigLoader.load()
+            username = config.get_username(name)
+            password = config.get_password(name)
+        target = f"{username}@{name}" if username else name
+        
+        plan = SshLauncher._forward_plan(name, config)
+        if plan is None:
+            return 1
+        forward_options = plan.ssh_options
+        
+        session = PtySshSession(
+            ["ssh"] + SshLauncher._master_options(name, config) + forward_options + [target],
+            password=password,
+            accept_new_host_key=config.accept_new_host_keys
+        )
+        with tracer.span("connect.spawn", name):
+            session.start()
+        log_event("launch", host=name, method="pty", forwards=len(forward_options))
+        exit_code = None
+        try:
+            exit_code = session.interact()
+            return exit_code
+        finally:
+            if session.auth_latency is not None:
+                tracer.record("connect.auth", session.started_at, session.auth_latency, name)
+            # 255 is ssh's own failure status; anything else came from the remote shell
+            if exit_code is None or exit_code == 255:
+                log_event("failure", host=name, stage="session", exit_code=exit_code,
+                          auth_latency=session.auth_latency)
+    
+    @staticmethod
+    def _master_options(name: str, config: ConfigLoader) -> List[str]:
+        """
+        Get ssh options that reuse (or become) the jump host's ControlMaster
+        
+        A master pre-warmed at startup is joined instead of paying a fresh
+        handshake; a missing one is started first.
+        
+        Args:
+            name: SSH host name as defined in SSH config
+            config: Loaded configuration, for the jump host's credentials
+            
+        Returns:
+            List of ssh command line arguments (empty where masters are not supported)
+        """
+        from .control_master import ControlMasterManager
+        
+        if not ControlMasterManager.available():
+            return []
+        try:
+            with tracer.span("connect.control_master", name):
+                return ControlMasterManager.shared().connect_options(
+                    name, credentials=lambda host: (config.get_username(host), config.get_password(host))
+                )
+        except Exception as e:
+            print(f"ControlMaster skipped: {e}")
+            return []
+    
+    @staticmethod
+    def _forward_ports(name: str) -> List[int]:
+        """Get the local ports the host's LocalForward/DynamicForward lines listen on"""
+        from .ssh_config_parser import SshConfigParser
+        
+        resolved = SshConfigParser.load_config().resolve(name)
+        return [forward.listen_port for forward in list(resolved.local_forwards) + list(resolved.dynamic_forwards)]
+    
+    @staticmethod
+    def _reuse_session(name: str) -> bool:
+        """
+        Check for a running session to the host before launching another one
+        
+        Per dedupeSessions in config.yml, only hosts with forwards (the
+        default), every host, or none are deduplicated: a second jump session
+        would only fight the first over its LocalForward ports.
+        
+        Returns:
+            True if a session is already open and no new one should start
+        """
+        from .sessions import SessionRegistry
+        
+        try:
+            policy = ConfigLoader.load().dedupe_sessions
+            if policy == "off" or not SessionRegistry.available():
+                return False
+            if policy == "forwards" and not SshLauncher._forward_ports(name):
+                return False
+            session = SessionRegistry.shared().find(name)
+        except Exception as e:
+            print(f"Session check skipped: {e}")
+            return False
+        if session is None:
+            return False
+        print(f"{name} is already open: {session.describe()}")
+        log_event("launch", host=name, method="deduplicated", pid=session.ssh_pid or session.pid)
+        return True
+    
+    @staticmethod
+    def _track(name: str, pid: int, method: str, remapped: Optional[Dict[int, int]] = None) -> None:
+        """
+        Register a launched process with the session registry
+        
+        Args:
+            name: SSH host name
+            pid: Launched process
+            method: How it was launched
+            remapped: Configured port -> port actually forwarded, shown in the session entry
+        """
+        from .sessions import SessionRegistry
+        
+        if not SessionRegistry.available():
+            return
+        remapped = remapped or {}
+        try:
+            ports = [remapped.get(port, port) for port in SshLauncher._forward_ports(name)]
+            SessionRegistry.shared().register(name, pid, ports, method)
+        except Exception as e:
+            print(f"Session tracking skipped: {e}")
+    
+    @staticmethod
+    def _has_port_conflicts(name: str) -> bool:
+        """Check whether any local forward port of the host is already taken"""
+        from .port_check import probe_forwards
+        from .ssh_config_parser import SshConfigParser
+        
+        try:
+            resolved = SshConfigParser.resolve(name)
+            return bool(probe_forwards(list(resolved.local_forwards) + list(resolved.dynamic_forwards)))
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _forward_plan(name: str, config: ConfigLoader) -> Optional[ForwardPlan]:
+        """
+        Check the host's LocalForward/DynamicForward ports before spawning ssh
+        
+        Conflicts are reported with the process that owns the port and handled
+        according to portConflictPolicy in config.yml.
+        
+        Args:
+            name: SSH host name as defined in SSH config
+            config: Loaded configuration
+            
+        Returns:
+            ForwardPlan with the extra ssh arguments and remapped ports, or
+            None if the connection should not be started
+        """
+        from .port_check import plan_forwards
+        
+        try:
+            with tracer.span("connect.port_check", name):
+                plan = plan_forwards(name, config.port_conflict_policy)
+        except Exception as e:
+            print(f"Port check skipped: {e}")
+            return ForwardPlan()
+        
+        for message in plan.messages:
+            print(message)
+        if plan.abort:
+            print(f"Not connecting to {name}: local ports are in use (portConflictPolicy: abort)")
+            log_event("failure", host=name, stage="port_check", error="local ports in use")
+            return None
+        return plan
     
     @staticmethod
-    def _input_password(password: Optional[str] = None) -> None:
+    def _input_password(password: Optional[str] = None, host: Optional[str] = None) -> None:
         """
         Automatically input password using GUI automation
         Now only inputs password since username is passed in SSH command
         
         Args:
             password: Password to input. If None, loads from config
+            host: Host being connected to, used to label tracing spans
         """
         if password is None:
             config = ConfigLoader.load()
@@ -130,17 +424,21 @@ class SshLauncher:
             print("Inserting credentials...")
             
             # Wait for PowerShell to open and SSH to start (optimized to 4 seconds)
-            time.sleep(4)
+            with tracer.span("connect.auth_wait", host):
+                time.sleep(4)
             
             # Type password and press Enter
             # Username is now passed directly in SSH command, so we only input password
-            pyautogui.typewrite(password)
-            pyautogui.press('enter')
+            import pyautogui
+            with tracer.span("connect.auth_type", host):
+                pyautogui.typewrite(password)
+                pyautogui.press('enter')
             
             print("Credentials inserted.")
             
         except Exception as e:
             print(f"Error inputting password: {e}")
+            log_event("failure", host=host, stage="auth_type", error=str(e))
     
     @staticmethod
     def get_current_password() -> Optional[str]:
@@ -0,0 +1,448 @@
+import logging
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+
+from ..diagnostics.logs import log_event
+from ..diagnostics.tracing import tracer
+from .pty_session import PromptWatcher
+from .ssh_launcher import TerminalBackend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION = "ssh-connection"
+# Own server socket (tmux -L), so the user's tmux sessions are never touched
+DEFAULT_SOCKET = "ssh-connection"
+
+# Terminal emulators tried, in order, to show the session when no terminal is attached,
+# with the arguments that precede the command to run
+_TERMINALS = (
+    ("x-terminal-emulator", ["-e"]),
+    ("gnome-terminal", ["--"]),
+    ("konsole", ["-e"]),
+    ("xfce4-terminal", ["-x"]),
+    ("alacritty", ["-e"]),
+    ("kitty", []),
+    ("xterm", ["-e"]),
+)
+
+# Printed by new-window/new-session -P for the pane that was created
+_PANE_FORMAT = "#{window_id} #{pane_id} #{pane_pid}"
+_WINDOW_FORMAT = "#{window_name}\t#{window_id}\t#{pane_id}\t#{pane_pid}\t#{pane_dead}"
+_PLAIN_ARG = re.compile(r"[\w@%:.,/=+-]+")
+_OCTAL_ESCAPE = re.compile(rb"\\([0-7]{3})")
+# Output kept for panes nobody watches yet (the reply to new-window can trail their first output)
+_UNCLAIMED_PANES = 16
+# Prompts are only answered this long after the window opened
+_WATCH_SECONDS = 120.0
+
+
+class TmuxError(RuntimeError):
+    """A tmux command answered with %error, or the control client is gone"""
+
+
+class TmuxWindow(NamedTuple):
+    """A window of the session and the process running in its pane"""
+    host: str
+    window_id: str
+    pane_id: str
+    pid: int
+    dead: bool
+
+
+def quote(arg: str) -> str:
+    """Quote an argument for a tmux command line"""
+    if _PLAIN_ARG.fullmatch(arg):
+        return arg
+    # Inside double quotes tmux still expands $VAR and a leading ~
+    return '"' + re.sub(r'([\\"$~])', r"\\\1", arg) + '"'
+
+
+def _unescape(data: bytes) -> bytes:
+    """Decode %output data, where tmux writes control characters and backslashes as \\ooo"""
+    return _OCTAL_ESCAPE.sub(lambda match: bytes([int(match.group(1), 8)]), data)
+
+
+def _environment() -> Dict[str, str]:
+    """Environment for tmux clients; without TMUX they work from inside another tmux as well"""
+    env = dict(os.environ)
+    env.pop("TMUX", None)
+    return env
+
+
+class _Reply:
+    """Block tmux sends back for one command"""
+
+    __slots__ = ("lines", "error", "done")
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.error = False
+        self.done = threading.Event()
+
+
+class TmuxControl:
+    """
+    A tmux control-mode client (tmux -C) attached to one session
+
+    Commands are lines written to the client's stdin; tmux answers each with
+    a %begin ... %end (or %error) block, in order. Between blocks it sends
+    notifications, of which %output (every byte a pane prints) is passed to
+    on_output. One reader thread parses the stream, so commands issued from
+    on_output must not wait for their reply.
+    """
+
+    def __init__(self, argv: List[str], on_output: Callable[[str, bytes], None]):
+        """
+        Args:
+            argv: tmux command line, including -C and the session command
+            on_output: Called with the pane id and the decoded bytes of each %output
+        """
+        self.on_output = on_output
+        self._lock = threading.Lock()
+        # The session command on the command line gets the first block
+        self._initial = _Reply()
+        self._pending: Deque[_Reply] = deque([self._initial])
+        self.process = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, env=_environment())
+        self._reader = threading.Thread(target=self._read, name="tmux-control", daemon=True)
+        self._reader.start()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def ready(self, timeout: float = 5.0) -> List[str]:
+        """Wait for the reply to the session command given on the command line"""
+        return self._wait(self._initial, timeout)
+
+    def command(self, *args: str, wait: bool = True, timeout: float = 5.0) -> List[str]:
+        """
+        Run a tmux command through the control client
+
+        Args:
+            *args: Command and arguments, e.g. ("select-window", "-t", "@3")
+            wait: Wait for the reply. Must be False on the reader thread
+            timeout: Seconds to wait
+
+        Returns:
+            Output lines of the command (empty when not waiting)
+
+        Raises:
+            TmuxError: If tmux reports an error or the client has exited
+        """
+        line = " ".join(quote(arg) for arg in args) + "\n"
+        reply = _Reply()
+        with self._lock:
+            if not self.alive:
+                raise TmuxError("tmux control client is not running")
+            self._pending.append(reply)
+            try:
+                self.process.stdin.write(line.encode("utf-8"))
+                self.process.stdin.flush()
+            except OSError as e:
+                self._pending.remove(reply)
+                raise TmuxError(f"tmux control client is not running: {e}")
+        return self._wait(reply, timeout) if wait else []
+
+    def close(self) -> None:
+        """Detach; the session and its windows keep running"""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+
+    def _wait(self, reply: _Reply, timeout: float) -> List[str]:
+        if not reply.done.wait(timeout):
+            raise TmuxError("tmux did not answer")
+        if reply.error:
+            raise TmuxError(" ".join(reply.lines) or "tmux command failed")
+        return reply.lines
+
+    def _read(self) -> None:
+        block: Optional[List[str]] = None
+        for raw in self.process.stdout:
+            line = raw.rstrip(b"\n")
+            if block is not None:
+                if line.startswith((b"%end ", b"%error ")):
+                    with self._lock:
+                        reply = self._pending.popleft() if self._pending else None
+                    if reply is not None:
+                        reply.lines = block
+                        reply.error = line.startswith(b"%error ")
+                        reply.done.set()
+                    block = None
+                else:
+                    block.append(line.decode("utf-8", "replace"))
+            elif line.startswith(b"%begin "):
+                block = []
+            elif line.startswith(b"%output "):
+                parts = line.split(b" ", 2)
+                try:
+                    self.on_output(parts[1].decode(), _unescape(parts[2]) if len(parts) > 2 else b"")
+                except Exception as e:
+                    logger.error(f"tmux output handler failed: {e}")
+            elif line == b"%exit" or line.startswith(b"%exit "):
+                break
+        # Nothing more will be answered
+        with self._lock:
+            pending, self._pending = list(self._pending), deque()
+        for reply in pending:
+            reply.error = True
+            reply.lines = reply.lines or ["tmux control client exited"]
+            reply.done.set()
+
+
+class _Watch:
+    """Prompt answering state of one pane"""
+
+    __slots__ = ("host", "watcher", "started")
+
+    def __init__(self, host: str, watcher: PromptWatcher):
+        self.host = host
+        self.watcher = watcher
+        self.started = time.monotonic()
+
+
+class TmuxBackend(TerminalBackend):
+    """
+    Opens every host as a window of one tmux session
+
+    The first open() starts a tmux server on its own socket with a
+    control-mode client attached to the session (or attaches to the session
+    a previous instance left). Every later host is one new-window command
+    written to that client: no terminal emulator, shell or tmux process is
+    started for it. The control client also receives every pane's output,
+    so password and host key prompts are answered with send-keys the moment
+    ssh prints them (the PromptWatcher used by the terminal mode), and the
+    windows can be listed and focused without polling. A terminal emulator
+    running "tmux attach" is started only when no terminal shows the session.
+    """
+
+    name = "tmux"
+
+    _shared: Optional['TmuxBackend'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, session: str = DEFAULT_SESSION, socket: str = DEFAULT_SOCKET,
+                 terminal: Optional[str] = None, accept_new_host_keys: bool = False):
+        """
+        Args:
+            session: tmux session name
+            socket: tmux server socket name (tmux -L)
+            terminal: Command that runs its arguments in a new terminal window,
+                      e.g. "gnome-terminal --". If None, the first one found is used
+            accept_new_host_keys: Answer "yes" to unknown host key prompts
+        """
+        self.session = session
+        self.socket = socket
+        self.terminal = shlex.split(terminal) if terminal else None
+        self.accept_new_host_keys = accept_new_host_keys
+        self._control: Optional[TmuxControl] = None
+        self._windows: Dict[str, str] = {}
+        self._watches: Dict[str, _Watch] = {}
+        self._unclaimed: Dict[str, bytes] = {}
+        self._states: Dict[str, str] = {}
+        self._terminal_started = 0.0
+        self._lock = threading.Lock()
+        self._watch_lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        """Check whether tmux is installed"""
+        return os.name != 'nt' and shutil.which("tmux") is not None
+
+    @staticmethod
+    def shared() -> 'TmuxBackend':
+        """Get the process-wide backend, configured from config.yml"""
+        with TmuxBackend._shared_lock:
+            if TmuxBackend._shared is None:
+                options = {}
+                try:
+                    from ..config.config_loader import ConfigLoader
+                    config = ConfigLoader.load()
+                    options = dict(session=config.tmux_session, terminal=config.terminal_command,
+                                   accept_new_host_keys=config.accept_new_host_keys)
+                except Exception:
+                    pass
+                TmuxBackend._shared = TmuxBackend(**options)
+            return TmuxBackend._shared
+
+    def tmux_command(self, *args: str) -> List[str]:
+        """Build a tmux command line for this backend's server"""
+        return ["tmux", "-L", self.socket] + list(args)
+
+    def attach_command(self) -> List[str]:
+        """Command a user runs to see the session"""
+        return self.tmux_command("attach-session", "-t", f"={self.session}")
+
+    def open(self, host: str, command: List[str], password: Optional[str] = None) -> Optional[int]:
+        """
+        Open a window running command and answer its prompts
+
+        Args:
+            host: SSH host name, used as the window name
+            command: ssh command line
+            password: Password to type at ssh's password prompt
+
+        Returns:
+            PID of the process in the new pane
+        """
+        window = ["-n", host, "-P", "-F", _PANE_FORMAT, "--"] + command
+        with self._lock:
+            with tracer.span("connect.spawn", host):
+                control = self._ensure_control()
+                if control is None:
+                    control = self._control = TmuxControl(
+                        self.tmux_command("-C", "new-session", "-s", self.session, *window), self._on_output
+                    )
+                    lines = control.ready()
+                else:
+                    lines = control.command("new-window", "-t", f"={self.session}:", *window)
+            window_id, pane_id, pid = lines[0].split()
+            self._windows[host] = window_id
+            self._watch(pane_id, host, password)
+            self._show(control)
+        return int(pid)
+
+    def focus(self, host: str) -> bool:
+        """Select the host's window and make sure a terminal shows it"""
+        with self._lock:
+            try:
+                control = self._ensure_control()
+                if control is None:
+                    return False
+                control.command("select-window", "-t", self._windows.get(host) or f"={self.session}:={host}")
+                self._show(control)
+                return True
+            except TmuxError as e:
+                logger.debug(f"Cannot focus {host}: {e}")
+                return False
+
+    def windows(self) -> List[TmuxWindow]:
+        """List the session's windows with the process of their (first) pane"""
+        with self._lock:
+            try:
+                control = self._ensure_control()
+                if control is None:
+                    return []
+                lines = control.command("list-windows", "-t", f"={self.session}", "-F", _WINDOW_FORMAT)
+            except TmuxError:
+                return []
+        windows = {}
+        for line in lines:
+            host, window_id, pane_id, pid, dead = line.split("\t")
+            windows.setdefault(window_id, TmuxWindow(host, window_id, pane_id, int(pid), dead == "1"))
+        return list(windows.values())
+
+    def status(self) -> Dict[str, str]:
+        """
+        Get the prompt answering state of the hosts opened by this process
+
+        Returns:
+            Host -> PromptWatcher state: waiting, password-sent, authenticated,
+            no-prompt, denied, host-key or password-prompt
+        """
+        with self._watch_lock:
+            return dict(self._states)
+
+    def close(self) -> None:
+        """Detach the control client; the session and its windows keep running"""
+        with self._lock:
+            if self._control is not None:
+                self._control.close()
+                self._control = None
+
+    def _ensure_control(self) -> Optional[TmuxControl]:
+        """Get the control client, attaching to an existing session; None if there is no session"""
+        if self._control is not None and self._control.alive:
+            return self._control
+        self._control = None
+        existing = subprocess.run(self.tmux_command("has-session", "-t", f"={self.session}"),
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=_environment())
+        if existing.returncode != 0:
+            return None
+        control = TmuxControl(self.tmux_command("-C", "attach-session", "-t", f"={self.session}"), self._on_output)
+        control.ready()
+        self._control = control
+        return control
+
+    def _show(self, control: TmuxControl) -> None:
+        """Start a terminal attached to the session unless one already shows it"""
+        clients = control.command("list-clients", "-t", f"={self.session}", "-F", "#{client_control_mode}")
+        # A terminal started moments ago may not have attached yet
+        if "0" in clients or time.monotonic() - self._terminal_started < 10:
+            return
+        terminal = self._terminal()
+        if terminal is None:
+            print(f"tmux session ready, attach with: {' '.join(self.attach_command())}")
+            return
+        try:
+            subprocess.Popen(terminal + self.attach_command(), stdin=subprocess.DEVNULL,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                             start_new_session=True, env=_environment())
+            self._terminal_started = time.monotonic()
+        except OSError as e:
+            print(f"Could not start {terminal[0]}: {e}; attach with: {' '.join(self.attach_command())}")
+
+    def _terminal(self) -> Optional[List[str]]:
+        """Get the configured terminal command, or the first installed emulator"""
+        if self.terminal:
+            return self.terminal
+        if not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+            return None
+        candidates = []
+        if os.environ.get("TERMINAL"):
+            candidates.append((os.environ["TERMINAL"], ["-e"]))
+        for program, arguments in candidates + list(_TERMINALS):
+            if shutil.which(program):
+                return [program] + arguments
+        return None
+
+    def _watch(self, pane_id: str, host: str, password: Optional[str]) -> None:
+        """Answer the pane's prompts, starting with output that arrived before the reply"""
+        watch = _Watch(host, PromptWatcher(password, accept_new_host_key=self.accept_new_host_keys))
+        with self._watch_lock:
+            self._watches[pane_id] = watch
+            self._states[host] = watch.watcher.state
+            early = self._unclaimed.pop(pane_id, b"")
+            if early:
+                self._feed(pane_id, watch, early)
+
+    def _on_output(self, pane_id: str, data: bytes) -> None:
+        with self._watch_lock:
+            watch = self._watches.get(pane_id)
+            if watch is None:
+                self._unclaimed[pane_id] = (self._unclaimed.get(pane_id, b"") + data)[-512:]
+                while len(self._unclaimed) > _UNCLAIMED_PANES:
+                    del self._unclaimed[next(iter(self._unclaimed))]
+                return
+            self._feed(pane_id, watch, data)
+
+    def _feed(self, pane_id: str, watch: _Watch, data: bytes) -> None:
+        """Pass pane output to its watcher and type the answer (reader thread, no waiting)"""
+        control = self._control
+        answer = watch.watcher.feed(data)
+        if answer is not None and control is not None:
+            control.command("send-keys", "-t", pane_id, "-l", answer.decode("utf-8").rstrip("\n"), wait=False)
+            control.command("send-keys", "-t", pane_id, "Enter", wait=False)
+        if watch.watcher.state == "authenticated" and watch.watcher.done:
+            tracer.record("connect.auth", watch.started, time.monotonic() - watch.started, watch.host)
+        self._states[watch.host] = watch.watcher.state
+        if watch.watcher.done or time.monotonic() - watch.started > _WATCH_SECONDS:
+            del self._watches[pane_id]
+            if watch.watcher.state == "denied":
+                log_event("failure", host=watch.host, stage="auth", backend=self.name)
+            # The session belongs to the user now: stop streaming its output to this client
+            if control is not None:
+                try:
+                    control.command("refresh-client", "-A", f"{pane_id}:off", wait=False)
+                except TmuxError:
+                    pass
@@ -0,0 +1,412 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .control_master import _first_hop, jump_host_for
+from .ssh_config_parser import SshConfig, SshConfigParser
+from ..diagnostics.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when a connection cap leaves no transport for a new channel"""
+
+
+def _paramiko():
+    """Import paramiko, the optional pure-Python SSH implementation behind the pool"""
+    try:
+        import paramiko
+    except ImportError:
+        raise RuntimeError("The in-process SSH engine needs paramiko (pip install paramiko)")
+    return paramiko
+
+
+class _PooledTransport:
+    """An authenticated connection and the channels currently open on it"""
+
+    __slots__ = ("host", "client", "created_at", "last_used", "channels", "pending")
+
+    def __init__(self, host: str, client: Any):
+        self.host = host
+        self.client = client
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.channels: List[Any] = []
+        # Channels being opened right now; counted so concurrent callers respect the cap
+        self.pending = 0
+
+    @property
+    def transport(self) -> Any:
+        return self.client.get_transport()
+
+    @property
+    def alive(self) -> bool:
+        transport = self.transport
+        return transport is not None and transport.is_active()
+
+    def load(self) -> int:
+        """Number of open (or opening) channels"""
+        self.channels = [channel for channel in self.channels if not channel.closed]
+        return len(self.channels) + self.pending
+
+
+class TransportPool:
+    """
+    Authenticated in-process SSH transports, pooled per jump host
+
+    The first channel to a host pays for TCP, key exchange and
+    authentication; later exec, direct-tcpip and sftp channels are opened on
+    the existing transport, which takes one round trip. Connection details
+    come from the parsed SSH config (HostName, Port, User, IdentityFile;
+    ProxyJump and "HostName localhost" LocalForward targets go through a
+    direct-tcpip channel of the pooled jump host) and passwords from the
+    Maven credentials.
+
+    Each host gets at most max_per_host transports carrying up to
+    max_channels channels each (OpenSSH's MaxSessions defaults to 10), with
+    max_total transports overall. Transports without channels are closed
+    after idle_timeout seconds.
+    """
+
+    _shared: Optional['TransportPool'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, config: Optional[SshConfig] = None,
+                 credentials: Optional[Callable[[str], Tuple[Optional[str], Optional[str]]]] = None,
+                 max_per_host: int = 2, max_channels: int = 8, max_total: int = 16,
+                 idle_timeout: float = 300.0, connect_timeout: float = 10.0,
+                 accept_new_host_keys: bool = False, known_hosts: Optional[Path] = None):
+        """
+        Args:
+            config: Parsed SSH config. If None, ~/.ssh/config is loaded on each connect
+            credentials: Callable returning (username, password) for a host. If None,
+                uses ConfigLoader
+            max_per_host: Maximum transports per host
+            max_channels: Maximum open channels per transport
+            max_total: Maximum transports across all hosts
+            idle_timeout: Seconds a transport without channels is kept open
+            connect_timeout: Seconds allowed for TCP connect, banner and authentication
+            accept_new_host_keys: Accept (and remember) unknown host keys instead of refusing them
+            known_hosts: known_hosts file. If None, uses ~/.ssh/known_hosts
+        """
+        self.config = config
+        self.credentials = credentials or self._configured_credentials
+        self.max_per_host = max(1, max_per_host)
+        self.max_channels = max(1, max_channels)
+        self.max_total = max(1, max_total)
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.accept_new_host_keys = accept_new_host_keys
+        self.known_hosts = known_hosts or Path.home() / ".ssh" / "known_hosts"
+        self._pools: Dict[str, List[_PooledTransport]] = {}
+        self._connecting: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Signalled when a slot may have freed up; callers over the caps wait on it
+        self._available = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    @staticmethod
+    def available() -> bool:
+        """Check whether paramiko is installed"""
+        try:
+            _paramiko()
+        except RuntimeError:
+            return False
+        return True
+
+    @staticmethod
+    def shared() -> 'TransportPool':
+        """Get the process-wide pool, configured from config.yml"""
+        with TransportPool._shared_lock:
+            if TransportPool._shared is None:
+                accept_new = False
+                try:
+                    from ..config.config_loader import ConfigLoader
+                    accept_new = ConfigLoader.load().accept_new_host_keys
+                except Exception:
+                    pass
+                TransportPool._shared = TransportPool(accept_new_host_keys=accept_new)
+            return TransportPool._shared
+
+    def exec_channel(self, host: str, command: str, timeout: Optional[float] = None,
+                     combine_stderr: bool = False, forward_agent: bool = False) -> Any:
+        """
+        Start a command on a host
+
+        Args:
+            host: SSH host name
+            command: Remote command line
+            timeout: Seconds to wait for the channel to open
+            combine_stderr: Deliver stderr interleaved with stdout
+            forward_agent: Make the local ssh-agent available to the command
+                (for ssh/scp run on a jump host)
+
+        Returns:
+            paramiko Channel running the command
+        """
+        def open_exec(transport):
+            channel = transport.open_session(timeout=timeout)
+            channel.set_combine_stderr(combine_stderr)
+            if forward_agent:
+                from paramiko.agent import AgentRequestHandler
+                try:
+                    AgentRequestHandler(channel)
+                except Exception as e:
+                    logger.debug(f"Agent forwarding to {host} refused: {e}")
+            channel.exec_command(command)
+            return channel
+        return self._open_channel(host, open_exec)
+
+    def run(self, host: str, command: str, timeout: Optional[float] = None) -> Tuple[int, bytes, bytes]:
+        """
+        Run a command on a host and collect its output
+
+        Args:
+            host: SSH host name
+            command: Remote command line
+            timeout: Seconds to wait for the channel to open
+
+        Returns:
+            Tuple of (exit status, stdout, stderr)
+        """
+        channel = self.exec_channel(host, command, timeout)
+        try:
+            stdout = channel.makefile("rb").read()
+            stderr = channel.makefile_stderr("rb").read()
+            return channel.recv_exit_status(), stdout, stderr
+        finally:
+            channel.close()
+
+    def open_tunnel(self, host: str, dest_host: str, dest_port: int,
+                    timeout: Optional[float] = None) -> Any:
+        """
+        Open a direct-tcpip channel: a TCP connection made by the host to dest_host:dest_port
+
+        Args:
+            host: SSH host name the connection goes through
+            dest_host: Destination address as seen from the host
+            dest_port: Destination port
+            timeout: Seconds to wait for the channel to open
+
+        Returns:
+            paramiko Channel usable like a socket
+        """
+        return self._open_channel(host, lambda transport: transport.open_channel(
+            "direct-tcpip", (dest_host, dest_port), ("127.0.0.1", 0), timeout=timeout))
+
+    def sftp(self, host: str) -> Any:
+        """
+        Open an SFTP session on a host
+
+        Returns:
+            paramiko SFTPClient; close it to release its channel
+        """
+        paramiko = _paramiko()
+        client_box: List[Any] = []
+
+        def open_sftp(transport):
+            client_box.append(paramiko.SFTPClient.from_transport(transport))
+            return client_box[0].get_channel()
+        self._open_channel(host, open_sftp)
+        return client_box[0]
+
+    def evict_idle(self) -> int:
+        """
+        Close transports that died or have had no channels for idle_timeout seconds
+
+        Returns:
+            Number of transports closed
+        """
+        now = time.monotonic()
+        evicted: List[_PooledTransport] = []
+        with self._lock:
+            for host in list(self._pools):
+                keep = []
+                for pooled in self._pools[host]:
+                    if not pooled.alive or (pooled.load() == 0 and now - pooled.last_used >= self.idle_timeout):
+                        evicted.append(pooled)
+                    else:
+                        keep.append(pooled)
+                if keep:
+                    self._pools[host] = keep
+                else:
+                    del self._pools[host]
+        for pooled in evicted:
+            logger.info(f"Closing idle SSH transport to {pooled.host}")
+            pooled.client.close()
+        return len(evicted)
+
+    def close_all(self) -> None:
+        """Close every transport and stop the idle reaper"""
+        self._stop.set()
+        with self._lock:
+            pooled = [item for items in self._pools.values() for item in items]
+            self._pools.clear()
+        for item in pooled:
+            item.client.close()
+        if self._reaper is not None:
+            self._reaper.join(timeout=2)
+            self._reaper = None
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get pool occupancy
+
+        Returns:
+            Dict mapping host to {"transports": n, "channels": n}
+        """
+        with self._lock:
+            return {host: {"transports": len(items), "channels": sum(item.load() for item in items)}
+                    for host, items in self._pools.items()}
+
+    def _open_channel(self, host: str, opener: Callable[[Any], Any]) -> Any:
+        pooled = self._acquire(host)
+        try:
+            with tracer.span("pool.channel", host):
+                channel = opener(pooled.transport)
+        finally:
+            with self._lock:
+                pooled.pending -= 1
+                pooled.last_used = time.monotonic()
+                self._available.notify_all()
+        with self._lock:
+            pooled.channels.append(channel)
+        return channel
+
+    def _acquire(self, host: str) -> _PooledTransport:
+        """
+        Reserve a channel slot on a pooled transport, connecting a new one if needed
+
+        When the caps leave no slot, waits up to connect_timeout for a channel
+        to close or a transport to go idle before giving up.
+
+        Raises:
+            PoolExhaustedError: If no slot freed up in time
+        """
+        evict: Optional[_PooledTransport] = None
+        deadline = time.monotonic() + self.connect_timeout
+        with self._available:
+            while True:
+                items = [item for item in self._pools.get(host, []) if item.alive]
+                self._pools[host] = items
+                free = [item for item in items if item.load() < self.max_channels]
+                if free:
+                    pooled = min(free, key=_PooledTransport.load)
+                    pooled.pending += 1
+                    return pooled
+
+                if len(items) + self._connecting.get(host, 0) >= self.max_per_host:
+                    reason = f"All {self.max_per_host} transports to {host} are busy"
+                else:
+                    total = sum(len(group) for group in self._pools.values()) + sum(self._connecting.values())
+                    if total < self.max_total:
+                        break
+                    idle = [item for group in self._pools.values() for item in group if item.load() == 0]
+                    if idle:
+                        evict = min(idle, key=lambda item: item.last_used)
+                        self._pools[evict.host].remove(evict)
+                        break
+                    reason = f"All {self.max_total} pooled transports are busy"
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhaustedError(reason)
+                # Closed channels are only noticed by load(), so look again at least every 100ms
+                self._available.wait(min(remaining, 0.1))
+            self._connecting[host] = self._connecting.get(host, 0) + 1
+
+        if evict is not None:
+            evict.client.close()
+        try:
+            client = self._connect(host)
+        finally:
+            with self._lock:
+                self._connecting[host] -= 1
+                if not self._connecting[host]:
+                    del self._connecting[host]
+                self._available.notify_all()
+
+        pooled = _PooledTransport(host, client)
+        pooled.pending = 1
+        with self._lock:
+            self._pools.setdefault(host, []).append(pooled)
+            if self._reaper is None:
+                self._stop.clear()
+                self._reaper = threading.Thread(target=self._reap, name="ssh-pool-reaper", daemon=True)
+                self._reaper.start()
+        return pooled
+
+    def _connect(self, host: str) -> Any:
+        paramiko = _paramiko()
+        config = self.config or SshConfigParser.load_config()
+        resolved = config.resolve(host)
+        username, password = self.credentials(host)
+
+        sock = None
+        if resolved.proxy_jump:
+            # Reach the host through a pooled transport of the first hop
+            sock = self.open_tunnel(_first_hop(resolved.proxy_jump), resolved.hostname, resolved.port,
+                                    timeout=self.connect_timeout)
+        elif resolved.hostname in ("localhost", "127.0.0.1"):
+            # A jump host's LocalForward target: open the forward's destination directly
+            # through the jump transport, no local tunnel needed
+            jump = jump_host_for(config, host)
+            forward = None
+            if jump is not None:
+                forward = next((forward for forward in config.resolve(jump).local_forwards
+                                if forward.listen_port == resolved.port and forward.dest_host and forward.dest_port),
+                               None)
+            if forward is not None:
+                sock = self.open_tunnel(jump, forward.dest_host, forward.dest_port,
+                                        timeout=self.connect_timeout)
+            elif jump is not None:
+                # No complete LocalForward on that port: whatever listens locally (a running tunnel) is the way in
+                logger.info(f"No LocalForward of {jump} leads to {host}; connecting to "
+                            f"{resolved.hostname}:{resolved.port} directly")
+
+        client = paramiko.SSHClient()
+        try:
+            client.load_system_host_keys()
+        except OSError:
+            pass
+        if self.known_hosts.exists():
+            client.load_host_keys(str(self.known_hosts))
+        client.set_missing_host_key_policy(
+            paramiko.AutoAddPolicy() if self.accept_new_host_keys else paramiko.RejectPolicy()
+        )
+        key_files = [os.path.expanduser(path) for path in resolved.get_all("identityfile")]
+        key_files = [path for path in key_files if os.path.exists(path)]
+
+        with tracer.span("pool.connect", host):
+            try:
+                client.connect(
+                    resolved.hostname, resolved.port,
+                    username=username or resolved.user, password=password,
+                    key_filename=key_files or None, sock=sock,
+                    timeout=self.connect_timeout, banner_timeout=self.connect_timeout,
+                    auth_timeout=self.connect_timeout,
+                )
+            except Exception:
+                client.close()
+                raise
+        client.get_transport().set_keepalive(30)
+        logger.info(f"Opened pooled SSH transport to {host} ({resolved.hostname}:{resolved.port})")
+        return client
+
+    @staticmethod
+    def _configured_credentials(host: str) -> Tuple[Optional[str], Optional[str]]:
+        from ..config.config_loader import ConfigLoader
+
+        config = ConfigLoader.load()
+        return config.get_username(host), config.get_password(host)
+
+    def _reap(self) -> None:
+        while not self._stop.wait(max(1.0, min(self.idle_timeout / 2, 30.0))):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.debug(f"SSH pool eviction failed: {e}")
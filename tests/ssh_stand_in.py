@@ -0,0 +1,123 @@
+"""
+Local SSH server stand-in for tests of the in-process engine (needs paramiko)
+
+Accepts the password tester/secret, runs exec requests with the local
+shell and serves direct-tcpip channels: destinations named "standin" or
+127.0.0.1 lead back to this server, anything else is echoed.
+"""
+
+import socket
+import subprocess
+import threading
+import time
+
+import paramiko
+
+
+class _Server(paramiko.ServerInterface):
+    """Accepts tester/secret, runs exec requests and records direct-tcpip destinations"""
+
+    def __init__(self):
+        self.destinations = {}
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        if (username, password) == ("tester", "secret"):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_direct_tcpip_request(self, chanid, origin, destination):
+        self.destinations[chanid] = destination
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=_run_command, args=(channel, command), daemon=True).start()
+        return True
+
+
+class SshStandIn:
+    """Local SSH server counting the TCP connections it accepted"""
+
+    def __init__(self):
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(8)
+        self.port = self.listener.getsockname()[1]
+        self.connections = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(self.host_key)
+            handler = _Server()
+            transport.start_server(server=handler)
+            threading.Thread(target=self._serve, args=(transport, handler), daemon=True).start()
+
+    def _serve(self, transport, handler):
+        while transport.is_active():
+            channel = transport.accept(0.5)
+            destination = handler.destinations.get(channel.get_id()) if channel is not None else None
+            if destination is None:
+                continue
+            if destination[0] in ("127.0.0.1", "standin"):
+                # A real forward (ProxyJump or LocalForward back to this server)
+                target = socket.create_connection(("127.0.0.1", self.port))
+                threading.Thread(target=SshStandIn._pipe, args=(channel, target), daemon=True).start()
+                threading.Thread(target=SshStandIn._pipe, args=(target, channel), daemon=True).start()
+            else:
+                threading.Thread(target=SshStandIn._pipe, args=(channel, channel), daemon=True).start()
+
+    @staticmethod
+    def _pipe(source, sink):
+        try:
+            while True:
+                data = source.recv(65536)
+                if not data:
+                    break
+                sink.sendall(data)
+        except OSError:
+            pass
+        sink.close()
+
+    def close(self):
+        self.listener.close()
+
+
+def _run_command(channel, command):
+    # Let paramiko acknowledge the request first, as sshd does
+    time.sleep(0.05)
+    process = subprocess.Popen(["/bin/sh", "-c", command.decode("utf-8")], stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def feed_stdin():
+        while True:
+            data = channel.recv(65536)
+            if not data:
+                break
+            process.stdin.write(data)
+        process.stdin.close()
+
+    def copy_stderr():
+        for data in iter(lambda: process.stderr.read1(65536), b""):
+            channel.sendall_stderr(data)
+
+    threads = [threading.Thread(target=feed_stdin, daemon=True), threading.Thread(target=copy_stderr, daemon=True)]
+    for thread in threads:
+        thread.start()
+    for data in iter(lambda: process.stdout.read1(65536), b""):
+        channel.sendall(data)
+    threads[1].join()
+    channel.send_exit_status(process.wait())
+    channel.close()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark suite's config generator and regression check
+"""
+
+import sys
+from pathlib import Path
+
+# Add src and benchmarks to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+sys.path.insert(0, str(project_root / "benchmarks"))
+
+from bench_suite import compare, generate_ssh_config
+from ssh_connection.ssh.ssh_config_parser import SshConfigParser
+
+
+def test_generated_config_has_sections_and_forward_chains(tmp_path):
+    """Synthetic configs split hosts into TEST/PROD and chain them behind jump hosts"""
+    config_file = tmp_path / "config"
+    config_file.write_text(generate_ssh_config(200), encoding="utf-8")
+
+    config = SshConfigParser.load_config(config_file)
+    host_map = config.host_map
+    assert len(host_map["TEST"]) + len(host_map["PROD"]) == 200 + 4
+
+    jump = config.resolve("login_test0")
+    assert len(jump.local_forwards) == 50
+    target = config.resolve("app3it1te01")
+    assert target.port == jump.local_forwards[3].listen_port
+    # Wildcard DB tunnel applies on top of the host's own block
+    assert target.local_forwards[0].listen_port == 1523
+
+
+def test_compare_ignores_noise_and_flags_regressions():
+    """Only slowdowns past the threshold and the noise floor count"""
+    baseline = {"1000": {"parse_cold": 10.0, "search": 0.1, "resolve": 5.0}}
+    results = {"1000": {"parse_cold": 16.0, "search": 0.3, "resolve": 6.0, "new": 1.0}}
+    assert compare(results, baseline, 0.5) == [("1000", "parse_cold", 10.0, 16.0)]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for ConfigLoader against temporary config.yml and settings.xml files
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.config.config_loader import ConfigLoader
+
+
+CONFIG_YML = """\
+connections:
+  - name: "Test"
+    loginServer: "login-test"
+    destServer: "server-test"
+"""
+
+SETTINGS_XML = """\
+<settings>
+  <servers>
+    <server>
+      <id>corp</id>
+      <username>netsgroup\\a.user</username>
+      <password>secret</password>
+    </server>
+  </servers>
+</settings>
+"""
+
+
+def _touch_newer(path: Path) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_load_is_shared_until_files_change(tmp_path, monkeypatch):
+    """load() returns one shared instance and revalidates on file changes"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    config_file = tmp_path / "config.yml"
+    config_file.write_text(CONFIG_YML, encoding="utf-8")
+    ConfigLoader.invalidate()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(ConfigLoader.load(config_file))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    first = results[0]
+    assert all(result is first for result in results)
+    assert first.get_password() is None
+
+    settings = tmp_path / ".m2" / "settings.xml"
+    settings.parent.mkdir()
+    settings.write_text(SETTINGS_XML, encoding="utf-8")
+
+    second = ConfigLoader.load(config_file)
+    assert second is not first
+    assert second.get_username() == "a.user"
+    assert second.get_password() == "secret"
+
+    config_file.write_text(CONFIG_YML.replace('"Test"', '"Other"'), encoding="utf-8")
+    _touch_newer(config_file)
+    third = ConfigLoader.load(config_file)
+    assert third is not second
+    assert third.get_connection_by_name("other") is not None
+    assert ConfigLoader.load(config_file) is third
+
+
+def test_load_notices_a_higher_priority_config_appearing(tmp_path, monkeypatch):
+    """A config.yml created above the one in use replaces it without invalidate()"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    fallback = tmp_path / "resources" / "config.yml"
+    fallback.parent.mkdir()
+    fallback.write_text(CONFIG_YML, encoding="utf-8")
+    preferred = tmp_path / "config.yml"
+    ConfigLoader.invalidate()
+
+    first = ConfigLoader.load(preferred)
+    assert first.get_connection_by_name("Test") is not None
+    assert ConfigLoader.load(preferred) is first
+
+    preferred.write_text(CONFIG_YML.replace('"Test"', '"Other"'), encoding="utf-8")
+    second = ConfigLoader.load(preferred)
+    assert second is not first
+    assert second.get_connection_by_name("Other") is not None
+    ConfigLoader.invalidate()
+
+
+NAMESPACED_SETTINGS_XML = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<settings xmlns="http://maven.apache.org/SETTINGS/1.1.0">
+  <mirrors>
+    <mirror><id>central</id><url>https://repo.example.com</url></mirror>
+  </mirrors>
+  <proxies>
+    <proxy><id>proxy</id><username>proxy-user</username><password>proxy-pass</password></proxy>
+  </proxies>
+  <servers>
+    <server><id>test-creds</id><username>tester</username><password>t-pass</password></server>
+    <server><id>prod-creds</id><username>netsgroup\\prodder</username><password>p-pass</password></server>
+    <server><id>key-only</id><privateKey>~/.ssh/id_rsa</privateKey></server>
+  </servers>
+</settings>
+"""
+
+
+def test_maven_server_index_and_host_mappings(tmp_path, monkeypatch):
+    """Every <server> is indexed by id and credentialMappings pick one per host"""
+    from ssh_connection.security.vault import Vault
+
+    # Lookups consult the vault first: never the developer's own ~/.ssh_connection/vault.json
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(Vault, "_shared", None)
+    settings = tmp_path / "settings.xml"
+    settings.write_text(NAMESPACED_SETTINGS_XML, encoding="utf-8")
+
+    servers = ConfigLoader._load_maven_servers(settings)
+    assert list(servers) == ["test-creds", "prod-creds"]
+
+    config = ConfigLoader(
+        encrypted_user=None,
+        connections=[],
+        maven_servers=servers,
+        credential_mappings=[{"hostPattern": "*it1p*", "serverId": "prod-creds"}],
+    )
+    assert config.get_username("stlit1pf01") == "prodder"
+    assert config.get_password("STLIT1PF01") == "p-pass"
+    assert config.get_password("stlit1tf01") == "t-pass"
+    assert config.get_password() == "t-pass"
+
+
+def test_maven_settings_subtrees_are_cleared_while_streaming(tmp_path, monkeypatch):
+    """Elements outside <servers> are cleared at their own end tag, not when their section ends"""
+    settings = tmp_path / "settings.xml"
+    profiles = "".join(f"<profile><id>p{i}</id><properties><a>{i}</a></properties></profile>" for i in range(50))
+    settings.write_text(f"<settings><profiles>{profiles}</profiles>{SETTINGS_XML[11:]}", encoding="utf-8")
+
+    import xml.etree.ElementTree as ET
+    iterparse = ET.iterparse
+    held = []
+
+    def watching_iterparse(*args, **kwargs):
+        for event, elem in iterparse(*args, **kwargs):
+            if event == "end" and elem.tag == "profiles":
+                held.append(sum(len(profile) for profile in elem))
+            yield event, elem
+
+    monkeypatch.setattr(ET, "iterparse", watching_iterparse)
+    servers = ConfigLoader._load_maven_servers(settings)
+    assert list(servers) == ["corp"]
+    assert held == [0]
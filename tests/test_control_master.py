@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for jump host detection and ControlMasterManager bookkeeping
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.ssh.control_master import ControlMasterManager, find_jump_hosts, jump_host_for
+from ssh_connection.ssh.ssh_config_parser import SshConfigParser
+
+
+CONFIG = """\
+# TEST
+Host login_test
+    HostName 10.180.22.2
+    LocalForward 2222 stlit1tf01:22
+    LocalForward 2223 sellait1tf02:22
+
+Host stlit1tf01
+    HostName localhost
+    Port 2222
+
+Host sellait1tf02
+    HostName localhost
+    Port 2223
+
+# PROD
+Host bastion
+    HostName 10.101.22.12
+
+Host stlit1pf01
+    ProxyJump admin@bastion:2022
+"""
+
+
+def test_jump_host_detection(tmp_path):
+    """Jump hosts come from :22 LocalForwards and ProxyJump first hops"""
+    config_file = tmp_path / "config"
+    config_file.write_text(CONFIG, encoding="utf-8")
+    config = SshConfigParser.load_config(config_file)
+
+    assert find_jump_hosts(config) == ["login_test", "bastion"]
+    assert jump_host_for(config, "sellait1tf02") == "login_test"
+    assert jump_host_for(config, "stlit1pf01") == "bastion"
+    assert jump_host_for(config, "login_test") is None
+
+
+def test_control_paths_and_missing_master(tmp_path):
+    """Control paths are short and a missing socket is reported as not running"""
+    manager = ControlMasterManager(control_dir=tmp_path / "cm", control_persist="5m")
+
+    path = manager.control_path("a-very-long-jump-host-name.example.internal.corp")
+    assert path.parent == tmp_path / "cm" and len(path.name) < 30
+    assert manager.control_path("login_test") != manager.control_path("login_prod")
+    assert "ControlPersist=5m" in manager.ssh_options("login_test")
+
+    assert manager.check("login_test") is False
+    assert manager.proxy_options("login_test") == []
+    assert manager.live_masters(refresh=False) == []
+
+
+def test_tray_launch_joins_prewarmed_master(tmp_path, monkeypatch):
+    """A menu click tunnels through the warmed jump master instead of a fresh handshake"""
+    from ssh_connection.config.config_loader import ConfigLoader
+    from ssh_connection.ssh.ssh_launcher import SshLauncher, TerminalBackend
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    config_file = tmp_path / "config"
+    config_file.write_text(CONFIG, encoding="utf-8")
+    monkeypatch.setattr(SshConfigParser, "default_config_path", staticmethod(lambda: config_file))
+    monkeypatch.setattr(ConfigLoader, "load", staticmethod(lambda *args: ConfigLoader(None, [])))
+
+    manager = ControlMasterManager(control_dir=tmp_path / "cm")
+    # The warmer already started bastion's master
+    warmed = []
+    monkeypatch.setattr(manager, "check", lambda host: host == "bastion")
+    monkeypatch.setattr(manager, "start_master", lambda host, *args, **kwargs: warmed.append(host) or manager.check(host))
+    monkeypatch.setattr(ControlMasterManager, "available", staticmethod(lambda: True))
+    monkeypatch.setattr(ControlMasterManager, "_shared", manager)
+
+    class RecordingBackend(TerminalBackend):
+        name = "recording"
+        commands = []
+
+        def open(self, host, command, password=None):
+            self.commands.append(command)
+            return None
+
+    monkeypatch.setattr(SshLauncher, "backend", staticmethod(RecordingBackend))
+    SshLauncher._connect_python_method("stlit1pf01")
+    SshLauncher._connect_python_method("login_test")
+
+    behind_jump, jump = RecordingBackend.commands
+    assert warmed == ["bastion"]
+    assert f"ControlPath={manager.control_path('bastion')}" in " ".join(behind_jump)
+    assert behind_jump[-1] == "stlit1pf01"
+    assert f"ControlPath={manager.control_path('login_test')}" in jump
+    assert "ControlMaster=auto" in jump
+
+
+def test_start_master_is_serialised_and_keeps_slow_masters(tmp_path, monkeypatch):
+    """Concurrent starts for one host open one master; a check timeout never removes the socket"""
+    import subprocess
+    import threading
+    import time
+
+    manager = ControlMasterManager(control_dir=tmp_path / "cm")
+    original = manager._start_master
+    started = []
+
+    def fake_start(host, *args):
+        # Stands in for check-then-ssh: a second caller must see the first one's master
+        if host in started:
+            return True
+        time.sleep(0.1)
+        started.append(host)
+        return True
+
+    monkeypatch.setattr(manager, "_start_master", fake_start)
+    threads = [threading.Thread(target=manager.start_master, args=("login_test",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert started == ["login_test"]
+
+    # A healthy master that is slow to answer "ssh -O check"
+    monkeypatch.undo()
+    manager._ensure_control_dir()
+    socket_path = manager.control_path("bastion")
+    socket_path.touch()
+
+    def slow_check(*args, **kwargs):
+        raise subprocess.TimeoutExpired(args[0], 5)
+
+    monkeypatch.setattr("ssh_connection.ssh.control_master.subprocess.run", slow_check)
+    assert manager.start_master("bastion") is False
+    assert manager.check("bastion") is False
+    assert socket_path.exists()
+    assert original("bastion", None, None, 1.0) is False
+    assert socket_path.exists()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for running one command on many hosts with streamed, host-prefixed output
+"""
+
+import os
+import stat
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.ssh.fanout import FanOut, format_outcomes, select_hosts
+from ssh_connection.ssh.ssh_config_parser import SshConfigParser
+
+# Stands in for ssh: prints two lines for "ssh ... HOST COMMAND" and fails on hosts named bad*
+FAKE_SSH = f"""#!{sys.executable}
+import sys, time
+host, command = sys.argv[-2], sys.argv[-1]
+print("first line of " + command, flush=True)
+time.sleep(0.5)
+print("second line", end="")
+sys.exit(3 if host.startswith("bad") else 0)
+"""
+
+
+def _config(tmp_path):
+    config_file = tmp_path / "config"
+    config_file.write_text(
+        "# TEST\n"
+        "Host app1it1tf01 app2it1tf01 badit1tf01\n"
+        "    HostName 10.0.0.1\n"
+        "\n"
+        "# PROD\n"
+        "Host app1it1pf01\n"
+        "    HostName 10.0.1.1\n",
+        encoding="utf-8"
+    )
+    return SshConfigParser.load_config(config_file)
+
+
+def test_select_hosts_by_section_and_glob(tmp_path):
+    """--section and --hosts filters combine"""
+    config = _config(tmp_path)
+
+    assert select_hosts(config, "test") == ["app1it1tf01", "app2it1tf01", "badit1tf01"]
+    assert select_hosts(config, pattern="APP1*") == ["app1it1tf01", "app1it1pf01"]
+    assert select_hosts(config, "PROD", "app2*") == []
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="uses a shell script as ssh")
+def test_fanout_streams_lines_and_reports_exit_codes(tmp_path, monkeypatch):
+    """Every line arrives prefixed with its host before the hosts finish"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake_ssh = bin_dir / "ssh"
+    fake_ssh.write_text(FAKE_SSH, encoding="utf-8")
+    fake_ssh.chmod(fake_ssh.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+    lines = []
+    lock = threading.Lock()
+
+    def emit(host, line):
+        with lock:
+            lines.append((host, line))
+
+    config = _config(tmp_path)
+    hosts = select_hosts(config, "TEST")
+    started = time.monotonic()
+    outcomes = FanOut("df -h", parallel=3, engine="ssh", config=config, emit=emit).run(hosts)
+    elapsed = time.monotonic() - started
+
+    assert [outcome.exit_code for outcome in outcomes] == [0, 0, 3]
+    # All three first lines are printed before any host prints its last line
+    assert {line for _, line in lines[:3]} == {"first line of df -h"}
+    assert sorted(lines[3:]) == [(host, "second line") for host in hosts]
+    # Three hosts in parallel: about one host's runtime, not three
+    assert elapsed < 2 * 0.5
+
+    summary = format_outcomes(outcomes)
+    assert "2/3 succeeded" in summary
+    assert "badit1tf01" in summary.splitlines()[3]
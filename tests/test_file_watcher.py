@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the configuration file watcher
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.config import file_watcher
+from ssh_connection.config.file_watcher import FileWatcher
+
+
+def _collect(watcher_kwargs, tmp_path, edit):
+    config = tmp_path / "config"
+    config.write_text("Host a\n", encoding="utf-8")
+    missing = tmp_path / "m2" / "settings.xml"
+
+    reports = []
+    reported = threading.Event()
+
+    def on_change(paths):
+        reports.append(paths)
+        reported.set()
+
+    watcher = FileWatcher([config, missing], on_change, **watcher_kwargs)
+    watcher.start()
+    try:
+        edit(config)
+        assert reported.wait(5)
+        time.sleep(0.3)
+    finally:
+        watcher.stop()
+    return watcher, reports, config
+
+
+def _burst_of_writes(config):
+    # An editor saving several times in quick succession, the last one via rename
+    for i in range(3):
+        config.write_text(f"Host a{i}\n", encoding="utf-8")
+        time.sleep(0.02)
+    replacement = config.with_name("config.tmp")
+    replacement.write_text("Host final\n", encoding="utf-8")
+    replacement.replace(config)
+
+
+def test_watcher_debounces_a_burst_of_writes(tmp_path):
+    """Several quick saves are reported once, after they settle"""
+    watcher, reports, config = _collect({"debounce": 0.1}, tmp_path, _burst_of_writes)
+    if sys.platform.startswith("linux"):
+        assert watcher.backend.startswith("inotify")
+    assert reports == [{config}]
+
+
+def test_watcher_falls_back_to_stat_polling(tmp_path, monkeypatch):
+    """Without inotify the files are polled"""
+    monkeypatch.setattr(file_watcher._Inotify, "supported", staticmethod(lambda: False))
+    watcher, reports, config = _collect({"debounce": 0.05, "poll_interval": 0.05}, tmp_path,
+                                        lambda path: path.write_text("Host b\nHost c\n", encoding="utf-8"))
+    assert watcher.backend == "polling"
+    assert reports == [{config}]
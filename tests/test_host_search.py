@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for HostSearchIndex ranking over a synthetic SSH config
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.config.config_loader import ConnectionConfig
+from ssh_connection.ssh.host_search import HostSearchIndex
+from ssh_connection.ssh.ssh_config_parser import SshConfigParser
+
+
+CONFIG = """\
+Host *it1tf*
+    LocalForward 1524 fdb02x:1524
+
+# TEST
+Host login_test
+    HostName 10.180.22.2
+
+Host stlit1tf01 settlement-test
+    HostName localhost
+
+Host sellait1tf02
+    HostName localhost
+
+# PROD
+Host stlit1pf01
+    HostName localhost
+"""
+
+
+def _index(tmp_path):
+    config_file = tmp_path / "config"
+    config_file.write_text(CONFIG, encoding="utf-8")
+    connections = [ConnectionConfig(name="Test", login_server="login-test", dest_server="server-test")]
+    return HostSearchIndex.build(SshConfigParser.load_config(config_file), connections)
+
+
+def test_search_ranks_exact_prefix_substring(tmp_path):
+    """Exact and prefix matches outrank substrings; each host appears once"""
+    index = _index(tmp_path)
+
+    assert [r.host for r in index.search("stlit1tf01")] == ["stlit1tf01"]
+    assert [r.host for r in index.search("st")][:2] == ["stlit1pf01", "stlit1tf01"]
+    assert [r.host for r in index.search("it1tf")] == ["stlit1tf01", "sellait1tf02"]
+    assert index.search("zzzz") == []
+
+
+def test_search_hostname_alias_and_fuzzy(tmp_path):
+    """HostName values and aliases resolve to the host to open; typos fall back to fuzzy"""
+    index = _index(tmp_path)
+
+    assert index.search("10.180")[0].host == "login_test"
+    alias = index.search("settlement")[0]
+    assert (alias.host, alias.source) == ("stlit1tf01", "alias")
+    assert index.search("Test")[0].host == "server-test"
+    assert index.search("stlitt1tf01")[0].host == "stlit1tf01"
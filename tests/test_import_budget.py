@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests that CLI paths only import what they need
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+# Packages --list-hosts must never load
+HEAVY_MODULES = ("pystray", "PIL", "pyautogui", "cryptography", "yaml")
+# Cumulative import time allowed for ssh_connection.main, in microseconds
+# (about 20ms on a developer machine; the margin absorbs slow CI runners)
+LIST_HOSTS_BUDGET_US = 150_000
+
+
+def _import_times(args, home: Path) -> dict:
+    """Run the CLI under -X importtime and return {module: cumulative microseconds}"""
+    script = (
+        "import sys; sys.path.insert(0, sys.argv[1]); sys.argv = ['ssh-connection'] + sys.argv[2:]; "
+        "from ssh_connection.main import main; main()"
+    )
+    env = dict(os.environ, HOME=str(home), USERPROFILE=str(home))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script, str(src_path)] + args,
+        capture_output=True, text=True, env=env, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_list_hosts_stays_within_import_budget(tmp_path):
+    """--list-hosts loads neither GUI, crypto nor YAML packages"""
+    ssh_dir = tmp_path / ".ssh"
+    ssh_dir.mkdir()
+    (ssh_dir / "config").write_text("# TEST\nHost login_test\n    HostName login.example.com\n",
+                                    encoding="utf-8")
+
+    times = _import_times(["--list-hosts"], tmp_path)
+
+    loaded_heavy = [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+    assert loaded_heavy == []
+    assert times["ssh_connection.main"] < LIST_HOSTS_BUDGET_US
+
+
+def test_stats_without_tray_does_not_start_it(tmp_path):
+    """--stats with no tray running prints this process's timings instead of starting the tray"""
+    for args in (["--stats"], ["--stats", "--standalone"]):
+        times = _import_times(args, tmp_path)
+        assert "ssh_connection.gui.tray_icon_manager" not in times
+        assert "pystray" not in times
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the tray control socket
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.daemon.ipc import AlreadyRunningError, ControlServer, control_address, send_command
+
+pytestmark = pytest.mark.skipif(os.name == 'nt', reason="uses a Unix control socket")
+
+
+def test_cli_commands_are_served_by_the_running_instance(tmp_path, monkeypatch):
+    """Commands reach the handlers, a second instance is refused, a stopped one is not found"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert send_command("ping") is None
+
+    server = ControlServer({"ping": lambda args: "pong", "echo": lambda args: args["text"].upper()})
+    server.start()
+    try:
+        assert send_command("ping") == {"ok": True, "result": "pong"}
+        assert send_command("echo", text="login_test") == {"ok": True, "result": "LOGIN_TEST"}
+        assert send_command("nope")["ok"] is False
+
+        with pytest.raises(AlreadyRunningError):
+            ControlServer({}).start()
+
+        # A caller without the token file contents is rejected
+        assert server.handle(b'{"version": 1, "token": "guess", "command": "ping"}\n') == \
+            b'{"ok": false, "error": "unauthorized"}\n'
+    finally:
+        server.stop()
+
+    assert send_command("ping") is None
+
+
+def test_stale_socket_is_replaced(tmp_path, monkeypatch):
+    """A socket left behind by a crashed instance does not block a new one"""
+    import socket
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    (tmp_path / ".ssh_connection").mkdir()
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(control_address())
+    stale.close()
+
+    server = ControlServer({"ping": lambda args: "pong"})
+    server.start()
+    try:
+        assert send_command("ping")["result"] == "pong"
+    finally:
+        server.stop()
+
+
+def test_slow_reply_is_an_error_not_a_missing_daemon(tmp_path, monkeypatch, capsys):
+    """A command the daemon is still running is reported, never run a second time locally"""
+    import argparse
+    import socket
+    import threading
+
+    from ssh_connection.daemon import ipc
+    from ssh_connection.main import _forward_to_daemon
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    release = threading.Event()
+    calls = []
+    server = ControlServer({"check": lambda args: calls.append(args) or release.wait(5) and "done"})
+    server.start()
+    try:
+        with pytest.raises(socket.timeout):
+            send_command("check", timeout=0.2, pattern="*")
+
+        args = argparse.Namespace(exec=None, push=None, vault_set=None, vault_list=False, vault_migrate=False,
+                                  vault_unlock=False, list_hosts=False, find=None, check="*",
+                                  quick_connect=None, test_host=None, stats=False)
+        # The CLI's 60s reply timeout for --check, shortened
+        monkeypatch.setattr(ipc, "send_command", lambda command, timeout=10.0, **kwargs: send_command(command, 0.2, **kwargs))
+        assert _forward_to_daemon(args) == 1
+        assert "may still be running there" in capsys.readouterr().err
+        assert len(calls) == 2
+    finally:
+        release.set()
+        server.stop()
+
+
+def test_connect_handler_replies_before_the_launch_finishes():
+    """A slow launch (e.g. a ControlMaster authenticating) does not hold up the reply"""
+    import threading
+    from types import SimpleNamespace
+
+    from ssh_connection.main import SshConnectionApp
+
+    release = threading.Event()
+    launched = []
+    app = SshConnectionApp()
+    app.tray_manager = SimpleNamespace(connect_to_host=lambda host: release.wait(5) and launched.append(host))
+    try:
+        assert app.control_handlers()["connect"]({"host": "jump1"}) == "Connecting to jump1..."
+        assert launched == []
+    finally:
+        release.set()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for queued, rotating logging and the JSON-lines event log
+"""
+
+import json
+import logging
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.diagnostics.logs import (
+    events_file, log_event, parse_rotation, setup_logging, shutdown_logging
+)
+
+
+def test_parse_rotation_sizes_and_intervals():
+    """logRotation accepts sizes and TimedRotatingFileHandler intervals"""
+    assert parse_rotation("5MB") == (5 * 1024 * 1024, None)
+    assert parse_rotation("512kb") == (512 * 1024, None)
+    assert parse_rotation("1000") == (1000, None)
+    assert parse_rotation("daily") == (None, "midnight")
+    assert parse_rotation("w6") == (None, "W6")
+    with pytest.raises(ValueError):
+        parse_rotation("sometimes")
+
+
+def test_queued_logging_rotates_and_writes_events(tmp_path):
+    """Records from many threads reach the rotated text log; events are JSON lines"""
+    root = logging.getLogger()
+    level = root.level
+    log_file = tmp_path / "app.log"
+    try:
+        setup_logging(log_file, rotation="2KB", backups=20,
+                      module_levels={"test_logs.quiet": "WARNING"})
+
+        def work(index: int) -> None:
+            for line in range(20):
+                logging.getLogger(f"test_logs.worker{index}").info(f"worker {index} line {line}")
+                logging.getLogger("test_logs.quiet").info("suppressed")
+
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log_event("launch", host="stlit1tf01", method="pty", pid=4242)
+        log_event("failure", host="stlit1tf01", stage="port_check", error="local ports in use")
+    finally:
+        # Drains the queue and closes the files
+        shutdown_logging()
+        root.setLevel(level)
+
+    text = "".join(path.read_text(encoding="utf-8") for path in tmp_path.glob("app.log*"))
+    assert len(list(tmp_path.glob("app.log.*"))) >= 2
+    assert text.count(" - INFO - test_logs.worker") == 80
+    assert "suppressed" not in text
+    assert '"event"' not in text
+
+    events = [json.loads(line) for line in events_file(log_file).read_text(encoding="utf-8").splitlines()]
+    assert [event["event"] for event in events] == ["launch", "failure"]
+    assert events[0]["host"] == "stlit1tf01" and events[0]["pid"] == 4242
+    assert events[1]["stage"] == "port_check"
+
+    # Without a configured writer, events are dropped
+    log_event("launch", host="ignored")
+    assert len(events_file(log_file).read_text(encoding="utf-8").splitlines()) == 2
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the bucketed tray submenu tree
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.gui.menu_buckets import HostBucket, host_group
+
+
+def _leaves(bucket, widths):
+    children = bucket.children()
+    widths.append(len(children) if children else len(bucket.hosts))
+    if bucket.is_leaf:
+        return list(bucket.hosts)
+    hosts = []
+    for child in children:
+        hosts.extend(_leaves(child, widths))
+    return hosts
+
+
+def test_large_sections_split_into_bounded_buckets():
+    """Every host is reachable exactly once and no submenu exceeds max_items"""
+    hosts = [f"app{i}it1{('tf', 'te')[i % 2]}01" for i in range(5000)] + ["login_test", "login_test2"]
+    root = HostBucket("TEST", hosts, max_items=20)
+
+    widths = []
+    reached = _leaves(root, widths)
+    assert sorted(reached) == sorted(hosts)
+    assert max(widths) <= 20
+    assert [child.label for child in root.children()] == ["TE", "TF", "Other"]
+
+
+def test_buckets_split_on_demand():
+    """Only the buckets that are opened compute their children"""
+    root = HostBucket("PROD", [f"db{i:05d}it1pf01" for i in range(10000)], max_items=30)
+    assert root._children is None
+
+    first = root.children()[0]
+    assert all(child._children is None for child in root.children())
+    assert not first.is_leaf
+    assert first.children()
+    assert root.children()[1]._children is None
+
+
+def test_small_sections_stay_flat():
+    """Sections within max_items list their hosts in file order"""
+    root = HostBucket("TEST", ["login_test", "stlit1tf01", "stlit1te01"])
+    assert root.is_leaf
+    assert root.children() == []
+    assert host_group("stlit1tf01") == "TF"
+    assert host_group("login_test") is None
+    for host in ("remote", "gateway-site", "pipe", "db01pf01"):
+        assert host_group(host) is None, host
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for LocalForward port conflict detection before launching ssh
+"""
+
+import os
+import socket
+import sys
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.ssh.port_check import plan_forwards, probe_forwards
+from ssh_connection.ssh.ssh_config_parser import SshConfigParser
+
+
+def _listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(1)
+    return sock
+
+
+def _config(tmp_path, busy_port, free_port):
+    config_file = tmp_path / "config"
+    config_file.write_text(
+        "# TEST\n"
+        "Host login_test\n"
+        "    HostName 10.180.22.2\n"
+        f"    LocalForward {busy_port} stlit1tf01:22\n"
+        f"    LocalForward {free_port} sellait1tf02:22\n"
+        f"    DynamicForward {busy_port}\n",
+        encoding="utf-8"
+    )
+    return SshConfigParser.load_config(config_file)
+
+
+def test_probe_reports_taken_and_duplicate_ports(tmp_path):
+    """Ports held by a listener, or asked for twice by one host, are conflicts"""
+    with _listener() as busy, _listener() as spare:
+        free = spare.getsockname()[1]
+        spare.close()
+        config = _config(tmp_path, busy.getsockname()[1], free)
+        resolved = config.resolve("login_test")
+        forwards = list(resolved.local_forwards) + list(resolved.dynamic_forwards)
+
+        conflicts = probe_forwards(forwards)
+
+        assert [forward.listen_port for forward in conflicts] == [busy.getsockname()[1]] * 2
+        assert probe_forwards([resolved.local_forwards[1]]) == []
+
+
+def test_probe_reports_duplicate_free_port(tmp_path):
+    """One free port asked for twice is a conflict even though nothing listens on it"""
+    with _listener() as spare:
+        free = spare.getsockname()[1]
+    config = _config(tmp_path, free, free)
+    forwards = list(config.resolve("login_test").local_forwards)
+
+    conflicts = probe_forwards(forwards)
+
+    assert conflicts == [forwards[1]]
+
+
+def test_plan_remaps_ports_owned_by_other_processes(tmp_path):
+    """The default policy forwards a free port instead and names the owner"""
+    with _listener() as busy, _listener() as spare:
+        port = busy.getsockname()[1]
+        free = spare.getsockname()[1]
+        spare.close()
+        config = _config(tmp_path, port, free)
+
+        plan = plan_forwards("login_test", "reuse", config)
+
+        assert not plan.abort
+        assert plan.ssh_options[:2] == ["-o", "ExitOnForwardFailure=no"]
+        assert plan.ssh_options[2] == "-L"
+        assert plan.ssh_options[3].endswith(":stlit1tf01:22")
+        assert plan.ssh_options[4] == "-D"
+        assert port in plan.remapped
+        assert plan.conflicts[0].pid in (os.getpid(), None)
+        assert all(str(port) in message for message in plan.messages)
+
+        skipped = plan_forwards("login_test", "skip", config)
+        assert skipped.ssh_options == ["-o", "ExitOnForwardFailure=no"]
+        assert plan_forwards("login_test", "abort", config).abort
+
+    # Port released: nothing to do
+    assert plan_forwards("login_test", "abort", config).ssh_options == []
+
+
+def test_remap_keeps_the_bind_address(tmp_path):
+    """A forward listening on all interfaces stays on all interfaces after remapping"""
+    with _listener() as busy:
+        port = busy.getsockname()[1]
+        config_file = tmp_path / "config"
+        config_file.write_text(
+            "Host login_test\n"
+            f"    LocalForward *:{port} stlit1tf01:22\n"
+            f"    DynamicForward 127.0.0.1:{port}\n",
+            encoding="utf-8"
+        )
+        config = SshConfigParser.load_config(config_file)
+
+        plan = plan_forwards("login_test", "remap", config)
+
+        assert plan.ssh_options[2] == "-L"
+        bind, new_local, *destination = plan.ssh_options[3].split(":")
+        assert (bind, destination) == ("*", ["stlit1tf01", "22"])
+        assert plan.ssh_options[4] == "-D"
+        bind, new_dynamic = plan.ssh_options[5].split(":")
+        assert bind == "127.0.0.1"
+        assert plan.remapped[port] in (int(new_local), int(new_dynamic))
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for JumpHostWarmer background warm-up
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.ssh.prewarm import JumpHostWarmer
+
+
+class RecordingManager:
+    """ControlMasterManager stand-in that takes a while to authenticate"""
+
+    def __init__(self, failing):
+        self.failing = failing
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def available(self):
+        return True
+
+    def start_master(self, host, password=None, user=None, timeout=30.0):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.2)
+        with self._lock:
+            self.active -= 1
+        return host not in self.failing
+
+
+def test_warmup_runs_concurrently_without_blocking():
+    """start() returns at once; hosts authenticate in parallel and report status"""
+    manager = RecordingManager(failing={"login_prod"})
+    changes = []
+    warmer = JumpHostWarmer(["login_test", "login_prod", "login_dev"], manager=manager,
+                            on_change=lambda: changes.append(1))
+
+    started = time.monotonic()
+    warmer.start()
+    assert time.monotonic() - started < 0.1
+
+    warmer.join(timeout=5)
+    assert warmer.status() == {"login_test": "ready", "login_prod": "failed", "login_dev": "ready"}
+    assert manager.peak > 1
+    assert len(changes) == 6
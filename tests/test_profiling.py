@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for --profile section capture with cProfile and tracemalloc
+"""
+
+import pstats
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.diagnostics.profiling import Profiler
+
+
+def build_host_table(count: int) -> dict:
+    return {f"host{index:05d}": [index] * 10 for index in range(count)}
+
+
+def test_sections_write_pstats_and_allocation_reports(tmp_path):
+    """Each section is captured once, nested sections are skipped"""
+    profiler = Profiler()
+    assert profiler.section("startup").__class__.__name__ == "_NullSection"
+
+    profiler.enable(tmp_path, memory=True, top=5)
+    try:
+        with profiler.section("startup"):
+            table = build_host_table(2000)
+            with profiler.section("create_menu"):
+                build_host_table(10)
+        with profiler.section("create_menu"):
+            build_host_table(100)
+        # Already captured: runs unprofiled
+        with profiler.section("startup"):
+            build_host_table(100)
+    finally:
+        profiler.disable()
+    assert not tracemalloc.is_tracing()
+    assert len(table) == 2000
+
+    assert [path.name.rsplit("-", 1)[-1] for path in profiler.reports] == ["startup.txt", "create_menu.txt"]
+    startup = profiler.reports[0].read_text(encoding="utf-8")
+    assert "Section: startup" in startup
+    assert "build_host_table" in startup
+    assert "=== Top 5 allocation sites" in startup
+    assert "test_profiling.py" in startup.split("allocation sites", 1)[1]
+
+    stats = pstats.Stats(str(profiler.reports[0].with_suffix(".pstats")))
+    assert any(function[2] == "build_host_table" for function in stats.stats)
+    assert len(list(tmp_path.glob("*.pstats"))) == 2
+    assert "Profile reports:" in profiler.format_reports()
+
+
+def test_pty_test_connection_reports_connect_before_exit(tmp_path, monkeypatch):
+    """--profile --test on the pty path writes the connect report before sys.exit"""
+    import pytest
+    from ssh_connection.diagnostics.profiling import profiler
+    from ssh_connection.main import SshConnectionApp
+    from ssh_connection.ssh.ssh_launcher import SshLauncher
+
+    monkeypatch.setattr(SshLauncher, "pty_available", staticmethod(lambda: True))
+    monkeypatch.setattr(SshLauncher, "connect_pty", staticmethod(lambda host: 3))
+    profiler.enable(tmp_path)
+    try:
+        with pytest.raises(SystemExit) as exit_info:
+            SshConnectionApp().test_connection("web")
+    finally:
+        profiler.disable()
+    assert exit_info.value.code == 3
+    assert [path.name.rsplit("-", 1)[-1] for path in profiler.reports] == ["connect.txt"]
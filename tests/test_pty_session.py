@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for PtySshSession against a fake ssh script that prints real prompts
+"""
+
+import os
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.ssh.pty_session import PromptWatcher, PtySshSession
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="pseudo-terminals are POSIX only")
+
+
+FAKE_SSH = textwrap.dedent("""\
+    import getpass, sys
+    answer = input("Are you sure you want to continue connecting (yes/no/[fingerprint])? ")
+    if answer != "yes":
+        sys.exit(3)
+    if getpass.getpass("user@login_test's password: ") != "s3cret":
+        print("Permission denied, please try again.")
+        input("user@login_test's password: ")
+        sys.exit(5)
+    line = input("user@login_test:~$ ")
+    print("ran: " + line)
+    sys.exit(0)
+""")
+
+
+def _session(tmp_path, password, accept_new_host_key=True):
+    script = tmp_path / "fake_ssh.py"
+    script.write_text(FAKE_SSH, encoding="utf-8")
+    output = bytearray()
+    session = PtySshSession([sys.executable, str(script)], password=password,
+                            accept_new_host_key=accept_new_host_key, auth_timeout=10,
+                            output=output.extend)
+    session.start()
+    return session, output
+
+
+def test_answers_host_key_and_password_prompts(tmp_path):
+    """The password is sent as soon as the prompt shows up and the shell is handed over"""
+    session, output = _session(tmp_path, "s3cret")
+
+    assert session.authenticate() == "authenticated"
+    assert session.watcher.passwords_sent == 1
+    assert session.auth_latency is not None and session.auth_latency < 10
+
+    session.send(b"uptime\n")
+    assert session.wait() == 0
+    assert b"ran: uptime" in bytes(output)
+    assert b"s3cret" not in bytes(output)
+
+
+def test_wrong_password_is_not_retried(tmp_path):
+    """After 'Permission denied' the remaining prompt is left to the user"""
+    session, _ = _session(tmp_path, "wrong")
+
+    assert session.authenticate() == "denied"
+    assert session.watcher.passwords_sent == 1
+    session.send(b"\n")
+    assert session.wait() == 5
+
+
+def test_unknown_host_key_is_left_to_the_user(tmp_path):
+    """Without accept_new_host_key nothing is typed into the host key prompt"""
+    session, _ = _session(tmp_path, "s3cret", accept_new_host_key=False)
+
+    assert session.authenticate() == "host-key"
+    assert session.watcher.passwords_sent == 0
+    session.send(b"no\n")
+    assert session.wait() == 3
+
+
+def test_only_account_password_prompts_are_answered():
+    """Key passphrase prompts never receive the account password"""
+    for prompt in (b"user@host's password: ", b"\rPassword:", b"(user@host) Password: ", b"Password for user@host: "):
+        assert PromptWatcher("s3cret").feed(prompt) == b"s3cret\n", prompt
+
+    watcher = PromptWatcher("s3cret")
+    assert watcher.feed(b"Enter passphrase for key '/home/u/.ssh/id_ed25519': ") is None
+    assert watcher.passwords_sent == 0 and not watcher.done
+    # The user answers it; the jump host's password prompt that follows is still answered
+    assert watcher.feed(b"\r\nuser@jump's password: ") == b"s3cret\n"
+
+
+def test_banner_ending_like_a_shell_prompt_does_not_end_the_watch():
+    """A "#" banner before the password prompt is not taken for the shell"""
+    watcher = PromptWatcher("s3cret")
+    assert watcher.feed(b"*** Authorized use only #") is None
+    assert not watcher.done
+    assert watcher.feed(b"\r\nuser@host's password: ") == b"s3cret\n"
+    assert watcher.feed(b"\r\nuser@host:~$ ") is None
+    assert watcher.state == "authenticated"
+
+    # Key authentication: once a command is typed at the shell, its prompts are the user's
+    watcher = PromptWatcher("s3cret")
+    assert watcher.feed(b"Last login: Mon\r\nuser@host:~$ ") is None
+    assert not watcher.done
+    assert watcher.feed(b"sudo ls\r\n[sudo] password for user: ") is None
+    assert watcher.state == "no-prompt" and watcher.passwords_sent == 0
+
+    # Without a password there is nothing to wait for
+    watcher = PromptWatcher(None)
+    watcher.feed(b"user@host:~$ ")
+    assert watcher.state == "no-prompt"
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for staged bulk file distribution through jump hosts
+"""
+
+import hashlib
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+pytest.importorskip("paramiko")
+
+from ssh_connection.ssh.push import BulkPush, file_digest, format_results
+from ssh_connection.ssh.ssh_config_parser import SshConfigParser
+from ssh_connection.ssh.transport_pool import TransportPool
+from ssh_stand_in import SshStandIn
+
+
+def test_file_digest_matches_hashlib(tmp_path):
+    """The chunked digest equals a one-shot SHA-256"""
+    source = tmp_path / "artifact.bin"
+    data = bytes(range(256)) * 5000
+    source.write_bytes(data)
+
+    assert file_digest(source, chunk_size=1000) == (hashlib.sha256(data).hexdigest(), len(data))
+
+
+def test_push_stages_on_jump_host_and_verifies_targets(tmp_path, monkeypatch):
+    """The file crosses to the jump host once; every target copy is checksummed"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    # The stand-in runs commands locally: this is the jump host's temporary directory
+    remote_tmp = tmp_path / "remote_tmp"
+    remote_tmp.mkdir()
+    monkeypatch.setenv("TMPDIR", str(remote_tmp))
+    server = SshStandIn()
+    config_file = tmp_path / "config"
+    config_file.write_text(
+        "# TEST\n"
+        "Host login_test\n"
+        "    HostName 127.0.0.1\n"
+        f"    Port {server.port}\n"
+        "    LocalForward 2222 standin:22\n"
+        "    LocalForward 2223 standin:22\n"
+        "\n"
+        "Host stlit1tf01\n"
+        "    HostName localhost\n"
+        "    Port 2222\n"
+        "\n"
+        "Host sellait1tf02\n"
+        "    HostName localhost\n"
+        "    Port 2223\n",
+        encoding="utf-8"
+    )
+    config = SshConfigParser.load_config(config_file)
+    pool = TransportPool(config, lambda host: ("tester", "secret"),
+                         accept_new_host_keys=True, known_hosts=tmp_path / "known_hosts")
+    source = tmp_path / "artifact.bin"
+    source.write_bytes(b"build output\n" * 100000)
+    dest = tmp_path / "deployed" / "artifact.bin"
+    dest.parent.mkdir()
+    progress = []
+
+    try:
+        # Every "host" is this machine, so copy one target at a time
+        push = BulkPush(source, str(dest), per_jump=1, config=config, pool=pool,
+                        progress=lambda host, sent, total: progress.append((host, sent, total)))
+        results = push.run(["stlit1tf01", "sellait1tf02"])
+    finally:
+        pool.close_all()
+        server.close()
+
+    assert [result.ok for result in results] == [True, True], format_results(results)
+    assert dest.read_bytes() == source.read_bytes()
+    assert not Path(f"{dest}.part").exists()
+    # The jump host cannot scp to "standin", so targets were streamed through its transport
+    assert all(result.method.startswith("stream") for result in results)
+    # Staged once on the jump host, with progress up to the full size, then cleaned up
+    size = source.stat().st_size
+    assert ("login_test", size, size) in progress
+    assert list(remote_tmp.iterdir()) == []
+    assert "2/2 verified" in format_results(results)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent reachability probing and its TTL cache
+"""
+
+import socket
+import sys
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.ssh.reachability import Endpoint, ReachabilityChecker, plan_endpoints
+from ssh_connection.ssh.ssh_config_parser import SshConfigParser
+
+
+def _listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(16)
+    return sock
+
+
+def _closed_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _config(tmp_path, up_port, down_port):
+    config_file = tmp_path / "config"
+    config_file.write_text(
+        "# TEST\n"
+        "Host login_test\n"
+        "    HostName 127.0.0.1\n"
+        f"    Port {up_port}\n"
+        f"    LocalForward {down_port} stlit1tf01:22\n"
+        "\n"
+        "Host stlit1tf01\n"
+        "    HostName localhost\n"
+        f"    Port {down_port}\n"
+        "\n"
+        "# PROD\n"
+        "Host stlit1pf01\n"
+        f"    ProxyJump admin@login_test:{up_port}\n"
+        "\n"
+        "Host stlit1pf02\n"
+        "    ProxyCommand nc %h %p\n",
+        encoding="utf-8"
+    )
+    return SshConfigParser.load_config(config_file)
+
+
+def test_plan_probes_through_forwards_and_first_hops(tmp_path):
+    """Forwarded targets name their jump host; ProxyJump targets probe the first hop"""
+    config = _config(tmp_path, 2022, 2222)
+
+    endpoints = plan_endpoints(config, config.hosts())
+
+    assert endpoints["login_test"] == Endpoint("127.0.0.1", 2022, None)
+    assert endpoints["stlit1tf01"] == Endpoint("localhost", 2222, "login_test")
+    assert endpoints["stlit1pf01"] == Endpoint("127.0.0.1", 2022, "login_test")
+    assert "stlit1pf02" not in endpoints
+
+
+def test_check_probes_local_sockets_and_caches_results(tmp_path):
+    """Listening ports are up, closed ports down, and results are reused until forced"""
+    listener = _listener()
+    config = _config(tmp_path, listener.getsockname()[1], _closed_port())
+    checker = ReachabilityChecker(ttl=60, timeout=1.0)
+
+    results = checker.check(config=config)
+
+    assert results["login_test"].up and results["login_test"].latency is not None
+    assert results["stlit1pf01"].up
+    assert not results["stlit1tf01"].up and results["stlit1tf01"].error
+    assert "stlit1pf02" not in results
+
+    listener.close()
+    assert checker.check(config=config)["login_test"].up
+    assert checker.get("login_test").up
+    assert not checker.check(["login_test"], config, force=True)["login_test"].up
+
+    checker.ttl = 0
+    assert checker.get("login_test") is None
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the registry of launched ssh sessions
+"""
+
+import json
+import os
+import stat
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import psutil
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.ssh.sessions import SessionRegistry, _targets_host
+
+# Stands in for an interactive ssh client: idles until terminated
+FAKE_SSH = f"""#!{sys.executable}
+import time
+while True:
+    time.sleep(0.1)
+"""
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_targets_host_skips_masters_and_relays():
+    """Only interactive sessions to the host count"""
+    assert _targets_host(["ssh", "-t", "app1it1tf01"], "APP1IT1TF01")
+    assert _targets_host(["ssh", "-o", "ConnectTimeout=5", "user@app1it1tf01"], "app1it1tf01")
+    assert not _targets_host(["ssh", "app2it1tf01"], "app1it1tf01")
+    assert not _targets_host(["ssh", "-f", "-N", "-o", "ControlMaster=yes", "jump1"], "jump1")
+    assert not _targets_host(["ssh", "-O", "check", "jump1"], "jump1")
+    assert not _targets_host(["ssh", "-W", "%h:%p", "jump1"], "jump1")
+    assert not _targets_host(["ssh", "-tM", "jump1"], "jump1")
+    assert not _targets_host(["ssh", "-oControlMaster yes", "jump1"], "jump1")
+    # Flags are parsed: letters inside option values and remote commands do not count
+    assert _targets_host(["ssh", "-S/tmp/Mx", "jump1"], "jump1")
+    assert _targets_host(["ssh", "-p22", "-l", "W", "jump1", "ls", "-M"], "jump1")
+    # The host as an option value or in the remote command is not the destination
+    assert not _targets_host(["ssh", "-J", "jump1", "app1it1tf01"], "jump1")
+    assert not _targets_host(["ssh", "app1it1tf01", "ping", "jump1"], "jump1")
+
+
+def test_registry_resolves_samples_and_closes_sessions(tmp_path, monkeypatch):
+    """A launcher's ssh child is found, deduplicated by host, sampled and terminated"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake_ssh = bin_dir / "ssh"
+    fake_ssh.write_text(FAKE_SSH, encoding="utf-8")
+    fake_ssh.chmod(fake_ssh.stat().st_mode | stat.S_IEXEC)
+    env = dict(os.environ, PATH=f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    state_path = tmp_path / "sessions.json"
+    registry = SessionRegistry(state_path=state_path)
+    # The ssh client the user opened by hand in their own terminal
+    manual = subprocess.Popen(["ssh", "app1it1tf01"], env=env)
+    # The shell stays around as the launcher, like cmd.exe running quick_ssh.bat
+    launcher = subprocess.Popen(["/bin/sh", "-c", "ssh -L 8080:localhost:80 app1it1tf01; true"], env=env)
+    try:
+        registry.register("app1it1tf01", launcher.pid, [8080, 8080], "batch")
+        assert _wait_for(lambda: registry.find("APP1IT1TF01") is not None
+                         and registry.find("APP1IT1TF01").ssh_pid is not None)
+        session = registry.find("app1it1tf01")
+        assert session.ssh_pid != launcher.pid
+        assert psutil.Process(session.ssh_pid).name() == "ssh"
+        assert session.forwards == (8080,)
+        assert registry.owner_of(8080) is session
+        assert registry.find("app2it1tf01") is None
+
+        # A second registry (a rebooted instance) adopts the client it recorded, not the manual one
+        assert [record["pid"] for record in json.loads(state_path.read_text())["sessions"]] == [session.ssh_pid]
+        adopted = SessionRegistry(state_path=state_path)
+        assert adopted.adopt_running(["app1it1tf01", "app2it1tf01"]) == 1
+        assert adopted.find("app1it1tf01").ssh_pid == session.ssh_pid
+        assert adopted.find("app1it1tf01").forwards == (8080,)
+        assert SessionRegistry().adopt_running(["app1it1tf01"]) == 0
+
+        usage = registry.sample()
+        assert len(usage) == 1
+        assert usage[0].pid == session.ssh_pid
+        assert usage[0].processes == 2 and usage[0].rss > 0
+        assert registry.usage() == usage
+
+        assert registry.close_all(timeout=2) == 1
+        assert registry.sessions() == []
+        assert launcher.wait(timeout=5) is not None
+        # The adopted entry is pruned once its process is gone
+        assert _wait_for(lambda: adopted.sessions() == [])
+        assert manual.poll() is None
+        assert json.loads(state_path.read_text())["sessions"] == []
+    finally:
+        for process in (launcher, manual):
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+
+def test_pid_reused_after_launch_is_not_tracked(monkeypatch):
+    """A launcher whose PID went to a later program is never looked up again, nor closed"""
+    registry = SessionRegistry(scan_window=0)
+    other = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        # The launch happened a minute before the program now holding the PID started
+        launched = psutil.Process(other.pid).create_time() - 60
+        monkeypatch.setattr("ssh_connection.ssh.sessions.time.time", lambda: launched)
+        registry.register("app1it1tf01", other.pid, method="batch")
+        monkeypatch.undo()
+        assert registry.sessions() == []
+        assert registry.close_all(timeout=1) == 0
+        assert other.poll() is None
+    finally:
+        other.kill()
+        other.wait()
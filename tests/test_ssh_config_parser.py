@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for SshConfigParser against synthetic SSH config files
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.ssh.ssh_config_parser import SshConfigParser
+
+
+SAMPLE_CONFIG = """\
+Host *
+    ServerAliveInterval 60
+
+Host *it1tf*
+    LocalForward 1524 fdb02x:1524
+
+############################################
+#                TEST                      #
+############################################
+
+Host login_test
+    HostName 10.180.22.2
+    LocalForward 2222 stlit1tf01:22
+
+Host stlit1tf01
+    HostName localhost
+    Port 2222
+
+############################################
+#                PROD                      #
+############################################
+
+Host login_prod
+    HostName 10.101.22.12
+"""
+
+
+def test_parse_cache_hits_until_file_changes(tmp_path):
+    """Repeat parses are served from cache and invalidated by a file change"""
+    config_file = tmp_path / "config"
+    config_file.write_text(SAMPLE_CONFIG, encoding="utf-8")
+    SshConfigParser.clear_cache()
+
+    first = SshConfigParser.parse_ssh_config(config_file)
+    second = SshConfigParser.parse_ssh_config(config_file)
+
+    assert first == {"TEST": ["login_test", "stlit1tf01"], "PROD": ["login_prod"]}
+    assert second is first
+    assert SshConfigParser.cache_stats()["hits"] == 1
+    assert SshConfigParser.cache_stats()["misses"] == 1
+
+    config_file.write_text(SAMPLE_CONFIG + "\nHost stlit1pf01\n    Port 3222\n", encoding="utf-8")
+    st = config_file.stat()
+    os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    third = SshConfigParser.parse_ssh_config(config_file)
+    assert third["PROD"] == ["login_prod", "stlit1pf01"]
+    assert SshConfigParser.cache_stats()["misses"] == 2
+
+
+def test_parse_missing_file(tmp_path):
+    """A missing config yields empty sections and is not cached"""
+    SshConfigParser.clear_cache()
+    host_map = SshConfigParser.parse_ssh_config(tmp_path / "missing")
+    assert host_map == {"TEST": [], "PROD": []}
+    assert SshConfigParser.cache_stats()["entries"] == 0
+
+
+def test_resolve_first_value_wins(tmp_path):
+    """Effective options follow OpenSSH ordering and forwards accumulate"""
+    config_file = tmp_path / "config"
+    config_file.write_text(SAMPLE_CONFIG + "\nHost stlit1tf01\n    Port 9999\n    User=alice\n", encoding="utf-8")
+
+    config = SshConfigParser.load_config(config_file)
+    resolved = config.resolve("stlit1tf01")
+
+    assert resolved.hostname == "localhost"
+    assert resolved.port == 2222
+    assert resolved.user == "alice"
+    assert resolved.get("ServerAliveInterval") == "60"
+    assert [(f.listen_port, f.dest_host, f.dest_port) for f in resolved.local_forwards] == [
+        (1524, "fdb02x", 1524),
+    ]
+
+    jump = config.resolve("login_test")
+    assert jump.hostname == "10.180.22.2"
+    assert [f.listen_port for f in jump.local_forwards] == [2222]
+    assert "stlit1tf01" in config.hosts() and "*it1tf*" not in config.hosts()
+
+
+def test_host_block_negation(tmp_path):
+    """Negated patterns exclude a host from an otherwise matching block"""
+    config_file = tmp_path / "config"
+    config_file.write_text("Host *.example.com !bastion.example.com\n    User deploy\n", encoding="utf-8")
+
+    config = SshConfigParser.load_config(config_file)
+    assert config.resolve("web.example.com").user == "deploy"
+    assert config.resolve("bastion.example.com").user is None
+
+
+def test_pattern_index_matches_per_block_check(tmp_path):
+    """The compiled index selects the same blocks as checking each block in turn"""
+    config_file = tmp_path / "config"
+    config_file.write_text(
+        "Host *it1tf* !*it1tf99\n    LocalForward 1524 fdb02x:1524\n"
+        "Host app?it1te01\n    User te\n"
+        "Host App1it1tf01 app2it1te01\n    Port 2200\n"
+        "Host B?t* ?pp1*\n    User b\n"
+        "Host *\n    ServerAliveInterval 60\n",
+        encoding="utf-8",
+    )
+    config = SshConfigParser.load_config(config_file)
+
+    for host in ("app1it1tf01", "APP1IT1TF01", "app2it1te01", "app12it1te01", "x-it1tf99", "other", "bat1", "bt", "Xpp1"):
+        expected = [block for block in config.blocks if block.matches(host)]
+        assert config.matching_blocks(host) == expected
+
+    resolved = config.resolve_all()
+    assert list(resolved) == ["App1it1tf01", "app2it1te01"]
+    assert resolved["App1it1tf01"].port == 2200
+    assert resolved["app2it1te01"].user == "te"
+    assert config.host_map == {"TEST": [], "PROD": []}
+
+
+def test_diff_host_maps_reports_added_and_removed_hosts():
+    """Reload diffs list added/removed hosts per changed section only"""
+    old = {"TEST": ["login_test", "a"], "PROD": ["login_prod"]}
+    new = {"TEST": ["login_test", "b"], "PROD": ["login_prod"], "OTHER": ["c"]}
+    assert SshConfigParser.diff_host_maps(old, new) == {
+        "TEST": (["b"], ["a"]),
+        "OTHER": (["c"], []),
+    }
+    assert SshConfigParser.diff_host_maps(old, dict(old)) == {}
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the tmux terminal backend, against a real tmux server on a private socket
+"""
+
+import shutil
+import stat
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.ssh import tmux_backend
+from ssh_connection.ssh.tmux_backend import TmuxBackend, quote
+
+needs_tmux = pytest.mark.skipif(shutil.which("tmux") is None, reason="tmux is not installed")
+
+# Stands in for ssh: asks for a password, records it, then shows a shell prompt
+FAKE_SSH = f"""#!{sys.executable}
+import sys, time
+from pathlib import Path
+host = sys.argv[-1]
+sys.stdout.write(host + "'s password: ")
+sys.stdout.flush()
+password = sys.stdin.readline().rstrip("\\n")
+Path(sys.argv[-2], host).write_text(password)
+sys.stdout.write("\\r\\nuser@" + host + ":~$ ")
+sys.stdout.flush()
+time.sleep(60)
+"""
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_quote_keeps_arguments_literal():
+    """Arguments reach tmux unchanged, whatever they contain"""
+    assert quote("new-window") == "new-window"
+    assert quote("%3") == "%3"
+    assert quote("#{pane_id}") == '"#{pane_id}"'
+    assert quote('a"b$HOME\\c') == '"a\\"b\\$HOME\\\\c"'
+
+
+@needs_tmux
+def test_hosts_open_as_windows_of_one_session(tmp_path, monkeypatch):
+    """Each host is one new-window on the control client, with its password typed at the prompt"""
+    monkeypatch.setenv("TMUX_TMPDIR", str(tmp_path))
+    monkeypatch.delenv("TMUX", raising=False)
+    monkeypatch.delenv("DISPLAY", raising=False)
+    monkeypatch.delenv("WAYLAND_DISPLAY", raising=False)
+    fake_ssh = tmp_path / "ssh"
+    fake_ssh.write_text(FAKE_SSH, encoding="utf-8")
+    fake_ssh.chmod(fake_ssh.stat().st_mode | stat.S_IEXEC)
+    out = tmp_path / "out"
+    out.mkdir()
+
+    backend = TmuxBackend(session="test", socket="test")
+    try:
+        first = backend.open("app1it1tf01", [str(fake_ssh), str(out), "app1it1tf01"], "first secret")
+        assert _wait_for(lambda: (out / "app1it1tf01").exists())
+        assert (out / "app1it1tf01").read_text() == "first secret"
+        control = backend._control
+
+        # Later hosts start no process at all: one command on the control client's pipe
+        spawned = []
+        popen = subprocess.Popen
+        monkeypatch.setattr(tmux_backend.subprocess, "Popen", lambda *args, **kwargs: spawned.append(args) or popen(*args, **kwargs))
+        monkeypatch.setattr(tmux_backend.subprocess, "run", lambda *args, **kwargs: spawned.append(args))
+        tricky = "p'a\"s$s\\w;rd #{x} ~"
+        second = backend.open("app2it1tf01", [str(fake_ssh), str(out), "app2it1tf01"], tricky)
+        assert _wait_for(lambda: (out / "app2it1tf01").exists())
+        assert (out / "app2it1tf01").read_text() == tricky
+        assert spawned == []
+        assert backend._control is control
+
+        windows = backend.windows()
+        assert [(window.host, window.pid) for window in windows] == [("app1it1tf01", first), ("app2it1tf01", second)]
+        assert _wait_for(lambda: backend.status() == {"app1it1tf01": "authenticated", "app2it1tf01": "authenticated"})
+        assert backend.focus("app1it1tf01")
+        assert not backend.focus("missing")
+
+        # A new instance attaches to the session left running instead of starting another
+        monkeypatch.undo()
+        monkeypatch.setenv("TMUX_TMPDIR", str(tmp_path))
+        backend.close()
+        rebooted = TmuxBackend(session="test", socket="test")
+        assert [window.pid for window in rebooted.windows()] == [first, second]
+        rebooted.close()
+    finally:
+        subprocess.run(backend.tmux_command("kill-server"), stderr=subprocess.DEVNULL)
+
+
+def test_backend_must_implement_open():
+    """A backend without open() fails when created, not when a host is clicked"""
+    from ssh_connection.ssh.ssh_launcher import TerminalBackend
+
+    class Incomplete(TerminalBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_no_posix_backend_without_tmux(monkeypatch, capsys):
+    """auto and powershell on POSIX without tmux say so instead of starting PowerShell"""
+    from ssh_connection.config.config_loader import ConfigLoader
+    from ssh_connection.ssh import ssh_launcher
+    from ssh_connection.ssh.ssh_launcher import SshLauncher
+
+    monkeypatch.setattr(ssh_launcher.os, "name", "posix")
+    monkeypatch.setattr(TmuxBackend, "available", staticmethod(lambda: False))
+    monkeypatch.setattr(SshLauncher, "_reuse_session", staticmethod(lambda name: False))
+    monkeypatch.setattr(ssh_launcher.subprocess, "Popen", lambda *args, **kwargs: pytest.fail("nothing may be started"))
+    for choice in ("auto", "powershell", "tmux"):
+        monkeypatch.setattr(ConfigLoader, "load", staticmethod(lambda *args: ConfigLoader(None, [], terminal_backend=choice)))
+        assert SshLauncher.backend() is None
+        SshLauncher.connect("app1it1tf01")
+        assert "No terminal backend" in capsys.readouterr().out
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for connect phase tracing
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.diagnostics.tracing import Tracer
+
+
+def test_spans_feed_ring_buffer_and_histograms():
+    """Spans are kept up to capacity while statistics cover every span"""
+    tracer = Tracer(capacity=4)
+    for millis in (2, 3, 4, 40, 600):
+        tracer.record("connect.spawn", 0.0, millis / 1000.0, "login_test")
+    try:
+        with tracer.span("connect.config_load", "login_test"):
+            raise ValueError("broken config")
+    except ValueError:
+        pass
+
+    assert len(tracer.recent()) == 4
+    assert tracer.recent(1)[0].error
+
+    summary = tracer.summary()
+    spawn = summary["connect.spawn"]
+    assert spawn["count"] == 5
+    assert spawn["p50"] == 0.005
+    assert spawn["max"] == 0.6
+    assert summary["connect.config_load"]["errors"] == 1
+    assert "connect.spawn" in tracer.format_summary()
+
+
+def test_disabled_tracer_records_nothing():
+    """A disabled tracer hands out a shared no-op span"""
+    tracer = Tracer(enabled=False)
+    with tracer.span("connect.spawn"):
+        pass
+    assert tracer.summary() == {}
+    assert tracer.span("a") is tracer.span("b")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process SSH transport pool against a local paramiko server
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+paramiko = pytest.importorskip("paramiko")
+
+from ssh_connection.ssh.ssh_config_parser import SshConfigParser
+from ssh_connection.ssh.fanout import FanOut
+from ssh_connection.ssh.transport_pool import PoolExhaustedError, TransportPool
+from ssh_stand_in import SshStandIn
+
+
+@pytest.fixture(scope="module")
+def server():
+    stand_in = SshStandIn()
+    yield stand_in
+    stand_in.close()
+
+
+def _pool(tmp_path, server, **kwargs):
+    config_file = tmp_path / "config"
+    config_file.write_text(
+        "Host login_test\n"
+        "    HostName 127.0.0.1\n"
+        f"    Port {server.port}\n"
+        "\n"
+        "Host stlit1pf01\n"
+        "    HostName 127.0.0.1\n"
+        f"    Port {server.port}\n"
+        "    ProxyJump login_test\n",
+        encoding="utf-8"
+    )
+    return TransportPool(SshConfigParser.load_config(config_file), lambda host: ("tester", "secret"),
+                         accept_new_host_keys=True, known_hosts=tmp_path / "known_hosts", **kwargs)
+
+
+def test_channels_reuse_one_authenticated_transport(tmp_path, monkeypatch, server):
+    """exec and direct-tcpip channels share the host's transport; ProxyJump goes through it"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    pool = _pool(tmp_path, server)
+    before = server.connections
+    try:
+        assert pool.run("login_test", "echo ran uptime") == (0, b"ran uptime\n", b"")
+        assert pool.run("login_test", "echo oops >&2; exit 3") == (3, b"", b"oops\n")
+
+        tunnel = pool.open_tunnel("login_test", "db.internal", 5432)
+        tunnel.sendall(b"ping")
+        assert tunnel.recv(4) == b"ping"
+        tunnel.close()
+
+        assert server.connections - before == 1
+        assert pool.stats()["login_test"]["transports"] == 1
+
+        # The jump target's transport runs inside a channel of login_test's transport
+        assert pool.run("stlit1pf01", "echo ran hostname") == (0, b"ran hostname\n", b"")
+        assert server.connections - before == 2
+        assert pool.stats()["login_test"]["channels"] == 1
+        assert set(pool.stats()) == {"login_test", "stlit1pf01"}
+    finally:
+        pool.close_all()
+
+
+def test_caps_and_idle_eviction(tmp_path, monkeypatch, server):
+    """Channel and transport caps are enforced and idle transports are closed"""
+    import threading
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    pool = _pool(tmp_path, server, max_per_host=1, max_channels=2, idle_timeout=0, connect_timeout=0.3)
+    try:
+        first = pool.open_tunnel("login_test", "a", 1)
+        second = pool.open_tunnel("login_test", "b", 2)
+        with pytest.raises(PoolExhaustedError):
+            pool.open_tunnel("login_test", "c", 3)
+
+        # A caller over the cap waits for a slot instead of failing
+        pool.connect_timeout = 5
+        queued = []
+        waiter = threading.Thread(target=lambda: queued.append(pool.open_tunnel("login_test", "c", 3)))
+        waiter.start()
+        first.close()
+        waiter.join(timeout=5)
+        assert len(queued) == 1
+        queued[0].close()
+
+        assert pool.evict_idle() == 0
+        second.close()
+        assert pool.evict_idle() == 1
+        assert pool.stats() == {}
+    finally:
+        pool.close_all()
+
+
+def test_fanout_reaches_forward_targets_through_the_jump_transport(tmp_path, monkeypatch, server):
+    """A "HostName localhost" target is reached via the jump host's pooled transport"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    config_file = tmp_path / "config"
+    config_file.write_text(
+        "# TEST\n"
+        "Host login_test\n"
+        "    HostName 127.0.0.1\n"
+        f"    Port {server.port}\n"
+        "    LocalForward 2222 standin:22\n"
+        "\n"
+        "Host stlit1tf01\n"
+        "    HostName localhost\n"
+        "    Port 2222\n",
+        encoding="utf-8"
+    )
+    config = SshConfigParser.load_config(config_file)
+    pool = TransportPool(config, lambda host: ("tester", "secret"),
+                         accept_new_host_keys=True, known_hosts=tmp_path / "known_hosts")
+    monkeypatch.setattr(TransportPool, "_shared", pool)
+    lines = []
+    try:
+        outcomes = FanOut("echo ran uptime", engine="inprocess", config=config,
+                          emit=lambda host, line: lines.append((host, line))).run(["login_test", "stlit1tf01"])
+        assert [outcome.exit_code for outcome in outcomes] == [0, 0]
+        assert sorted(lines) == [("login_test", "ran uptime"), ("stlit1tf01", "ran uptime")]
+        # Nothing listens on local port 2222: the target went through login_test's transport
+        assert pool.stats()["login_test"]["channels"] == 1
+    finally:
+        pool.close_all()
+
+
+def test_localhost_target_without_usable_forward_connects_directly(tmp_path, monkeypatch, server):
+    """A localhost target whose jump forward is incomplete is reached on the local port itself"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    config_file = tmp_path / "config"
+    config_file.write_text(
+        "Host login_test\n"
+        "    HostName 10.0.0.1\n"
+        f"    LocalForward {server.port} stlit1tf01\n"
+        "\n"
+        "Host stlit1pf01\n"
+        "    ProxyJump login_test\n"
+        "\n"
+        "Host stlit1tf01\n"
+        "    HostName 127.0.0.1\n"
+        f"    Port {server.port}\n",
+        encoding="utf-8"
+    )
+    pool = TransportPool(SshConfigParser.load_config(config_file), lambda host: ("tester", "secret"),
+                         accept_new_host_keys=True, known_hosts=tmp_path / "known_hosts")
+    try:
+        assert pool.run("stlit1tf01", "echo direct") == (0, b"direct\n", b"")
+        assert list(pool.stats()) == ["stlit1tf01"]
+    finally:
+        pool.close_all()
+
+
+def test_fanout_beyond_pool_capacity_queues_hosts(tmp_path, monkeypatch, server):
+    """More hosts than pooled transports run in turn instead of failing"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    hosts = [f"app{index:02d}it1tf01" for index in range(12)]
+    config_file = tmp_path / "config"
+    config_file.write_text("".join(f"Host {host}\n    HostName 127.0.0.1\n    Port {server.port}\n\n"
+                                   for host in hosts), encoding="utf-8")
+    config = SshConfigParser.load_config(config_file)
+    pool = TransportPool(config, lambda host: ("tester", "secret"), max_total=4,
+                         accept_new_host_keys=True, known_hosts=tmp_path / "known_hosts")
+    monkeypatch.setattr(TransportPool, "_shared", pool)
+    try:
+        outcomes = FanOut("echo ran", parallel=len(hosts), engine="inprocess", config=config,
+                          emit=lambda host, line: None).run(hosts)
+        assert [(outcome.exit_code, outcome.error) for outcome in outcomes] == [(0, None)] * len(hosts)
+        assert sum(stats["transports"] for stats in pool.stats().values()) <= 4
+    finally:
+        pool.close_all()
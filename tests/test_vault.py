@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the encrypted credential vault and the encryptedUser migration
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
+# Add src to Python path for testing
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+from ssh_connection.config.config_loader import ConfigLoader
+from ssh_connection.security.crypto_util import CryptoUtil
+from ssh_connection.security.vault import PASSPHRASE_ENV, Vault, migrate_encrypted_users
+
+# Cheap scrypt cost so the tests stay fast
+COST = 2 ** 10
+
+
+def test_vault_derives_key_once_and_detects_tampering(tmp_path, monkeypatch):
+    """Unlocking pays the KDF once; entries are sealed and bound to their names"""
+    path = tmp_path / "vault.json"
+    derivations = []
+    derive = Vault._derive_key
+    monkeypatch.setattr(Vault, "_derive_key",
+                        staticmethod(lambda *args: derivations.append(1) or derive(*args)))
+
+    vault = Vault(path, cost=COST)
+    vault.unlock("correct horse")
+    vault.set("*it1p*", "prod.user", "prod-secret")
+    vault.set("default", "a.user")
+    for _ in range(50):
+        assert vault.lookup("APP1IT1PF01") == ("prod.user", "prod-secret")
+    assert vault.lookup("app1it1tf01") is None
+    assert vault.default() == ("a.user", None)
+    assert len(derivations) == 1
+
+    stored = path.read_text(encoding="utf-8")
+    assert "prod-secret" not in stored and "prod.user" not in stored
+    assert vault.names() == ["*it1p*", "default"]
+
+    with pytest.raises(ValueError):
+        Vault(path, cost=COST).unlock("wrong")
+
+    # Swapping two sealed entries is caught by the associated data
+    data = json.loads(stored)
+    data["entries"]["default"], data["entries"]["*it1p*"] = data["entries"]["*it1p*"], data["entries"]["default"]
+    path.write_text(json.dumps(data), encoding="utf-8")
+    tampered = Vault(path, cost=COST)
+    tampered.unlock("correct horse")
+    with pytest.raises(InvalidTag):
+        tampered.default()
+
+
+def test_cached_entries_expire_and_are_wiped(tmp_path):
+    """Expired and locked entries have their buffers zeroed"""
+    vault = Vault(tmp_path / "vault.json", ttl=60, cost=COST)
+    vault.unlock("passphrase")
+    vault.set("host1", "user1", "secret1")
+
+    assert vault.get("host1").password == "secret1"
+    cached = vault._cache["host1"]
+    buffer = cached.password
+    cached.expires = 0
+    assert vault.purge_expired() == 1
+    assert buffer == bytearray(len("secret1"))
+    assert "host1" not in vault._cache
+
+    # Decrypted again without re-deriving the key
+    assert vault.get("host1").password == "secret1"
+    buffer = vault._cache["host1"].password
+    vault.lock()
+    assert buffer == bytearray(len("secret1"))
+    assert not vault.unlocked
+    with pytest.raises(RuntimeError):
+        vault.get("host1")
+
+
+def test_migrate_encrypted_user_into_vault(tmp_path, monkeypatch):
+    """Legacy encryptedUser values move into the vault and ConfigLoader reads them from there"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv(PASSPHRASE_ENV, "session passphrase")
+    monkeypatch.setattr(Vault, "_shared", Vault(tmp_path / ".ssh_connection" / "vault.json", cost=COST))
+    encrypted = CryptoUtil.encrypt("netsgroup\\legacy.user")
+    config_file = tmp_path / "config.yml"
+    config_file.write_text(
+        f'encryptedUser: "{encrypted}"\n'
+        "connections: []\n",
+        encoding="utf-8"
+    )
+
+    vault = Vault.shared()
+    vault.unlock("session passphrase")
+    report = migrate_encrypted_users(vault, [config_file, tmp_path / "missing.yml"])
+    assert len(report) == 1 and "migrated to 'default'" in report[0]
+    vault.set("stlit1tf01", "test.user", "test-secret")
+
+    # A fresh process unlocks from the environment on first lookup
+    monkeypatch.setattr(Vault, "_shared", Vault(vault.path, cost=COST))
+    ConfigLoader.invalidate()
+    config = ConfigLoader.load(config_file)
+    assert config.get_username("stlit1tf01") == "test.user"
+    assert config.get_password("stlit1tf01") == "test-secret"
+    assert config.get_username("other") == "legacy.user"
+    assert config.get_password("other") is None
+    ConfigLoader.invalidate()
+
+
+def test_migrate_keeps_every_user_of_same_named_directories(tmp_path, monkeypatch):
+    """Three resources/config.yml files with different users become three entries"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    vault = Vault(tmp_path / ".ssh_connection" / "vault.json", cost=COST)
+    vault.unlock("session passphrase")
+    paths = []
+    for index, user in enumerate(["first.user", "second.user", "third.user", "second.user"]):
+        config_file = tmp_path / f"install{index}" / "resources" / "config.yml"
+        config_file.parent.mkdir(parents=True)
+        config_file.write_text(f'encryptedUser: "{CryptoUtil.encrypt(user)}"\n', encoding="utf-8")
+        paths.append(config_file)
+
+    report = migrate_encrypted_users(vault, paths)
+
+    assert vault.names() == ["default", "default@2", "default@3"]
+    assert [vault.get(name).username for name in vault.names()] == ["first.user", "second.user", "third.user"]
+    assert "same user as the 'default@2' entry" in report[3]
+
+
+def test_background_lookups_never_prompt(tmp_path, monkeypatch):
+    """Only the main thread of an interactive command is asked for the passphrase"""
+    import threading
+
+    monkeypatch.delenv(PASSPHRASE_ENV, raising=False)
+    Vault(tmp_path / "vault.json", cost=COST).unlock("passphrase")
+    prompts = []
+    monkeypatch.setattr("getpass.getpass", lambda prompt: prompts.append(prompt) or "passphrase")
+    monkeypatch.setattr(sys, "stdin", type("Tty", (), {"isatty": staticmethod(lambda: True)})())
+
+    vault = Vault(tmp_path / "vault.json", cost=COST)
+    results = []
+    worker = threading.Thread(target=lambda: results.append(vault.ensure_unlocked()))
+    worker.start()
+    worker.join()
+    assert results == [False] and prompts == []
+
+    vault.interactive = False
+    assert not vault.ensure_unlocked() and prompts == []
+
+    # The CLI's main thread is still asked, once
+    vault.interactive = True
+    assert vault.ensure_unlocked() and len(prompts) == 1